@@ -1,29 +1,76 @@
 from airflow import DAG
-from airflow.operators.bash import BashOperator
+from airflow.decorators import task
+from airflow.utils.task_group import TaskGroup
 from datetime import datetime, timedelta
 
+from config import config
+from etl import tasks
+
 default_args = {
     'owner': 'fatimah',
     'retries': 1,
     'retry_delay': timedelta(minutes=5)
 }
 
+
+@task
+def plan_extract(name: str) -> list:
+    return tasks.plan_extract(name)
+
+
+@task
+def extract_shard(name: str, shard_index: int) -> int:
+    return tasks.extract_shard(name, shard_index)
+
+
+@task
+def finish_extract(name: str) -> int:
+    return tasks.finish_extract(name)
+
+
+@task
+def load(name: str) -> None:
+    tasks.load(name)
+
+
+@task
+def reconcile(name: str) -> None:
+    tasks.reconcile(name)
+
+
+@task
+def extract_aggregate(name: str) -> int:
+    return tasks.extract_aggregate(name)
+
+
+@task
+def load_summary(name: str) -> None:
+    tasks.load_summary(name)
+
+
+# One plan -> extract/transform (mapped over id-range shards) -> merge -> load chain per
+# model. Chains run in parallel, so a model is loaded as soon as its own extract is done.
+# Retried tasks resume from the extraction checkpoints. With ETL_RECONCILE set, each
+# load is followed by a reconciliation of records deleted or archived in Odoo.
+# Summary tables enabled by ETL_AGGREGATES are aggregated by Odoo itself and reloaded in full.
 with DAG(
     dag_id='odoo_etl_pipeline',
     default_args=default_args,
     start_date=datetime(2025, 6, 1),
     schedule_interval='@daily',
     catchup=False,
+    max_active_runs=1,
     tags=["odoo", "etl", "analytics"]
 ) as dag:
 
-    extract_transform = BashOperator(
-        task_id='extract_transform',
-        bash_command='cd /opt/airflow && python3 -m etl.run_extracts',
-    )
-    load_to_postgres = BashOperator(
-        task_id='load_to_postgres',
-        bash_command='cd /opt/airflow && python3 -m etl.load_to_postgres',
-    )
+    for name in tasks.model_names():
+        with TaskGroup(group_id=name):
+            shards = plan_extract(name)
+            extracted = extract_shard.partial(name=name).expand(shard_index=shards)
+            loaded = extracted >> finish_extract(name) >> load(name)
+            if config.ETL_RECONCILE:
+                loaded >> reconcile(name)
 
-    extract_transform >> load_to_postgres
+    for name in tasks.aggregate_names():
+        with TaskGroup(group_id=name):
+            extract_aggregate(name) >> load_summary(name)
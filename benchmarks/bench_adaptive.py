@@ -0,0 +1,54 @@
+"""
+Fixed vs adaptive page sizing in OdooConnector.fetch_all_records, with retries.
+
+The stand-in charges a fixed latency per call plus a cost per returned row
+and fails a fraction of calls with HTTP 5xx, so small pages pay round trips,
+big pages risk timeouts, and every run has to retry:
+
+    python -m benchmarks.bench_adaptive --rows 200000 --latency 0.02 --latency-per-row 0.00002 --fault-rate 0.05
+"""
+import argparse
+import time
+
+from etl.batching import RetryPolicy
+from etl.connector import OdooConnector
+from .fake_odoo import FakeOdoo, serve_odoo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--model", default="sale.order.line")
+    parser.add_argument("--batch-size", type=int, default=1000, help="fixed size, and adaptive starting size")
+    parser.add_argument("--target-latency", type=float, default=1.0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--latency-per-row", type=float, default=0.00002)
+    parser.add_argument("--fault-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    fields = ["order_id", "product_id", "product_uom_qty", "price_unit", "price_subtotal"]
+    results = {}
+    for label, target_latency in (("fixed", None), ("adaptive", args.target_latency)):
+        odoo = FakeOdoo({args.model: args.rows}, latency=args.latency,
+                        latency_per_row=args.latency_per_row, fault_rate=args.fault_rate, seed=1)
+        with serve_odoo(odoo) as url:
+            connector = OdooConnector(url, "bench", "admin", "admin",
+                                      retry_policy=RetryPolicy(max_retries=8, base_delay=0.05))
+            start = time.perf_counter()
+            records = connector.fetch_all_records(
+                args.model, fields=fields, batch_size=args.batch_size, target_latency=target_latency
+            )
+            elapsed = time.perf_counter() - start
+        stats = connector.fetch_stats[args.model]
+        results[label] = records
+        print(f"{label:>8}: {len(records):>9} rows  {stats.calls:>5} calls  {stats.retries:>4} retries  "
+              f"{elapsed:8.2f}s  {len(records) / elapsed:>10.0f} rows/s")
+
+    identical = results["fixed"] == results["adaptive"]
+    print(f"identical results: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+End-to-end run of the pipeline against stand-ins: the real extract engine
+(OdooConnector, transforms, storage, checkpoints) reads from the fake Odoo
+in a child process, then the real PostgresLoader loads the files.
+
+    python -m benchmarks.bench_e2e --scale 1000000 --latency 0.02 --truncate
+    python -m benchmarks.bench_e2e --scale 100000 --skip-load
+
+--scale is the number of order lines; there are a quarter as many orders,
+plus the partners and products they reference. The load needs a reachable
+Postgres configured through the usual PG_* variables, and truncates the
+warehouse tables first, so point PG_DB at a scratch database.
+
+Throughput per stage and model comes from the runs' own metric reports.
+Every run is appended to <results-dir>/e2e.jsonl under the current commit,
+and compared with the last earlier run with the same parameters, so a
+regression shows up as a negative change next to the commit that caused it.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from config import config
+from etl import run_extracts
+from etl.connector import PROTOCOLS
+from etl.load_to_postgres import LOAD_METHODS, PostgresLoader, run_load_to_postgres
+from etl.registry import get_spec
+from etl.storage import STORAGES
+from .fake_odoo import fake_odoo_process
+
+MODELS = ["sales_orders", "products", "customers", "order_lines"]
+
+
+def synthetic_rows(scale: int) -> Dict[str, int]:
+    """Fake Odoo row counts for ``scale`` order lines (partners and products repeat past 5000/2000)."""
+    return {
+        "sale.order.line": scale,
+        "sale.order": max(scale // 4, 1),
+        "res.partner": min(scale, 5000),
+        "product.product": min(scale, 2000),
+        "res.country": 50,
+    }
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def read_stages(metrics_dir: str) -> List[Dict[str, Any]]:
+    """Stage entries of every metric report the run published."""
+    stages = []
+    for path in sorted(glob.glob(os.path.join(metrics_dir, "*.json"))):
+        with open(path) as f:
+            stages.extend(json.load(f)["stages"])
+    return stages
+
+
+def rows_per_second(stage: Dict[str, Any]) -> float:
+    # transform/write only record busy time, extract/load also wall time
+    seconds = stage["wall_seconds"] or stage["busy_seconds"]
+    return stage["rows"] / seconds if seconds else 0.0
+
+
+def previous_result(path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path) as f:
+        for line in f:
+            result = json.loads(line)
+            if result["params"] == params:
+                previous = result
+    return previous
+
+
+def truncate_tables() -> None:
+    loader = PostgresLoader()
+    try:
+        loader.create_tables([get_spec(name) for name in MODELS])
+        loader.cur.execute(f"TRUNCATE {', '.join(get_spec(name).table for name in MODELS)};")
+        loader.conn.commit()
+    finally:
+        loader.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=100_000, help="order lines (10k-10M)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every Odoo call")
+    parser.add_argument("--latency-per-row", type=float, default=0.0, help="seconds added per returned row")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="fraction of Odoo calls failing with 5xx")
+    parser.add_argument("--protocol", default="xmlrpc", choices=PROTOCOLS)
+    parser.add_argument("--storage", default="csv", choices=sorted(STORAGES))
+    parser.add_argument("--load-method", default="copy", choices=LOAD_METHODS)
+    parser.add_argument("--skip-load", action="store_true", help="extract only; no Postgres needed")
+    parser.add_argument("--truncate", action="store_true", help="confirm that the warehouse tables may be truncated")
+    parser.add_argument("--results-dir", default=os.path.join(os.path.dirname(__file__), "results"))
+    parser.add_argument("--label", default=None, help="name of this run in the results (default: git commit)")
+    args = parser.parse_args()
+    if not args.skip_load and not args.truncate:
+        parser.error("the load truncates the warehouse tables; re-run with --truncate against a scratch database")
+
+    logging.basicConfig(level=logging.WARNING)
+    params = {
+        "scale": args.scale, "latency": args.latency, "latency_per_row": args.latency_per_row,
+        "fault_rate": args.fault_rate, "protocol": args.protocol, "storage": args.storage,
+        "load_method": None if args.skip_load else args.load_method,
+        "batch_size": config.ODOO_BATCH_SIZE, "workers": config.ODOO_MAX_WORKERS,
+        "shards": config.ODOO_ORDER_LINE_SHARDS, "load_workers": config.PG_LOAD_WORKERS,
+        "dimension_cache": config.ETL_DIMENSION_CACHE_SIZE,
+    }
+    label = args.label or current_commit()
+    results_path = os.path.abspath(os.path.join(args.results_dir, "e2e.jsonl"))
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, fake_odoo_process(
+            synthetic_rows(args.scale), args.latency, args.latency_per_row, args.fault_rate) as url:
+        os.chdir(tmp)
+        config.ODOO_URL = url
+        config.ODOO_PROTOCOL = args.protocol
+        config.ETL_STORAGE_FORMAT = args.storage
+        config.ETL_MODELS = MODELS
+        config.PG_LOAD_METHODS = {name: args.load_method for name in MODELS}
+        config.ETL_METRICS_DIR = os.path.join(tmp, "metrics")
+        config.ETL_PROMETHEUS_TEXTFILE_DIR = ""
+        config.ETL_PUSHGATEWAY_URL = ""
+        try:
+            started = time.perf_counter()
+            run_extracts.main()
+            extract_seconds = time.perf_counter() - started
+            if not args.skip_load:
+                truncate_tables()
+                run_load_to_postgres()
+            total_seconds = time.perf_counter() - started
+            stages = read_stages(config.ETL_METRICS_DIR)
+        finally:
+            os.chdir(cwd)
+
+    result = {
+        "label": label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "params": params,
+        "extract_seconds": extract_seconds,
+        "total_seconds": total_seconds,
+        "stages": {f"{s['stage']}/{s['model']}": rows_per_second(s) for s in stages},
+    }
+    previous = previous_result(results_path, params)
+
+    print(f"{'stage/model':<24} {'rows':>10} {'rows/s':>10}  vs {previous['label'] if previous else '-'}")
+    for stage in stages:
+        key = f"{stage['stage']}/{stage['model']}"
+        change = ""
+        if previous and previous["stages"].get(key):
+            change = f"{(result['stages'][key] / previous['stages'][key] - 1) * 100:+.1f}%"
+        print(f"{key:<24} {stage['rows']:>10} {result['stages'][key]:>10.0f}  {change}")
+    total_change = f"  {(previous['total_seconds'] / total_seconds - 1) * 100:+.1f}%" if previous else ""
+    print(f"end to end: {total_seconds:.2f}s (extract {extract_seconds:.2f}s){total_change}")
+
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    with open(results_path, "a") as f:
+        f.write(json.dumps(result) + "\n")
+    print(f"appended to {results_path}")
+
+
+if __name__ == "__main__":
+    main()
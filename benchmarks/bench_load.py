@@ -0,0 +1,88 @@
+"""
+execute_batch vs execute_values vs COPY for PostgresLoader.load_file("order_lines", ...),
+and ParallelLoader (COPY, chunks committed separately) at several pool sizes.
+
+Needs a reachable Postgres configured through the usual PG_* variables.
+order_lines is truncated before every run, so point PG_DB at a scratch
+database and pass --truncate to confirm:
+
+    PG_DB=analytics_bench python -m benchmarks.bench_load --rows 1000000 --truncate
+    PG_DB=analytics_bench python -m benchmarks.bench_load --methods copy --workers 1 2 4 8 --truncate
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from etl.load_to_postgres import LOAD_METHODS, ParallelLoader, PostgresLoader
+from etl.registry import get_spec
+
+
+def synthetic_order_lines(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Order lines shaped like transform_order_lines output."""
+    rng = np.random.default_rng(seed)
+    qty = rng.integers(1, 10, rows).astype(float)
+    price = rng.integers(100, 20000, rows) / 100
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "order_id": np.arange(rows) // 4 + 1,
+        "product_id": rng.integers(1, 2000, rows),
+        "product_uom_qty": qty,
+        "price_unit": price,
+        "price_subtotal": np.round(qty * price, 2),
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--methods", nargs="+", default=list(LOAD_METHODS), choices=LOAD_METHODS)
+    parser.add_argument("--workers", nargs="*", type=int, default=[], help="ParallelLoader pool sizes to compare")
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--truncate", action="store_true", help="confirm that order_lines may be truncated")
+    args = parser.parse_args()
+    if not args.truncate:
+        parser.error("this benchmark truncates order_lines; re-run with --truncate against a scratch database")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "order_lines.csv")
+        synthetic_order_lines(args.rows).to_csv(path, index=False)
+
+        for method in args.methods:
+            loader = PostgresLoader(load_methods={"order_lines": method})
+            try:
+                loader.create_tables([get_spec("order_lines")])
+                loader.cur.execute("TRUNCATE order_lines;")
+                loader.conn.commit()
+                start = time.perf_counter()
+                loader.load_file("order_lines", path)
+                elapsed = time.perf_counter() - start
+                loader.cur.execute("SELECT count(*) FROM order_lines;")
+                loaded = loader.cur.fetchone()[0]
+            finally:
+                loader.close()
+            print(f"{method:>14}: {loaded:>9} rows  {elapsed:8.2f}s  {loaded / elapsed:>10.0f} rows/s")
+
+        for workers in args.workers:
+            truncate = PostgresLoader()
+            try:
+                truncate.cur.execute("TRUNCATE order_lines;")
+                truncate.conn.commit()
+            finally:
+                truncate.close()
+            parallel = ParallelLoader(max_workers=workers, chunk_rows=args.chunk_rows,
+                                      load_methods={"order_lines": "copy"})
+            try:
+                start = time.perf_counter()
+                loaded = parallel.load({"order_lines": path})["order_lines"]
+                elapsed = time.perf_counter() - start
+            finally:
+                parallel.close()
+            print(f"{f'{workers} workers':>14}: {loaded:>9} rows  {elapsed:8.2f}s  {loaded / elapsed:>10.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
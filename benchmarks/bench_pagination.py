@@ -0,0 +1,71 @@
+"""
+Keyset vs offset pagination in OdooConnector.fetch_all_records.
+
+Runs both modes against the local XML-RPC stand-in and checks they return
+the same rows:
+
+    python -m benchmarks.bench_pagination --rows 1000000 --batch-size 5000
+
+Every run is appended to <results-dir>/pagination.jsonl under the current commit.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from etl.connector import OdooConnector
+from .bench_e2e import current_commit
+from .fake_odoo import FakeOdoo, serve_odoo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--model", default="sale.order.line")
+    parser.add_argument("--domain-filter", action="store_true",
+                        help="add a non-indexed write_date term, as incremental runs do")
+    parser.add_argument("--results-dir", default=os.path.join(os.path.dirname(__file__), "results"))
+    parser.add_argument("--label", default=None, help="name of this run in the results (default: git commit)")
+    args = parser.parse_args()
+
+    domain = [("write_date", ">=", "1970-01-01 00:00:00")] if args.domain_filter else []
+    fields = ["order_id", "product_id", "product_uom_qty", "price_unit", "price_subtotal"]
+
+    odoo = FakeOdoo({args.model: args.rows})
+    with serve_odoo(odoo) as url:
+        connector = OdooConnector(url, "bench", "admin", "admin")
+        results, timings = {}, {}
+        for mode in ("keyset", "offset"):
+            odoo.calls = 0
+            start = time.perf_counter()
+            records = connector.fetch_all_records(
+                args.model, fields=fields, domain=domain, batch_size=args.batch_size, pagination=mode
+            )
+            elapsed = time.perf_counter() - start
+            results[mode] = records
+            timings[mode] = {"seconds": elapsed, "calls": odoo.calls, "rows_per_second": len(records) / elapsed}
+            print(f"{mode:>7}: {len(records):>9} rows  {odoo.calls:>5} calls  "
+                  f"{elapsed:8.2f}s  {len(records) / elapsed:>10.0f} rows/s")
+
+    identical = results["keyset"] == results["offset"]
+    print(f"identical results: {identical}")
+    results_path = os.path.abspath(os.path.join(args.results_dir, "pagination.jsonl"))
+    os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    with open(results_path, "a") as f:
+        f.write(json.dumps({
+            "label": args.label or current_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "params": {"rows": args.rows, "batch_size": args.batch_size, "model": args.model,
+                       "domain_filter": args.domain_filter},
+            "modes": timings,
+            "identical": identical,
+        }) + "\n")
+    print(f"appended to {results_path}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
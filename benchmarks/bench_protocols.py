@@ -0,0 +1,49 @@
+"""
+XML-RPC vs JSON-RPC: throughput and CPU per 100k records.
+
+The stand-in server runs in a separate process so client and server CPU
+can be measured independently:
+
+    python -m benchmarks.bench_protocols --rows 200000 --batch-size 2000
+"""
+import argparse
+import time
+
+from etl.connector import PROTOCOLS, OdooConnector
+from .fake_odoo import fake_odoo_process
+
+MODEL = "sale.order.line"
+FIELDS = ["order_id", "product_id", "product_uom_qty", "price_unit", "price_subtotal", "write_date"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    with fake_odoo_process({MODEL: args.rows}) as url:
+        results = {}
+        for protocol in PROTOCOLS:
+            connector = OdooConnector(url, "bench", "admin", "admin", protocol=protocol, gzip=args.gzip)
+            server_before = connector.common.stats()["cpu"]
+            wall, cpu = time.perf_counter(), time.process_time()
+            records = connector.fetch_all_records(MODEL, FIELDS, batch_size=args.batch_size)
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            server_cpu = connector.common.stats()["cpu"] - server_before
+            results[protocol] = records
+
+            per_100k = 100_000 / len(records)
+            print(f"{protocol:>8}: {len(records) / wall:>9.0f} rows/s  "
+                  f"per 100k rows: wall {wall * per_100k:6.2f}s  "
+                  f"client CPU {cpu * per_100k:6.2f}s  server CPU {server_cpu * per_100k:6.2f}s")
+
+    identical = results["xmlrpc"] == results["jsonrpc"]
+    print(f"identical results: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Cold-start cost of the pipeline's entry points, from `python -X importtime`:
+each module is imported in a fresh interpreter, and the cumulative import
+time is reported as the median of --runs, with the modules that spent the
+most time importing themselves. `python -m etl --help` is timed end to end.
+
+    python -m benchmarks.bench_startup --runs 7 --top 5
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+MODULES = ["config.config", "etl.registry", "etl.tasks", "etl.cli", "etl.run_extracts", "etl.load_to_postgres",
+           "etl.reconcile"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:       self [us] |  cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> Tuple[int, Dict[str, int]]:
+    """Cumulative microseconds of the top-level import, and self time per module."""
+    total, self_us = 0, {}
+    for match in IMPORTTIME_LINE.finditer(stderr):
+        own, cumulative, indent, module = match.groups()
+        self_us[module] = int(own)
+        if len(indent) == 1:
+            total += int(cumulative)
+    return total, self_us
+
+
+def import_time(module: str) -> Tuple[int, Dict[str, int]]:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=ROOT, check=True)
+    return parse_importtime(result.stderr)
+
+
+def command_seconds(args: List[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], capture_output=True, cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3, help="slowest modules listed per entry point")
+    args = parser.parse_args()
+
+    print(f"{'module':<22} {'import ms':>10}  slowest own imports")
+    for module in MODULES:
+        runs = [import_time(module) for _ in range(args.runs)]
+        total = statistics.median(total for total, _ in runs)
+        modules = {name: statistics.median(run[1].get(name, 0) for run in runs) for name in runs[0][1]}
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print(f"{module:<22} {total / 1000:>10.1f}  "
+              + ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in slowest))
+
+    help_seconds = statistics.median(command_seconds(["-m", "etl", "--help"]) for _ in range(args.runs))
+    print(f"python -m etl --help: {help_seconds * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+CSV vs Parquet as the extract -> load intermediate format.
+
+Writes transformed sales orders batch by batch, as run_extracts does, then
+reads them back with the loader's column projection:
+
+    python -m benchmarks.bench_storage --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from etl.storage import STORAGES, read_frame
+from etl.transform import transform_sales_orders
+
+LOAD_COLUMNS = [
+    "id", "name", "customer_id", "customer_name", "amount_total",
+    "state", "date_order", "order_month", "revenue_bucket"
+]
+
+
+def synthetic_sales_orders(rows: int, seed: int = 0) -> pd.DataFrame:
+    """search_read-shaped sale.order records, run through transform_sales_orders."""
+    rng = np.random.default_rng(seed)
+    partners = rng.integers(1, 5000, rows)
+    raw = pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "name": [f"SO{i:07d}" for i in range(1, rows + 1)],
+        "partner_id": [[int(p), f"Customer {p}"] for p in partners],
+        "amount_total": rng.integers(100, 300000, rows) / 100,
+        "state": rng.choice(["draft", "sent", "sale", "done", "cancel"], rows),
+        "date_order": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365 * 86400, rows), unit="s"),
+        "write_date": "2024-06-01 12:00:00",
+    })
+    raw["date_order"] = raw["date_order"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return transform_sales_orders(raw)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    df = synthetic_sales_orders(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, storage in STORAGES.items():
+            path = os.path.join(tmp, f"sales_orders{storage.extension}")
+            start = time.perf_counter()
+            with storage.open_writer(path) as writer:
+                for offset in range(0, len(df), args.batch_size):
+                    writer.write(df.iloc[offset:offset + args.batch_size])
+            write_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = read_frame(path, LOAD_COLUMNS)
+            read_s = time.perf_counter() - start
+
+            size_mb = os.path.getsize(path) / 2**20
+            print(f"{name:>8}: {size_mb:8.1f} MiB  write {write_s:6.2f}s  read {read_s:6.2f}s  "
+                  f"date_order dtype {loaded['date_order'].dtype}")
+
+
+if __name__ == "__main__":
+    main()
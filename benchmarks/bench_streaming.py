@@ -0,0 +1,74 @@
+"""
+Peak RSS of the list-based extract path vs the streaming batch pipeline.
+
+The stand-in server runs in this process; each path runs in a fresh child
+interpreter so its ru_maxrss only reflects the extraction itself:
+
+    python -m benchmarks.bench_streaming --rows 200000 --batch-size 1000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from .fake_odoo import FakeOdoo, serve_odoo
+
+MODEL = "sale.order.line"
+FIELDS = ["order_id", "product_id", "product_uom_qty", "price_unit", "price_subtotal", "write_date"]
+
+
+def _child(mode: str, url: str, batch_size: int, path: str) -> None:
+    import pandas as pd
+    from etl.connector import OdooConnector
+    from etl.run_extracts import write_batches_csv
+    from etl.transform import transform_order_lines
+
+    connector = OdooConnector(url, "bench", "admin", "admin")
+    start = time.perf_counter()
+    if mode == "list":
+        df = pd.DataFrame(connector.fetch_all_records(MODEL, FIELDS, batch_size=batch_size))
+        df = transform_order_lines(df)
+        df.to_csv(path, index=False)
+        rows = len(df)
+    else:
+        batches = connector.iter_batches(MODEL, FIELDS, batch_size=batch_size)
+        rows = write_batches_csv(batches, transform_order_lines, path)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>9}: {rows:>9} rows  {elapsed:7.2f}s  peak RSS {peak_mb:8.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "URL", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, url, path = args.child
+        _child(mode, url, args.batch_size, path)
+        return
+
+    with serve_odoo(FakeOdoo({MODEL: args.rows})) as url, tempfile.TemporaryDirectory() as tmp:
+        outputs = {}
+        for mode in ("list", "streaming"):
+            outputs[mode] = os.path.join(tmp, f"{mode}.csv")
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_streaming", "--batch-size", str(args.batch_size),
+                 "--child", mode, url, outputs[mode]],
+                check=True
+            )
+        with open(outputs["list"], "rb") as a, open(outputs["streaming"], "rb") as b:
+            identical = a.read() == b.read()
+    print(f"identical output: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+many2one parsing: per-cell ast.literal_eval vs the one-pass split_many2one.
+
+Values are shaped like search_read output ([id, name] lists, 10% False):
+
+    python -m benchmarks.bench_transform --rows 1000000
+"""
+import argparse
+import ast
+import time
+
+import pandas as pd
+
+from etl.transform import split_many2one
+
+
+def _literal_eval_id(val):
+    try:
+        return ast.literal_eval(str(val))[0]
+    except Exception:
+        return None
+
+
+def _literal_eval_name(val):
+    try:
+        return ast.literal_eval(str(val))[1]
+    except Exception:
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    series = pd.Series([[i % 5000 + 1, f"Customer {i % 5000 + 1}"] if i % 10 else False for i in range(args.rows)])
+
+    start = time.perf_counter()
+    old_ids = series.apply(_literal_eval_id)
+    old_names = series.apply(_literal_eval_name)
+    old_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ids, names = split_many2one(series)
+    new_elapsed = time.perf_counter() - start
+
+    print(f"literal_eval apply: {old_elapsed:8.3f}s")
+    print(f"split_many2one:     {new_elapsed:8.3f}s  ({old_elapsed / new_elapsed:.0f}x)")
+    identical = old_ids.astype("Int64").equals(ids) and old_names.fillna("").tolist() == names.fillna("").tolist()
+    print(f"identical results: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+transform_sales_orders: the row-wise version (apply + to_period().astype(str),
+object columns, full copy) vs the vectorized one. Reports time, peak memory
+allocated during the transform and the size of the resulting frame:
+
+    python -m benchmarks.bench_transform_orders --rows 5000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from etl.transform import split_many2one, transform_sales_orders
+
+STATES = np.array(["draft", "sent", "sale", "done", "cancel"], dtype=object)
+
+
+def synthetic_orders(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Orders shaped like to_frame(search_read(...)) output for sale.order."""
+    rng = np.random.default_rng(seed)
+    partners = rng.integers(1, 5000, rows)
+    dates = np.datetime64("2022-01-01") + rng.integers(0, 3 * 365 * 86400, rows).astype("timedelta64[s]")
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "name": [f"SO{i:07d}" for i in range(1, rows + 1)],
+        "partner_id": [[p, f"Customer {p}"] for p in partners.tolist()],
+        "amount_total": rng.integers(0, 300_000, rows) / 100,
+        "state": STATES[rng.integers(0, len(STATES), rows)],
+        "date_order": dates.astype("datetime64[ns]"),
+    })
+
+
+def rowwise_transform_sales_orders(df: pd.DataFrame) -> pd.DataFrame:
+    """transform_sales_orders as it was before vectorization."""
+    df = df.copy()
+    df["customer_id"], df["customer_name"] = split_many2one(df["partner_id"])
+    df = df.drop(columns=["partner_id"])
+
+    df["date_order"] = pd.to_datetime(df["date_order"])
+    df["order_month"] = df["date_order"].dt.to_period("M").astype(str)
+
+    def bucket(amount: float) -> str:
+        if amount < 500:
+            return "low"
+        elif amount < 1500:
+            return "medium"
+        else:
+            return "high"
+
+    df["revenue_bucket"] = df["amount_total"].apply(bucket)
+    return df
+
+
+def measure(transform, df: pd.DataFrame):
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = transform(df)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    df = synthetic_orders(args.rows)
+    old, old_elapsed, old_peak = measure(rowwise_transform_sales_orders, df)
+    new, new_elapsed, new_peak = measure(transform_sales_orders, df)
+
+    mb = 1024 * 1024
+    for label, out, elapsed, peak in (("row-wise", old, old_elapsed, old_peak),
+                                      ("vectorized", new, new_elapsed, new_peak)):
+        print(f"{label:>10}: {elapsed:8.3f}s  peak allocated {peak / mb:8.1f} MB  "
+              f"output {out.memory_usage(deep=True).sum() / mb:8.1f} MB")
+    print(f"speedup: {old_elapsed / new_elapsed:.1f}x")
+
+    identical = all(
+        old[col].astype(object).where(old[col].notna(), None).tolist()
+        == new[col].astype(object).where(new[col].notna(), None).tolist()
+        for col in ("id", "customer_id", "state", "order_month", "revenue_bucket")
+    )
+    print(f"identical results: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
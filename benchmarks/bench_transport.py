@@ -0,0 +1,89 @@
+"""
+XML-RPC calls per second: stock transport vs the pooled keep-alive transport.
+
+Each thread issues small search_read calls against the stand-in server. The
+"per-call" baseline opens a new connection for every call, which is what the
+stock transport does whenever the connection is not kept alive; add
+--handshake-ms to model the extra TCP/TLS round trips of a WAN link:
+
+    python -m benchmarks.bench_transport --calls 2000 --threads 4 --limit 1
+"""
+import argparse
+import threading
+import time
+import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
+
+from etl.transport import PooledTransport
+from .fake_odoo import FakeOdoo, serve_odoo
+
+
+class _PerCallTransport(xmlrpc.client.Transport):
+    """Stock transport that drops its connection after every call."""
+
+    def __init__(self, handshake: float) -> None:
+        super().__init__()
+        self.handshake = handshake
+
+    def make_connection(self, host):
+        if self.handshake:
+            time.sleep(self.handshake)
+        return super().make_connection(host)
+
+    def single_request(self, *args, **kwargs):
+        try:
+            return super().single_request(*args, **kwargs)
+        finally:
+            self.close()
+
+
+class _CountingPooledTransport(PooledTransport):
+    def __init__(self, handshake: float, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.handshake = handshake
+
+    def _new_connection(self, host):
+        if self.handshake:
+            time.sleep(self.handshake)
+        return super()._new_connection(host)
+
+
+def run(url: str, make_transport, shared: bool, calls: int, threads: int, limit: int) -> float:
+    local = threading.local()
+    transport = make_transport() if shared else None
+
+    def call(_):
+        if not hasattr(local, "proxy"):
+            local.proxy = xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/object", transport=transport or make_transport())
+        return local.proxy.execute_kw("bench", 2, "admin", "sale.order.line", "search_read", [[]],
+                                      {"fields": ["order_id", "price_subtotal"], "limit": limit})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for _ in pool.map(call, range(calls)):
+            pass
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=1, help="records per call; raise it to see gzip effects")
+    parser.add_argument("--handshake-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    handshake = args.handshake_ms / 1000
+
+    modes = {
+        "per-call": (lambda: _PerCallTransport(handshake), False),
+        "pooled": (lambda: _CountingPooledTransport(handshake, pool_size=args.threads), True),
+        "pooled+gzip": (lambda: _CountingPooledTransport(handshake, pool_size=args.threads, gzip=True), True),
+    }
+    with serve_odoo(FakeOdoo({"sale.order.line": 100_000})) as url:
+        for name, (make_transport, shared) in modes.items():
+            rate = run(url, make_transport, shared, args.calls, args.threads, args.limit)
+            print(f"{name:>12}: {rate:8.0f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,589 @@
+"""
+Local stand-in for an Odoo server, used by the benchmarks.
+
+It answers the XML-RPC (/xmlrpc/2/common, /xmlrpc/2/object) and JSON-RPC
+(/jsonrpc) endpoints the ETL uses. Run it on its own with
+
+    python -m benchmarks.fake_odoo --port 8069 --rows sale.order.line=1000000
+
+Records are synthesised on demand from their id, so a model can hold
+millions of rows without holding them in memory. Searches emulate what
+PostgreSQL does for Odoo: id bounds are an index seek, every other domain
+term and every skipped OFFSET row costs a scan.
+"""
+import argparse
+import gzip
+import json
+import logging
+import random
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import islice
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+logger = logging.getLogger(__name__)
+
+WRITE_DATE = "2024-06-01 12:00:00"
+STATES = ("draft", "sent", "sale", "done", "cancel")
+# Every n-th partner and product is archived (active=False)
+ARCHIVED_EVERY = 97
+
+
+def _sale_order(i: int) -> Dict[str, Any]:
+    return {
+        "id": i,
+        "name": f"SO{i:07d}",
+        "partner_id": [i % 5000 + 1, f"Customer {i % 5000 + 1}"],
+        "amount_total": float((i * 37) % 3000) + 0.5,
+        "state": STATES[i % len(STATES)],
+        "date_order": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:00:00",
+        "write_date": WRITE_DATE,
+    }
+
+
+def _sale_order_line(i: int) -> Dict[str, Any]:
+    order_id = (i - 1) // 4 + 1
+    qty = float(i % 7 + 1)
+    price = float(i % 200) + 0.99
+    return {
+        "id": i,
+        "order_id": [order_id, f"SO{order_id:07d}"],
+        "product_id": [i % 2000 + 1, f"Product {i % 2000 + 1}"],
+        "product_uom_qty": qty,
+        "price_unit": price,
+        "price_subtotal": round(qty * price, 2),
+        "write_date": WRITE_DATE,
+    }
+
+
+def _res_partner(i: int) -> Dict[str, Any]:
+    return {
+        "id": i,
+        "name": f"Customer {i}",
+        "email": f"customer{i}@example.com",
+        "phone": f"+1-555-{i:07d}",
+        "city": f"City {i % 300}",
+        "country_id": [i % 50 + 1, f"Country {i % 50 + 1}"] if i % 10 else False,
+        "customer_rank": 1,
+        "active": bool(i % ARCHIVED_EVERY),
+        "write_date": WRITE_DATE,
+    }
+
+
+def _product_product(i: int) -> Dict[str, Any]:
+    return {
+        "id": i,
+        "name": f"Product {i}",
+        "default_code": f"P{i:06d}" if i % 5 else False,
+        "list_price": float(i % 200) + 0.99,
+        "active": bool(i % ARCHIVED_EVERY),
+        "write_date": WRITE_DATE,
+    }
+
+
+def _res_country(i: int) -> Dict[str, Any]:
+    return {
+        "id": i,
+        "name": f"Country {i}",
+        "code": f"C{i:02d}",
+        "write_date": WRITE_DATE,
+    }
+
+
+MOVE_STATES = ("draft", "confirmed", "assigned", "done", "cancel")
+
+
+def _stock_move(i: int) -> Dict[str, Any]:
+    return {
+        "id": i,
+        "reference": f"WH/OUT/{i:05d}",
+        "product_id": [i % 2000 + 1, f"Product {i % 2000 + 1}"],
+        "product_uom_qty": float(i % 9 + 1),
+        "location_id": [8, "WH/Stock"],
+        "location_dest_id": [5, "Partners/Customers"],
+        "state": MOVE_STATES[i % len(MOVE_STATES)],
+        "date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} 09:30:00",
+        "write_date": WRITE_DATE,
+    }
+
+
+def _account_move_line(i: int) -> Dict[str, Any]:
+    move_id = (i - 1) // 3 + 1
+    amount = float((i * 53) % 5000) + 0.25
+    debit = i % 3 == 0
+    return {
+        "id": i,
+        "move_id": [move_id, f"INV/2024/{move_id:05d}"],
+        "account_id": [21 if debit else 28, "121000 Receivable" if debit else "400000 Sales"],
+        "partner_id": [i % 5000 + 1, f"Customer {i % 5000 + 1}"],
+        "product_id": False if debit else [i % 2000 + 1, f"Product {i % 2000 + 1}"],
+        "date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+        "quantity": float(i % 7 + 1),
+        "debit": amount if debit else 0.0,
+        "credit": 0.0 if debit else amount,
+        "balance": amount if debit else -amount,
+        "parent_state": "posted",
+        "write_date": WRITE_DATE,
+    }
+
+
+def _stock_quant(i: int) -> Dict[str, Any]:
+    return {
+        "id": i,
+        "product_id": [i % 2000 + 1, f"Product {i % 2000 + 1}"],
+        "location_id": [8, "WH/Stock"],
+        "quantity": float(i % 100),
+        "reserved_quantity": float(i % 5),
+        "write_date": WRITE_DATE,
+    }
+
+
+ROW_FACTORIES: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "sale.order": _sale_order,
+    "sale.order.line": _sale_order_line,
+    "res.partner": _res_partner,
+    "product.product": _product_product,
+    "res.country": _res_country,
+    "stock.move": _stock_move,
+    "account.move.line": _account_move_line,
+    "stock.quant": _stock_quant,
+}
+
+def _fields(**types: str) -> Dict[str, Dict[str, Any]]:
+    # A type ending in "*" is a non-stored computed field
+    return {
+        name: {"type": t.rstrip("*"), "store": not t.endswith("*"), "string": name.replace("_", " ").title()}
+        for name, t in {"id": "integer", **types, "write_date": "datetime"}.items()
+    }
+
+
+FIELDS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "sale.order": _fields(name="char", partner_id="many2one", amount_total="monetary", state="selection",
+                          date_order="datetime", order_line="one2many", amount_undiscounted="float*"),
+    "sale.order.line": _fields(order_id="many2one", product_id="many2one", product_uom_qty="float",
+                               price_unit="float", price_subtotal="monetary", qty_to_invoice="float*"),
+    "res.partner": _fields(name="char", email="char", phone="char", city="char", country_id="many2one",
+                           customer_rank="integer", active="boolean", image_1920="binary", total_invoiced="monetary*"),
+    "product.product": _fields(name="char", default_code="char", list_price="float", active="boolean",
+                               qty_available="float*", image_1920="binary"),
+    "res.country": _fields(name="char", code="char"),
+    "stock.move": _fields(reference="char", product_id="many2one", product_uom_qty="float",
+                          location_id="many2one", location_dest_id="many2one", state="selection",
+                          date="datetime", quantity_done="float*"),
+    "account.move.line": _fields(move_id="many2one", account_id="many2one", partner_id="many2one",
+                                 product_id="many2one", date="date", quantity="float", debit="monetary",
+                                 credit="monetary", balance="monetary", parent_state="selection"),
+    "stock.quant": _fields(product_id="many2one", location_id="many2one", quantity="float",
+                           reserved_quantity="float", available_quantity="float*"),
+}
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b,
+}
+
+_AGGREGATES: Dict[str, Callable[[List[Any]], Any]] = {
+    "sum": sum,
+    "avg": lambda values: sum(values) / len(values),
+    "min": min,
+    "max": max,
+    "count": len,
+}
+
+
+def _parse_aggregate(spec: str) -> Tuple[str, str, str]:
+    """(alias, function, field) of a read_group field spec."""
+    name, _, function = spec.partition(":")
+    if "(" in function:
+        function, field = function.rstrip(")").split("(")
+        return name, function, field
+    return name, function or "sum", name
+
+
+def _group_value(field_type: str, spec: str, row: Dict[str, Any]) -> Tuple[Any, Optional[Dict[str, str]]]:
+    """read_group value of row for a groupby spec, and its __range for date groupings."""
+    field, _, granularity = spec.partition(":")
+    value = row[field]
+    if field_type not in ("date", "datetime") or not value:
+        return value, None
+    day = date.fromisoformat(value[:10])
+    granularity = granularity or "month"
+    if granularity == "year":
+        start, end = day.replace(month=1, day=1), day.replace(year=day.year + 1, month=1, day=1)
+    elif granularity == "month":
+        start = day.replace(day=1)
+        end = (start + timedelta(days=31)).replace(day=1)
+    elif granularity == "day":
+        start, end = day, day + timedelta(days=1)
+    else:
+        raise ValueError(f"Granularity '{granularity}' is not supported by the stand-in")
+    suffix = " 00:00:00" if field_type == "datetime" else ""
+    label = start.strftime({"year": "%Y", "month": "%B %Y", "day": "%d %b %Y"}[granularity])
+    return label, {"from": start.isoformat() + suffix, "to": end.isoformat() + suffix}
+
+
+def _group_sort_key(value: Any, date_range: Optional[Dict[str, str]]) -> Any:
+    # date groups sort chronologically, many2one groups by id
+    if date_range:
+        return date_range["from"]
+    return value[0] if isinstance(value, list) else value
+
+
+class FakeOdoo:
+    """
+    In-memory Odoo model store exposing the RPC methods the ETL calls.
+
+    Besides a fixed ``latency`` per call, ``latency_per_row`` makes large pages
+    slower than small ones, and ``fault_rate`` fails that fraction of object
+    calls with an HTTP 503 (as an overloaded Odoo behind a proxy does).
+    ``seed`` makes the injected faults reproducible. Ids added to
+    ``deleted[model]`` behave as if unlinked.
+    """
+
+    def __init__(self, rows: Dict[str, int], uid: int = 2, latency: float = 0.0,
+                 latency_per_row: float = 0.0, fault_rate: float = 0.0, seed: Optional[int] = None) -> None:
+        unknown = set(rows) - set(ROW_FACTORIES)
+        if unknown:
+            raise ValueError(f"No synthetic data for models: {sorted(unknown)}")
+        self.rows = rows
+        self.uid = uid
+        self.latency = latency
+        self.latency_per_row = latency_per_row
+        self.fault_rate = fault_rate
+        self._random = random.Random(seed)
+        self.deleted: Dict[str, Set[int]] = {}
+        self.faults = 0
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    # --- common service ---
+    def authenticate(self, db: str, username: str, password: str, user_agent_env: Dict) -> Any:
+        return self.uid
+
+    def version(self) -> Dict[str, Any]:
+        return {"server_version": "15.0", "server_serie": "15.0"}
+
+    def stats(self) -> Dict[str, Any]:
+        """Call count and server-process CPU seconds, for benchmarks running it out of process."""
+        return {"calls": self.calls, "faults": self.faults, "cpu": time.process_time()}
+
+    def should_fail(self) -> bool:
+        """Draw whether the next object call gets an injected server error."""
+        if not self.fault_rate:
+            return False
+        with self._lock:
+            fail = self._random.random() < self.fault_rate
+            self.faults += fail
+        return fail
+
+    # --- object service ---
+    def execute_kw(self, db: str, uid: int, password: str, model: str, method: str,
+                   args: List[Any], kwargs: Optional[Dict[str, Any]] = None) -> Any:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            result = self._dispatch_kw(model, method, args, kwargs or {})
+            delay = self.latency + self.latency_per_row * (len(result) if isinstance(result, list) else 0)
+            if delay:
+                time.sleep(delay)
+            return result
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _dispatch_kw(self, model: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        if model not in self.rows:
+            raise ValueError(f"Object {model} doesn't exist")
+        if method == "search":
+            return self.search(model, args[0] if args else [], **kwargs)
+        if method == "search_read":
+            return self.search_read(model, args[0] if args else [], **kwargs)
+        if method == "read_group":
+            return self.read_group(model, *args, **kwargs)
+        if method == "fields_get":
+            attributes = kwargs.get("attributes")
+            return {
+                name: {k: v for k, v in meta.items() if not attributes or k in attributes}
+                for name, meta in FIELDS[model].items()
+            }
+        raise ValueError(f"Method '{method}' is not supported by the stand-in")
+
+    def search(self, model: str, domain: List[Any], offset: int = 0, limit: Optional[int] = None,
+               order: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> List[int]:
+        return self._search(model, domain, offset, limit, order, context)
+
+    def search_read(self, model: str, domain: List[Any], fields: Optional[List[str]] = None,
+                    offset: int = 0, limit: Optional[int] = None, order: Optional[str] = None,
+                    context: Optional[Dict[str, Any]] = None, load: str = "_classic_read") -> List[Dict]:
+        """Like Odoo's: display_name is the record's name, and a load other than "_classic_read" reads
+        many2one values as bare ids."""
+        ids = self._search(model, domain, offset, limit, order, context)
+        factory = ROW_FACTORIES[model]
+        records = [factory(i) for i in ids]
+        if fields and "display_name" in fields:
+            for r in records:
+                r["display_name"] = r["name"]
+        if fields:
+            wanted = set(fields) | {"id"}
+            records = [{k: v for k, v in r.items() if k in wanted} for r in records]
+        if load != "_classic_read":
+            records = [{k: v[0] if isinstance(v, list) else v for k, v in r.items()} for r in records]
+        return records
+
+    def read_group(self, model: str, domain: List[Any], fields: List[str], groupby: List[str],
+                   offset: int = 0, limit: Optional[int] = None, orderby: Optional[str] = None,
+                   lazy: bool = True, context: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Aggregate in the server like Odoo's read_group. Fields are "field",
+        "field:agg" or "alias:agg(field)"; groupby takes "field" or
+        "field:day|month|year". Groups come back in groupby order.
+        """
+        groupby = groupby[:1] if lazy else list(groupby)
+        aggregates = [_parse_aggregate(spec) for spec in fields if spec.split(":")[0] not in groupby]
+        lo, hi, predicates = self._plan(model, domain, context)
+        factory = ROW_FACTORIES[model]
+        groups: Dict[Tuple, Dict[str, Any]] = {}
+        for i in self._scan(model, lo, hi, predicates, descending=False):
+            row = factory(i)
+            values = [_group_value(FIELDS[model][spec.split(":")[0]]["type"], spec, row) for spec in groupby]
+            key = tuple(_group_sort_key(v, r) for v, r in values)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {spec: value for spec, (value, _) in zip(groupby, values)}
+                ranges = {spec: r for spec, (_, r) in zip(groupby, values) if r}
+                if ranges:
+                    group["__range"] = ranges
+                group["__count"] = 0
+                group["_values"] = {alias: [] for alias, _, _ in aggregates}
+            group["__count"] += 1
+            for alias, _, field in aggregates:
+                group["_values"][alias].append(row[field])
+
+        result = []
+        for key in sorted(groups, key=lambda k: [(v is None, v) for v in k]):
+            group = groups[key]
+            values = group.pop("_values")
+            for alias, function, _ in aggregates:
+                group[alias] = _AGGREGATES[function](values[alias])
+            result.append(group)
+        return result[offset:None if limit is None else offset + limit]
+
+    def _search(self, model: str, domain: List[Any], offset: int, limit: Optional[int],
+                order: Optional[str], context: Optional[Dict[str, Any]] = None) -> List[int]:
+        # write_date is the same on every synthetic row, so it never changes the id order
+        terms = [term.split() for term in (order or "id").split(",")]
+        if any(term[0] not in ("id", "write_date") for term in terms):
+            raise ValueError(f"Only ordering by id and write_date is supported, got '{order}'")
+        descending = terms[-1][-1].lower() == "desc"
+
+        lo, hi, predicates = self._plan(model, domain, context)
+        matching = self._scan(model, lo, hi, predicates, descending)
+        return list(islice(matching, offset, None if limit is None else offset + limit))
+
+    def _plan(self, model: str, domain: List[Any],
+              context: Optional[Dict[str, Any]] = None) -> Tuple[int, int, List[Tuple[str, str, Any]]]:
+        """
+        Turn id terms into an index range; keep the rest as row predicates.
+        Like Odoo, archived records are left out unless the domain mentions
+        active or the context sets active_test to False.
+        """
+        lo, hi = 1, self.rows[model] + 1
+        predicates = []
+        if ("active" in FIELDS[model] and (context or {}).get("active_test", True)
+                and not any(term[0] == "active" for term in domain if not isinstance(term, str))):
+            predicates.append(("active", "=", True))
+        for term in domain:
+            if isinstance(term, str):
+                if term != "&":
+                    raise ValueError(f"Domain operator '{term}' is not supported by the stand-in")
+                continue
+            field, op, value = term
+            if field == "id" and op == "in" and value:
+                # still a predicate; the bounds only narrow the scan
+                lo, hi = max(lo, min(value)), min(hi, max(value) + 1)
+            if field == "id" and op in (">", ">=", "<", "<="):
+                if op == ">":
+                    lo = max(lo, value + 1)
+                elif op == ">=":
+                    lo = max(lo, value)
+                elif op == "<":
+                    hi = min(hi, value)
+                else:
+                    hi = min(hi, value + 1)
+            else:
+                if op not in _OPERATORS:
+                    raise ValueError(f"Operator '{op}' is not supported by the stand-in")
+                predicates.append((field, op, value))
+        return lo, hi, predicates
+
+    def _scan(self, model: str, lo: int, hi: int, predicates: List[Tuple[str, str, Any]],
+              descending: bool) -> Iterator[int]:
+        ids = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+        deleted = self.deleted.get(model)
+        if deleted:
+            ids = (i for i in ids if i not in deleted)
+        if not predicates:
+            # Still a generator so that OFFSET pays for every row it skips.
+            return (i for i in ids)
+        factory = ROW_FACTORIES[model]
+
+        def matches(i: int) -> bool:
+            row = factory(i)
+            return all(_OPERATORS[op](row.get(field), value) for field, op, value in predicates)
+
+        return (i for i in ids if matches(i))
+
+
+class _RequestHandler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ("/xmlrpc/2/common", "/xmlrpc/2/object")
+    # Keep connections open between requests, as Odoo behind a reverse proxy does
+    protocol_version = "HTTP/1.1"
+
+    def log_error(self, format: str, *args: Any) -> None:
+        # Injected faults are expected; don't spam stderr with them
+        pass
+
+    def do_POST(self) -> None:
+        if self.path != "/jsonrpc":
+            return super().do_POST()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        request = json.loads(body)
+        params = request.get("params", {})
+        response: Dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+        odoo = self.server.instance
+        if params.get("service") == "object" and odoo.should_fail():
+            self.send_error(503, "Injected fault")
+            return
+        try:
+            if params.get("service") == "object":
+                if params.get("method") != "execute_kw":
+                    raise ValueError(f"Method '{params.get('method')}' is not supported by the stand-in")
+                response["result"] = odoo.execute_kw(*params.get("args", []))
+            elif params.get("method") in ("authenticate", "version", "stats"):
+                response["result"] = getattr(odoo, params["method"])(*params.get("args", []))
+            else:
+                raise ValueError(f"Unknown JSON-RPC call {params.get('service')}.{params.get('method')}")
+        except Exception as e:
+            response["error"] = {"code": 200, "message": "Odoo Server Error",
+                                 "data": {"name": type(e).__name__, "message": str(e)}}
+
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", "") and len(data) > self.encode_threshold:
+            data = gzip.compress(data)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _InjectedFault(Exception):
+    pass
+
+
+class _ThreadingXMLRPCServer(ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+    def _marshaled_dispatch(self, data, dispatch_method=None, path=None):
+        # Raising here (rather than in the method) makes the handler answer HTTP 500
+        # instead of marshalling an Odoo Fault.
+        if path == "/xmlrpc/2/object" and self.instance.should_fail():
+            raise _InjectedFault()
+        return super()._marshaled_dispatch(data, dispatch_method, path)
+
+
+def _make_server(odoo: FakeOdoo, host: str, port: int) -> _ThreadingXMLRPCServer:
+    server = _ThreadingXMLRPCServer(
+        (host, port), requestHandler=_RequestHandler, allow_none=True, logRequests=False
+    )
+    server.register_instance(odoo)
+    return server
+
+
+@contextmanager
+def serve_odoo(odoo: FakeOdoo, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Serve ``odoo`` over XML-RPC and JSON-RPC in a background thread and yield its base URL."""
+    server = _make_server(odoo, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def fake_odoo_process(rows: Dict[str, int], latency: float = 0.0, latency_per_row: float = 0.0,
+                      fault_rate: float = 0.0) -> Iterator[str]:
+    """
+    Run the stand-in in a child process and yield its URL, so that its CPU
+    time neither competes with nor is counted against the client under test.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_odoo", "--port", "0", "--latency", str(latency),
+         "--latency-per-row", str(latency_per_row), "--fault-rate", str(fault_rate),
+         "--rows", *(f"{model}={count}" for model, count in rows.items())],
+        stdout=subprocess.PIPE, text=True
+    )
+    try:
+        yield proc.stdout.readline().strip()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def parse_rows(specs: List[str]) -> Dict[str, int]:
+    """Parse ["sale.order=1000", ...] into {"sale.order": 1000, ...}."""
+    rows = {}
+    for spec in specs:
+        model, _, count = spec.partition("=")
+        rows[model] = int(count)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Odoo stand-in server in the foreground.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8069)
+    parser.add_argument("--rows", nargs="+", default=[f"{m}=10000" for m in ROW_FACTORIES],
+                        metavar="MODEL=COUNT")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every execute_kw call")
+    parser.add_argument("--latency-per-row", type=float, default=0.0, help="seconds added per returned row")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="fraction of object calls failing with 5xx")
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(parse_rows(args.rows), latency=args.latency,
+                    latency_per_row=args.latency_per_row, fault_rate=args.fault_rate)
+    server = _make_server(odoo, args.host, args.port)
+    # Print the bound address first so parent processes can wait on it with --port 0
+    print(f"http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
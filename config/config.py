@@ -1,8 +1,12 @@
 import os
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Local runs read a .env file; containers get the same variables from docker-compose's
+# env_file and have none, so they skip importing python-dotenv altogether.
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV_FILE = os.getenv("ETL_ENV_FILE", os.path.join(PROJECT_DIR, ".env"))
+if ENV_FILE and os.path.isfile(ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(ENV_FILE)
 
 # Odoo connection
 ODOO_URL = os.getenv("ODOO_URL", "http://localhost:8069")
@@ -10,9 +14,80 @@ ODOO_DB = os.getenv("ODOO_DB", "odooops_db")
 ODOO_USERNAME = os.getenv("ODOO_USERNAME", "odoo")
 ODOO_PASSWORD = os.getenv("ODOO_PASSWORD", "odoo")
 
+# Registry entries to run, e.g. "sales_orders,order_lines" (default: all of etl.registry.REGISTRY)
+ETL_MODELS = [name.strip() for name in os.getenv("ETL_MODELS", "").split(",") if name.strip()]
+# Summary tables aggregated by Odoo's read_group (etl.registry.AGGREGATES), e.g. "revenue_by_month";
+# none by default
+ETL_AGGREGATES = [name.strip() for name in os.getenv("ETL_AGGREGATES", "").split(",") if name.strip()]
+
+# Extraction concurrency: max in-flight Odoo calls, and id-range shards for large models
+ODOO_MAX_WORKERS = int(os.getenv("ODOO_MAX_WORKERS", "4"))
+ODOO_ORDER_LINE_SHARDS = int(os.getenv("ODOO_ORDER_LINE_SHARDS", "4"))
+
+# RPC transport: "xmlrpc" or "jsonrpc", socket timeout (seconds) and gzip encoding
+ODOO_PROTOCOL = os.getenv("ODOO_PROTOCOL", "xmlrpc")
+ODOO_TIMEOUT = float(os.getenv("ODOO_TIMEOUT", "60"))
+ODOO_GZIP = os.getenv("ODOO_GZIP", "false").lower() in ("1", "true", "yes")
+
+# search_read page size: initial size, and the per-call latency (seconds) it adapts toward (0 keeps it fixed)
+ODOO_BATCH_SIZE = int(os.getenv("ODOO_BATCH_SIZE", "1000"))
+ODOO_TARGET_LATENCY = float(os.getenv("ODOO_TARGET_LATENCY", "2.0"))
+# Retries per page for timeouts, dropped connections and HTTP 5xx, with jittered exponential backoff
+ODOO_MAX_RETRIES = int(os.getenv("ODOO_MAX_RETRIES", "3"))
+
 # PostgreSQL connection for analytics
 PG_HOST = os.getenv("PG_HOST", "localhost")
 PG_PORT = int(os.getenv("PG_PORT", "5432"))
 PG_DB = os.getenv("PG_DB", "analytics")
 PG_USER = os.getenv("PG_USER", "analyst")
 PG_PASSWORD = os.getenv("PG_PASSWORD", "analyst")
+
+# Per-table load method for PostgresLoader, e.g. "order_lines=copy,sales_orders=execute_values".
+# Tables not listed use execute_batch.
+PG_LOAD_METHODS = dict(
+    item.strip().split("=", 1) for item in os.getenv("PG_LOAD_METHODS", "").split(",") if item.strip()
+)
+
+# Parallel loading: pooled connections (tables and chunks loaded at once), rows per separately
+# committed chunk, retries of a chunk on connection errors/deadlocks, and the load sessions'
+# synchronous_commit ("off" trades the last commits before a server crash for speed; empty keeps the default)
+PG_LOAD_WORKERS = int(os.getenv("PG_LOAD_WORKERS", "4"))
+PG_LOAD_CHUNK_ROWS = int(os.getenv("PG_LOAD_CHUNK_ROWS", "200000"))
+PG_LOAD_RETRIES = int(os.getenv("PG_LOAD_RETRIES", "3"))
+PG_SYNCHRONOUS_COMMIT = os.getenv("PG_SYNCHRONOUS_COMMIT", "off")
+
+# Per-model extraction checkpoints: state file, pages per checkpointed part file, and how far
+# (seconds) each incremental run re-reads behind the previous watermark for late-committing rows
+ETL_CHECKPOINT_FILE = os.getenv("ETL_CHECKPOINT_FILE", "outputs/extract_state.json")
+ETL_CHECKPOINT_PAGES = int(os.getenv("ETL_CHECKPOINT_PAGES", "10"))
+ODOO_WATERMARK_OVERLAP = float(os.getenv("ODOO_WATERMARK_OVERLAP", "300"))
+
+# fields_get metadata cache used to validate field lists and type extracted columns
+ODOO_SCHEMA_CACHE = os.getenv("ODOO_SCHEMA_CACHE", "outputs/schema_cache.json")
+ODOO_SCHEMA_TTL = float(os.getenv("ODOO_SCHEMA_TTL", "86400"))
+
+# Many2one display names cached per run (etl.dimensions), in entries across all dimension models:
+# extracts then request bare ids and names are filled in locally; 0 makes Odoo send [id, name] pairs
+ETL_DIMENSION_CACHE_SIZE = int(os.getenv("ETL_DIMENSION_CACHE_SIZE", "1000000"))
+
+# OdooDataExtractor.extract(output="frame"): MB of typed pages held in memory before the rest of the
+# model is spilled to an Arrow file in ETL_SPILL_DIR and returned memory-mapped (0 never spills)
+ETL_EXTRACT_MEMORY_MB = float(os.getenv("ETL_EXTRACT_MEMORY_MB", "512"))
+ETL_SPILL_DIR = os.getenv("ETL_SPILL_DIR", "outputs/spill")
+
+# sales_orders.revenue_bucket: amount_total below the first threshold is "low", below the second
+# "medium", anything else "high"
+ETL_REVENUE_BUCKETS = [float(t) for t in os.getenv("ETL_REVENUE_BUCKETS", "500,1500").split(",")]
+
+# Reconciliation of warehouse tables with the records still live in Odoo (etl.reconcile):
+# "soft" sets deleted_at on rows deleted or archived in Odoo, "delete" removes them; empty disables it
+ETL_RECONCILE = os.getenv("ETL_RECONCILE", "")
+
+# Intermediate file format between extract and load: "csv" or "parquet" (needs pyarrow)
+ETL_STORAGE_FORMAT = os.getenv("ETL_STORAGE_FORMAT", "csv")
+
+# Run metrics: JSON report directory, and optional Prometheus outputs (node_exporter
+# textfile collector directory and/or Pushgateway URL); empty disables a target
+ETL_METRICS_DIR = os.getenv("ETL_METRICS_DIR", "outputs/metrics")
+ETL_PROMETHEUS_TEXTFILE_DIR = os.getenv("ETL_PROMETHEUS_TEXTFILE_DIR", "")
+ETL_PUSHGATEWAY_URL = os.getenv("ETL_PUSHGATEWAY_URL", "")
@@ -0,0 +1,78 @@
+import http.client
+import random
+import xmlrpc.client
+from dataclasses import dataclass
+
+
+class FixedBatchSize:
+    """Page size that never changes; the default for fetch_all_records."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        # Whether the last page filled its limit, i.e. more records may follow
+        self.last_page_full = True
+
+    def observe(self, rows: int, elapsed: float) -> None:
+        """Record a successful call that returned ``rows`` for a limit of ``size``."""
+        self.last_page_full = rows >= self.size
+
+    def shrink(self) -> None:
+        pass
+
+
+class AdaptiveBatchSize(FixedBatchSize):
+    """
+    Steers the search_read page size toward a target latency per call.
+
+    After each call the size is scaled by target_latency / elapsed, limited
+    to halving or doubling per step and to [min_size, max_size]. A failed
+    call halves it, since oversized pages are the usual cause of timeouts.
+    """
+
+    def __init__(
+        self,
+        initial: int = 1000,
+        target_latency: float = 2.0,
+        min_size: int = 50,
+        max_size: int = 20000
+    ) -> None:
+        super().__init__(max(min_size, min(initial, max_size)))
+        self.target_latency = target_latency
+        self.min_size = min_size
+        self.max_size = max_size
+
+    def observe(self, rows: int, elapsed: float) -> None:
+        super().observe(rows, elapsed)
+        if not self.last_page_full:
+            # A short (last) page says nothing about how a full page would perform
+            return
+        factor = max(0.5, min(2.0, self.target_latency / max(elapsed, 1e-3)))
+        self.size = max(self.min_size, min(self.max_size, int(self.size * factor)))
+
+    def shrink(self) -> None:
+        self.size = max(self.min_size, self.size // 2)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retries transient RPC failures with capped exponential backoff and full jitter.
+
+    Timeouts, dropped connections and HTTP 5xx/429 responses are retried;
+    Odoo faults (bad domain, access error, ...) are not, since they would
+    fail again.
+    """
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def is_retriable(self, exc: Exception) -> bool:
+        if isinstance(exc, xmlrpc.client.Fault):
+            return False
+        if isinstance(exc, xmlrpc.client.ProtocolError):
+            return exc.errcode >= 500 or exc.errcode == 429
+        return isinstance(exc, (OSError, http.client.HTTPException))
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
@@ -0,0 +1,126 @@
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ODOO_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# write_date lower bound of a full extraction
+FULL_EXTRACT_SINCE = "1970-01-01 00:00:00"
+
+
+@dataclass
+class Watermark:
+    """Newest (write_date, id) of a model, as reported by Odoo itself."""
+    write_date: str
+    id: int
+
+
+def incremental_since(watermark: Optional[Watermark], default: str, overlap_seconds: float = 0.0) -> str:
+    """
+    write_date lower bound for the next incremental run. Odoo stamps write_date
+    with the transaction start time, so a long transaction can commit rows
+    older than the watermark after it was taken; overlap_seconds re-reads that
+    window (the loader's upsert makes re-reads harmless).
+    """
+    if watermark is None:
+        return default
+    since = datetime.strptime(watermark.write_date, ODOO_DATETIME_FORMAT) - timedelta(seconds=overlap_seconds)
+    return since.strftime(ODOO_DATETIME_FORMAT)
+
+
+class CheckpointStore:
+    """
+    Per-model extraction state, persisted as JSON after every change.
+
+    For each job name it keeps the committed watermark of the last completed
+    run and, while a run is in progress, what that run needs to resume:
+    the write_date lower bound it started from, the watermark it will commit,
+    its id-range shards and, per shard, the last id written and the part
+    files written so far. Every access re-reads the file under an exclusive
+    lock and every change is written atomically, so shard sinks can record
+    progress concurrently from threads or from separate (Airflow task)
+    processes.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self, write: bool = False) -> Iterator[Dict[str, Dict[str, Any]]]:
+        with self._lock, open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            state: Dict[str, Dict[str, Any]] = {}
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    state = json.load(f).get("models", {})
+            yield state
+            if write:
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    json.dump({"models": state}, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+
+    def watermark(self, name: str) -> Optional[Watermark]:
+        with self._locked() as state:
+            saved = state.get(name, {}).get("watermark")
+        return Watermark(**saved) if saved else None
+
+    def pending_run(self, name: str) -> Optional[Dict[str, Any]]:
+        """The unfinished run for name, if the previous extraction stopped part way."""
+        with self._locked() as state:
+            return state.get(name, {}).get("run")
+
+    def start_run(self, name: str, since: str, target: Optional[Watermark],
+                  shards: List[Optional[Tuple[int, int]]]) -> None:
+        with self._locked(write=True) as state:
+            state.setdefault(name, {})["run"] = {
+                "since": since,
+                "target": asdict(target) if target else None,
+                "shards": [list(r) if r else None for r in shards],
+                "progress": {},
+            }
+
+    def shard_progress(self, name: str, shard_index: int) -> Dict[str, Any]:
+        """{"last_id", "parts": [[path, rows], ...], "done"} for one shard of the current run."""
+        with self._locked() as state:
+            progress = state[name]["run"]["progress"].get(str(shard_index))
+        return progress or {"last_id": 0, "parts": [], "done": False}
+
+    def record_part(self, name: str, shard_index: int, part: str, rows: int, last_id: int) -> None:
+        with self._locked(write=True) as state:
+            progress = state[name]["run"]["progress"].setdefault(
+                str(shard_index), {"last_id": 0, "parts": [], "done": False}
+            )
+            progress["parts"].append([part, rows])
+            progress["last_id"] = last_id
+
+    def finish_shard(self, name: str, shard_index: int) -> None:
+        with self._locked(write=True) as state:
+            progress = state[name]["run"]["progress"].setdefault(
+                str(shard_index), {"last_id": 0, "parts": [], "done": False}
+            )
+            progress["done"] = True
+
+    def reset(self, name: str) -> None:
+        """Make the next run of name a full extraction, forgetting any unfinished one."""
+        with self._locked(write=True) as state:
+            state[name] = {"watermark": asdict(Watermark(FULL_EXTRACT_SINCE, 0))}
+        logger.info(f"Watermark for '{name}' reset; its next extraction reads every record")
+
+    def complete_run(self, name: str) -> None:
+        """Commit the run's target watermark (if the model had any rows) and forget its progress."""
+        with self._locked(write=True) as state:
+            entry = state.setdefault(name, {})
+            run = entry.pop("run", None)
+            if run and run["target"]:
+                entry["watermark"] = run["target"]
+                logger.info(f"Watermark for '{name}' advanced to {run['target']}")
@@ -0,0 +1,138 @@
+"""
+One entry point for the pipeline's stages, run in a single process:
+
+    python -m etl extract load                # one run, then exit
+    python -m etl extract load reconcile --every 900 --models sales_orders,order_lines
+
+Stages run in the order given. With --every, the process stays up and
+starts a new run every that many seconds: imports, the Odoo session and
+the PostgreSQL connection pool (with the tables it has verified) are set
+up once instead of once per run, as separate `python -m etl.run_extracts`
+and `python -m etl.load_to_postgres` invocations do. A failed run is
+logged and the next one starts on schedule; SIGTERM/SIGINT stop the loop
+after the current stage.
+
+Only what a run needs is imported, when it needs it, so `--help` and
+argument errors return immediately.
+"""
+import argparse
+import logging
+import signal
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional
+
+from config import config
+
+if TYPE_CHECKING:
+    from .extractor import OdooDataExtractor
+    from .load_to_postgres import ParallelLoader
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("extract", "load", "reconcile")
+
+
+class Pipeline:
+    """
+    Runs stages over an Odoo session and a PostgreSQL pool that are each
+    opened on first use and then shared by every later run until close().
+    """
+
+    def __init__(self) -> None:
+        self._extractor: Optional["OdooDataExtractor"] = None
+        self._loader: Optional["ParallelLoader"] = None
+
+    @property
+    def extractor(self) -> "OdooDataExtractor":
+        if self._extractor is None:
+            from .extractor import OdooDataExtractor
+            self._extractor = OdooDataExtractor()
+        return self._extractor
+
+    @property
+    def loader(self) -> "ParallelLoader":
+        if self._loader is None:
+            from .load_to_postgres import ParallelLoader
+            self._loader = ParallelLoader()
+        return self._loader
+
+    def extract(self) -> None:
+        from .run_extracts import main as run_extracts
+        run_extracts(self.extractor)
+
+    def load(self) -> None:
+        from .load_to_postgres import run_load_to_postgres
+        run_load_to_postgres(self.loader)
+
+    def reconcile(self) -> None:
+        from .reconcile import reconcile
+        from .registry import enabled_specs
+        reconcile([spec.name for spec in enabled_specs()], extractor=self.extractor)
+
+    def run(self, stages: List[str], stop: Optional[threading.Event] = None) -> None:
+        for stage in stages:
+            if stop is not None and stop.is_set():
+                return
+            start = time.perf_counter()
+            getattr(self, stage)()
+            logger.info(f"Stage '{stage}' done in {time.perf_counter() - start:.1f}s")
+
+    def close(self) -> None:
+        if self._loader is not None:
+            self._loader.close()
+            self._loader = None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m etl", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    # not choices=STAGES: argparse would reject the empty default list
+    parser.add_argument("stages", nargs="*", metavar="STAGE",
+                        help=f"any of {', '.join(STAGES)} (default: extract load, plus reconcile "
+                             f"when ETL_RECONCILE is set)")
+    parser.add_argument("--every", type=float, default=0.0, metavar="SECONDS",
+                        help="keep running, starting a run every SECONDS")
+    parser.add_argument("--models", help="registry entries to run instead of ETL_MODELS, comma-separated")
+    parser.add_argument("--aggregates", help="summary tables to run instead of ETL_AGGREGATES, comma-separated")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s) {', '.join(unknown)}, expected any of {', '.join(STAGES)}")
+    if not args.stages:
+        args.stages = ["extract", "load"] + (["reconcile"] if config.ETL_RECONCILE else [])
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+    if args.models is not None:
+        config.ETL_MODELS = [name.strip() for name in args.models.split(",") if name.strip()]
+    if args.aggregates is not None:
+        config.ETL_AGGREGATES = [name.strip() for name in args.aggregates.split(",") if name.strip()]
+
+    stop = threading.Event()
+    if args.every:
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop.set())
+
+    pipeline = Pipeline()
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                pipeline.run(args.stages, stop)
+            except Exception:
+                if not args.every:
+                    raise
+                logger.exception(f"Run failed; the next one starts in {args.every:.0f}s")
+            if not args.every or stop.wait(max(0.0, args.every - (time.monotonic() - started))):
+                break
+    finally:
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    main()
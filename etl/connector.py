@@ -1,23 +1,99 @@
+import copy
+import threading
+import time
 import xmlrpc.client
 import logging
-from typing import List, Optional, Any, Dict
+from dataclasses import dataclass
+from typing import List, Optional, Any, Dict, Iterator, Tuple
+
+from .batching import AdaptiveBatchSize, FixedBatchSize, RetryPolicy
+from .transport import JsonRpcProxy, JsonRpcTransport, PooledTransport
 
 logger = logging.getLogger(__name__)
 
+PAGINATION_MODES = ("keyset", "offset")
+PROTOCOLS = ("xmlrpc", "jsonrpc")
+
+@dataclass
+class FetchStats:
+    """
+    Per-model search_read totals; seconds is the sum of call latencies.
+    read_group calls are counted separately, under "<model>:read_group", and
+    name lookups (fetch_names) under "<model>:names".
+    """
+    rows: int = 0
+    calls: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
 class OdooConnector:
-    """Handles authentication and queries to Odoo via XML-RPC"""
+    """
+    Handles authentication and queries to Odoo via XML-RPC or JSON-RPC.
+
+    protocol picks the wire format; both expose the same authenticate and
+    execute_kw calls, so every query method behaves identically on either.
+    """
 
-    def __init__(self, url: str, db: str, username: str, password: str) -> None:
+    def __init__(
+        self,
+        url: str,
+        db: str,
+        username: str,
+        password: str,
+        timeout: Optional[float] = 60.0,
+        gzip: bool = False,
+        pool_size: int = 8,
+        transport: Optional[Any] = None,
+        protocol: str = "xmlrpc",
+        retry_policy: Optional[RetryPolicy] = None
+    ) -> None:
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol '{protocol}', expected one of {PROTOCOLS}")
         self.url = url
         self.db = db
         self.username = username
         self.password = password
+        self.protocol = protocol
+        self.retry_policy = retry_policy or RetryPolicy()
         self.uid: Optional[int] = None
+        # Shared with clones, so shards of one model add up
+        self.fetch_stats: Dict[str, FetchStats] = {}
+        self._stats_lock = threading.Lock()
+        # Keep-alive connection pool shared by this connector and its clones
+        if transport is None:
+            transport_cls = JsonRpcTransport if protocol == "jsonrpc" else PooledTransport
+            transport = transport_cls(
+                use_https=url.startswith("https"), pool_size=pool_size, timeout=timeout, gzip=gzip
+            )
+        self.transport = transport
 
-        self.common = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/common")
-        self.models = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/object")
+        self._create_proxies()
         self.authenticate()
 
+    def _create_proxies(self) -> None:
+        if self.protocol == "jsonrpc":
+            self.common = JsonRpcProxy(self.url, "common", self.transport)
+            self.models = JsonRpcProxy(self.url, "object", self.transport)
+        else:
+            self.common = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/common", transport=self.transport)
+            self.models = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/object", transport=self.transport)
+
+    def clone(self) -> "OdooConnector":
+        """
+        Return a connector with its own ServerProxy objects that reuses this session's uid.
+        The proxies share the thread-safe connection pool, so worker threads can each
+        use a clone without paying for new connections.
+        """
+        other = copy.copy(self)
+        other._create_proxies()
+        return other
+
     def authenticate(self) -> None:
         try:
             self.uid = self.common.authenticate(self.db, self.username, self.password, {})
@@ -28,13 +104,274 @@ class OdooConnector:
             logger.error(f"Failed to authenticate to Odoo: {e}")
             raise
 
+    def _execute_kw(self, model: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        return self.models.execute_kw(
+            self.db,
+            self.uid,
+            self.password,
+            model,
+            method,
+            args,
+            kwargs
+        )
+
+    def fields_get(self, model: str, attributes: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Field metadata of model, limited to the given attributes (e.g. type, store)."""
+        try:
+            return self._execute_kw(model, "fields_get", [], {"attributes": attributes or []})
+        except Exception as e:
+            logger.error(f"Error fetching fields of model '{model}': {e}")
+            raise
+
+    def _search_read(
+        self,
+        model: str,
+        domain: List[Any],
+        kwargs: Dict[str, Any],
+        sizer: Optional[FixedBatchSize] = None
+    ) -> List[Dict[str, Any]]:
+        return self._call_paged(model, "search_read", [domain], kwargs, sizer)
+
+    def _call_paged(
+        self,
+        model: str,
+        method: str,
+        args: List[Any],
+        kwargs: Dict[str, Any],
+        sizer: Optional[FixedBatchSize] = None,
+        stats_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Call a paged read method (search_read, read_group) with retries. When a
+        sizer is given, its current size is used as the limit; it is told how long
+        each call took and shrunk on failures, and the call is counted in
+        fetch_stats under stats_key (metadata lookups are not). stats_key
+        defaults to the model for search_read and "<model>:<method>" otherwise.
+        """
+        take_wire_bytes = getattr(self.transport, "take_wire_bytes", lambda: (0, 0))
+        take_wire_bytes()
+        stats_key = stats_key or (model if method == "search_read" else f"{model}:{method}")
+        attempt = 0
+        while True:
+            if sizer is not None:
+                kwargs = {**kwargs, "limit": sizer.size}
+            start = time.perf_counter()
+            try:
+                batch = self._execute_kw(model, method, args, kwargs)
+            except Exception as e:
+                attempt += 1
+                if attempt > self.retry_policy.max_retries or not self.retry_policy.is_retriable(e):
+                    logger.error(f"Error fetching batch from model '{model}': {e}")
+                    raise
+                if sizer is not None:
+                    sizer.shrink()
+                delay = self.retry_policy.delay(attempt)
+                logger.warning(f"Retrying batch from model '{model}' in {delay:.1f}s "
+                               f"(attempt {attempt}/{self.retry_policy.max_retries}): {e}")
+                if sizer is not None:
+                    sent, received = take_wire_bytes()
+                    self._record_stats(stats_key, retries=1, bytes_sent=sent, bytes_received=received)
+                time.sleep(delay)
+                continue
+
+            elapsed = time.perf_counter() - start
+            if sizer is not None:
+                sizer.observe(len(batch), elapsed)
+                sent, received = take_wire_bytes()
+                self._record_stats(stats_key, rows=len(batch), calls=1, seconds=elapsed,
+                                   bytes_sent=sent, bytes_received=received)
+            return batch
+
+    def _record_stats(self, model: str, **deltas: float) -> None:
+        with self._stats_lock:
+            stats = self.fetch_stats.setdefault(model, FetchStats())
+            for key, value in deltas.items():
+                setattr(stats, key, getattr(stats, key) + value)
+
+    def fetch_id_bounds(self, model: str, domain: Optional[List[Any]] = None) -> Optional[Tuple[int, int]]:
+        """Return the (min, max) id matching domain, or None when nothing matches."""
+        domain = domain or []
+        first = self._search_read(model, domain, {"fields": ["id"], "limit": 1, "order": "id asc"})
+        if not first:
+            return None
+        last = self._search_read(model, domain, {"fields": ["id"], "limit": 1, "order": "id desc"})
+        return first[0]["id"], last[0]["id"]
+
+    def fetch_latest_write(self, model: str, domain: Optional[List[Any]] = None) -> Optional[Tuple[str, int]]:
+        """Return the (write_date, id) of the most recently written record matching domain, or None."""
+        latest = self._search_read(
+            model, domain or [], {"fields": ["write_date"], "limit": 1, "order": "write_date desc, id desc"}
+        )
+        if not latest:
+            return None
+        return latest[0]["write_date"], latest[0]["id"]
+
+    def iter_batches(
+        self,
+        model: str,
+        fields: Optional[List[str]] = None,
+        domain: Optional[List[Any]] = None,
+        batch_size: int = 1000,
+        additional_filter: Optional[List[Any]] = None,
+        pagination: str = "keyset",
+        target_latency: Optional[float] = None,
+        many2one_ids: bool = False
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield matching records one batch at a time, in ascending id order.
+
+        Only the current batch is held in memory, so callers that process and
+        discard each batch stay bounded by batch_size rather than table size.
+        Takes the same parameters as fetch_all_records, plus many2one_ids: read
+        many2one fields as bare ids instead of [id, display_name] pairs, which
+        spares Odoo the name lookups and the wire the repeated names.
+        """
+        if pagination not in PAGINATION_MODES:
+            raise ValueError(f"Unknown pagination mode '{pagination}', expected one of {PAGINATION_MODES}")
+
+        domain = domain or []
+        if additional_filter:
+            domain = domain + additional_filter
+
+        fields = fields or []
+        sizer = AdaptiveBatchSize(batch_size, target_latency) if target_latency else FixedBatchSize(batch_size)
+        # search_read passes extra keywords on to read(), where any load but "_classic_read" skips name_get
+        read_kwargs: Dict[str, Any] = {"load": ""} if many2one_ids else {}
+
+        rows = 0
+        start = time.perf_counter()
+        if pagination == "keyset":
+            last_id = 0
+            while True:
+                batch = self._search_read(
+                    model,
+                    domain + [("id", ">", last_id)],
+                    {"fields": fields, "order": "id asc", **read_kwargs},
+                    sizer
+                )
+                if not batch:
+                    break
+
+                rows += len(batch)
+                last_id = batch[-1]["id"]
+                logger.info(f"Fetched batch of {len(batch)} from '{model}', last id {last_id}")
+                yield batch
+                if not sizer.last_page_full:
+                    break
+        else:
+            offset = 0
+            while True:
+                batch = self._search_read(
+                    model,
+                    domain,
+                    {"fields": fields, "offset": offset, "order": "id asc", **read_kwargs},
+                    sizer
+                )
+                if not batch:
+                    break
+
+                rows += len(batch)
+                offset += len(batch)
+                logger.info(f"Fetched batch of {len(batch)} from '{model}', offset {offset}")
+                yield batch
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Fetched {rows} rows from '{model}' in {elapsed:.1f}s "
+                    f"({rows / elapsed if elapsed else 0:.0f} rows/s, final batch size {sizer.size})")
+
+    def iter_ids(
+        self,
+        model: str,
+        domain: Optional[List[Any]] = None,
+        batch_size: int = 50_000,
+        active_test: bool = True
+    ) -> Iterator[List[int]]:
+        """
+        Yield the ids matching domain in ascending order, a page at a time, with
+        search instead of search_read: no field is read, so pages can be far
+        larger than record batches. active_test=False includes archived records.
+        """
+        sizer = FixedBatchSize(batch_size)
+        kwargs: Dict[str, Any] = {"order": "id asc"}
+        if not active_test:
+            kwargs["context"] = {"active_test": False}
+        last_id = 0
+        while True:
+            ids = self._call_paged(model, "search", [(domain or []) + [("id", ">", last_id)]], kwargs, sizer)
+            if not ids:
+                break
+            last_id = ids[-1]
+            yield ids
+            if not sizer.last_page_full:
+                break
+
+    def fetch_names(self, model: str, ids: List[int], batch_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        id and display_name of the records with the given ids, archived ones
+        included, batch_size ids per call. Ids that no longer exist are left out.
+        """
+        records: List[Dict[str, Any]] = []
+        for start in range(0, len(ids), batch_size):
+            chunk = list(ids[start:start + batch_size])
+            records.extend(self._call_paged(
+                model,
+                "search_read",
+                [[("id", "in", chunk)]],
+                {"fields": ["display_name"], "context": {"active_test": False}},
+                FixedBatchSize(len(chunk)),
+                stats_key=f"{model}:names"
+            ))
+        return records
+
+    def iter_groups(
+        self,
+        model: str,
+        groupby: List[str],
+        aggregates: List[str],
+        domain: Optional[List[Any]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield read_group results a page of groups at a time, so Odoo's SQL does
+        the aggregation and only one row per group crosses the wire.
+
+        Params:
+        - groupby: fields to group on, with an optional date granularity
+          (e.g. ["date_order:month", "state"]); lazy=False groups on all of them
+          at once, so each group is one combination of their values
+        - aggregates: read_group field specs, e.g. "revenue:sum(amount_total)";
+          every group also carries its row count as "__count"
+        - batch_size: groups per call; pages are taken with offset/limit in
+          groupby order, which stays cheap as groups are few compared to rows
+        """
+        sizer = FixedBatchSize(batch_size)
+        orderby = ", ".join(spec.split(":")[0] for spec in groupby)
+        offset = 0
+        while True:
+            groups = self._call_paged(
+                model,
+                "read_group",
+                [domain or [], aggregates, groupby],
+                {"offset": offset, "orderby": orderby, "lazy": False},
+                sizer
+            )
+            if not groups:
+                break
+            offset += len(groups)
+            logger.info(f"Fetched {len(groups)} groups of '{model}' by {groupby}, offset {offset}")
+            yield groups
+            if not sizer.last_page_full:
+                break
+
     def fetch_all_records(
         self,
         model: str,
         fields: Optional[List[str]] = None,
         domain: Optional[List[Any]] = None,
         batch_size: int = 1000,
-        additional_filter: Optional[List[Any]] = None
+        additional_filter: Optional[List[Any]] = None,
+        pagination: str = "keyset",
+        target_latency: Optional[float] = None
     ) -> List[Any]:
         """
         Fetch all records for a model in batches with optional incremental filter.
@@ -45,39 +382,19 @@ class OdooConnector:
         - domain: base domain filters (list)
         - batch_size: batch size per request
         - additional_filter: extra domain filters (e.g. date filters for incremental load)
+        - pagination: "keyset" pages on ('id', '>', last_id) ordered by id, so each
+          batch is an index seek; "offset" pages with limit/offset (deeper scan per batch)
+        - target_latency: seconds per call to steer the batch size toward, starting
+          from batch_size; None keeps batch_size fixed
 
         Returns:
-        - list of all matching records
+        - list of all matching records, ordered by id
         """
-        domain = domain or []
-        if additional_filter:
-            domain = domain + additional_filter
-
-        fields = fields or []
-
         all_records = []
-        offset = 0
-        while True:
-            try:
-                batch = self.models.execute_kw(
-                    self.db,
-                    self.uid,
-                    self.password,
-                    model,
-                    "search_read",
-                    [domain],
-                    {"fields": fields, "limit": batch_size, "offset": offset}
-                )
-            except Exception as e:
-                logger.error(f"Error fetching batch from model '{model}': {e}")
-                raise
-
-            if not batch:
-                break
-
+        for batch in self.iter_batches(
+            model, fields, domain, batch_size, additional_filter, pagination, target_latency
+        ):
             all_records.extend(batch)
-            offset += batch_size
-            logger.info(f"Fetched batch of {len(batch)} from '{model}', offset {offset}")
 
         logger.info(f"Total records fetched from '{model}': {len(all_records)}")
         return all_records
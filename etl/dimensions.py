@@ -0,0 +1,158 @@
+"""
+Per-run cache of many2one display names.
+
+Odoo sends a many2one as [id, display_name], so a fact table repeats its
+customers' names on every row: over the wire, in the XML/JSON decoder and
+as one string object per row. With ETL_DIMENSION_CACHE_SIZE set, extracts
+read many2one fields as bare ids (OdooConnector.iter_batches(many2one_ids=True))
+and the fields a transform keeps names of (ModelSpec.dimensions) are filled
+in here: each distinct id is looked up in Odoo once per run, and every row
+shares the cached string.
+
+Names are kept per model in sorted id arrays searched with searchsorted,
+rather than dicts of Python ints, and the least recently used ids are
+evicted once the cache holds more than max_entries.
+"""
+import logging
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .connector import OdooConnector
+from .transform import RESOLVED_NAME_SUFFIX, split_many2one
+
+logger = logging.getLogger(__name__)
+
+
+class _NameMap:
+    """Sorted ids, their names and the tick each was last used at, as parallel arrays."""
+
+    def __init__(self) -> None:
+        self.ids = np.empty(0, dtype=np.int64)
+        self.names = np.empty(0, dtype=object)
+        self.used = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def find(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of keys in ids, and whether each was found there."""
+        if not len(self.ids):
+            return np.zeros(len(keys), dtype=np.int64), np.zeros(len(keys), dtype=bool)
+        positions = np.searchsorted(self.ids, keys).clip(max=len(self.ids) - 1)
+        return positions, self.ids[positions] == keys
+
+    def add(self, ids: np.ndarray, names: np.ndarray, tick: int) -> None:
+        """
+        Add sorted ids that are not in the map yet. They are merged in at their
+        searchsorted positions: one copy of the arrays, rather than a re-sort of
+        the whole map per batch.
+        """
+        positions = np.searchsorted(self.ids, ids)
+        self.ids = np.insert(self.ids, positions, ids)
+        self.names = np.insert(self.names, positions, names)
+        self.used = np.insert(self.used, positions, tick)
+
+    def keep(self, mask: np.ndarray) -> None:
+        self.ids, self.names, self.used = self.ids[mask], self.names[mask], self.used[mask]
+
+
+class DimensionCache:
+    """
+    id -> display_name per Odoo model, fetched on first use with
+    OdooConnector.fetch_names, batch_size ids per call. Thread-safe, so the
+    shards of one run share it: the lock only guards the arrays, and each
+    thread fetches its misses without it, on its own connector clone, so the
+    other shards' lookups go on meanwhile. Ids Odoo no longer has are cached
+    as None.
+    """
+
+    def __init__(self, connector: OdooConnector, max_entries: int = 1_000_000, batch_size: int = 1000) -> None:
+        self.connector = connector
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._maps: Dict[str, _NameMap] = {}
+        self._tick = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        return sum(len(names) for names in self._maps.values())
+
+    def names(self, model: str, ids: np.ndarray) -> np.ndarray:
+        """Display names (object array, None when unknown) of model's records ids."""
+        keys = np.asarray(ids, dtype=np.int64)
+        fetched_ids = np.empty(0, dtype=np.int64)
+        fetched_names = np.empty(0, dtype=object)
+        fetched = 0
+        while True:
+            with self._lock:
+                self._tick += 1
+                names = self._maps.setdefault(model, _NameMap())
+                if len(fetched_ids):
+                    # Another thread may have added some of them meanwhile
+                    _, known = names.find(fetched_ids)
+                    names.add(fetched_ids[~known], fetched_names[~known], self._tick)
+                positions, found = names.find(keys)
+                if found.all():
+                    names.used[positions] = self._tick
+                    result = names.names[positions]
+                    self.misses += fetched
+                    self.hits += len(np.unique(keys)) - fetched
+                    self._evict()
+                    return result
+                missing = np.unique(keys[~found])
+            # Without the lock; ids evicted by another thread meanwhile are fetched on the next pass
+            fetched_ids, fetched_names = missing, self._fetch(model, missing)
+            fetched += len(missing)
+
+    def _thread_connector(self) -> OdooConnector:
+        connector = getattr(self._local, "connector", None)
+        if connector is None:
+            connector = self.connector.clone()
+            self._local.connector = connector
+        return connector
+
+    def _fetch(self, model: str, ids: np.ndarray) -> np.ndarray:
+        records = self._thread_connector().fetch_names(model, ids.tolist(), self.batch_size)
+        names = np.full(len(ids), None, dtype=object)
+        if records:
+            fetched = np.fromiter((r["id"] for r in records), dtype=np.int64, count=len(records))
+            names[np.searchsorted(ids, fetched)] = [r["display_name"] or None for r in records]
+        logger.info(f"Fetched {len(records)} '{model}' names ({len(ids) - len(records)} ids not found)")
+        return names
+
+    def _evict(self) -> None:
+        size = len(self)
+        if size <= self.max_entries:
+            return
+        # The max_entries most recently used ids stay; ties at the cut stay too
+        used = np.concatenate([names.used for names in self._maps.values()])
+        cutoff = np.partition(used, size - self.max_entries)[size - self.max_entries]
+        for names in self._maps.values():
+            names.keep(names.used >= cutoff)
+        self.evictions += size - len(self)
+
+    def resolve(self, df: pd.DataFrame, dimensions: Dict[str, str]) -> pd.DataFrame:
+        """
+        Resolve the bare-id many2one columns of df named in dimensions (field -> model):
+        each becomes a nullable integer id column, with the display names next to it
+        in <field>__name, which the transforms take as they are (see
+        etl.transform.many2one_columns) instead of splitting [id, name] pairs per row.
+        """
+        resolved = {}
+        for field, model in dimensions.items():
+            if field not in df.columns:
+                continue
+            ids, _ = split_many2one(df[field])
+            present = ids.notna().to_numpy()
+            names = np.full(len(df), None, dtype=object)
+            names[present] = self.names(model, ids.to_numpy(dtype=np.int64, na_value=0)[present])
+            resolved[field] = ids
+            resolved[field + RESOLVED_NAME_SUFFIX] = pd.Series(names, index=df.index, dtype=object)
+        return df.assign(**resolved) if resolved else df
@@ -1,32 +1,185 @@
-from typing import List, Optional
+"""
+High-level extraction API over one Odoo session:
+
+    extractor = OdooDataExtractor()
+    df = extractor.extract("res.partner", ["name", "country_id"])
+    for chunk in extractor.extract("sale.order.line", output="chunks"):
+        ...
+    for batch in extractor.extract("sale.order.line", output="arrow"):
+        ...
+
+Fields are checked against fields_get (cached in ODOO_SCHEMA_CACHE) and the
+columns typed from it, as in the pipeline's own extracts. "chunks" (DataFrames)
+and "arrow" (pyarrow RecordBatches) stream, a page at a time, as they are
+consumed. A "frame" is assembled in memory up to ETL_EXTRACT_MEMORY_MB; past
+that, the pages are spilled to an Arrow IPC file in ETL_SPILL_DIR that the
+returned frame memory-maps, so the OS pages the data in as it is read
+instead of the process holding all of it. Such a frame has Arrow-backed
+columns (pd.ArrowDtype, many2one fields as {id, name} structs).
+"""
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional
 import os
-import pandas as pd
 import logging
+import tempfile
 
+from .batching import RetryPolicy
 from .connector import OdooConnector
 from config import config
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from .schema import SchemaCache
+
 logger = logging.getLogger(__name__)
 
+EXTRACT_OUTPUTS = ("frame", "chunks", "arrow")
+
 class OdooDataExtractor:
+    """
+    An authenticated Odoo session with its fields_get cache. The pipeline
+    stages (etl.run_extracts, etl.reconcile, etl.cli) share one instance.
+    """
+
     def __init__(self) -> None:
         self.connector = OdooConnector(
             url=config.ODOO_URL,
             db=config.ODOO_DB,
             username=config.ODOO_USERNAME,
-            password=config.ODOO_PASSWORD
+            password=config.ODOO_PASSWORD,
+            timeout=config.ODOO_TIMEOUT,
+            gzip=config.ODOO_GZIP,
+            pool_size=config.ODOO_MAX_WORKERS,
+            protocol=config.ODOO_PROTOCOL,
+            retry_policy=RetryPolicy(max_retries=config.ODOO_MAX_RETRIES)
+        )
+        self._schemas: Optional["SchemaCache"] = None
+
+    @property
+    def schemas(self) -> "SchemaCache":
+        if self._schemas is None:
+            from .schema import SchemaCache
+            self._schemas = SchemaCache(self.connector, config.ODOO_SCHEMA_CACHE, config.ODOO_SCHEMA_TTL)
+        return self._schemas
+
+    def extract(
+        self,
+        model: str,
+        fields: Optional[List[str]] = None,
+        domain: Optional[List[Any]] = None,
+        output: str = "frame",
+        batch_size: Optional[int] = None,
+        additional_filter: Optional[List[Any]] = None,
+        many2one_ids: bool = False,
+        memory_budget_mb: Optional[float] = None
+    ) -> Any:
+        """
+        Records of model matching domain (and additional_filter), in id order.
+
+        Params:
+        - fields: validated against fields_get; empty means the model's stored
+          fields without binary, x2many and html ones
+        - output: "frame" for one DataFrame, "chunks" for an iterator of
+          DataFrames or "arrow" for an iterator of RecordBatches, one per page
+        - batch_size: initial page size (ODOO_BATCH_SIZE), adapted toward
+          ODOO_TARGET_LATENCY as usual
+        - many2one_ids: read many2one fields as bare ids instead of [id, name]
+        - memory_budget_mb: size past which a "frame" is spilled to disk
+          (ETL_EXTRACT_MEMORY_MB by default; 0 never spills)
+        """
+        if output not in EXTRACT_OUTPUTS:
+            raise ValueError(f"Unknown extract output '{output}', expected one of {EXTRACT_OUTPUTS}")
+        from .schema import to_arrow, to_frame
+
+        schema = self.schemas.get(model)
+        fields = schema.validate(fields)
+        # search_read always returns id
+        columns = fields if "id" in fields else ["id"] + fields
+        dtypes = schema.dtypes(columns)
+        batches = self.connector.iter_batches(
+            model, fields, domain, batch_size or config.ODOO_BATCH_SIZE, additional_filter,
+            target_latency=config.ODOO_TARGET_LATENCY or None, many2one_ids=many2one_ids
         )
+        chunks = (to_frame(batch, dtypes)[columns] for batch in batches)
+        if output == "chunks":
+            return chunks
+        if output == "arrow":
+            arrow_schema = schema.arrow_schema(columns)
+            return (to_arrow(chunk, arrow_schema) for chunk in chunks)
+
+        budget_mb = config.ETL_EXTRACT_MEMORY_MB if memory_budget_mb is None else memory_budget_mb
+        frames: List["pd.DataFrame"] = []
+        size = 0
+        for chunk in chunks:
+            frames.append(chunk)
+            size += int(chunk.memory_usage(deep=True).sum())
+            if budget_mb and size > budget_mb * 1024 * 1024:
+                logger.info(f"'{model}' passed the {budget_mb:g} MB memory budget after "
+                            f"{sum(len(f) for f in frames)} rows; spilling it to {config.ETL_SPILL_DIR}")
+                return self._spill(model, frames, chunks, schema.arrow_schema(columns))
 
-    def extract(self, model: str, fields: List[str], domain: Optional[List] = None, limit: int = 100) -> pd.DataFrame:
-        records = self.connector.fetch_records(model=model, domain=domain, fields=fields, limit=limit)
-        if not records:
+        import pandas as pd
+        if not frames:
             logger.warning(f"No records found for model '{model}'.")
-        df = pd.DataFrame(records)
-        return df
+            return pd.DataFrame({col: pd.Series(dtype=dtypes.get(col, object)) for col in columns})
+        return pd.concat(frames, ignore_index=True)
+
+    def _spill(self, model: str, frames: List["pd.DataFrame"], chunks: Iterator["pd.DataFrame"],
+               arrow_schema: Any) -> "pd.DataFrame":
+        """
+        Write the buffered frames, then the remaining chunks, to an Arrow IPC file
+        and return a DataFrame over a memory map of it.
+        """
+        import pandas as pd
+        from .schema import to_arrow
+        from .storage import _import_pyarrow
+        pa = _import_pyarrow()
+
+        os.makedirs(config.ETL_SPILL_DIR, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=config.ETL_SPILL_DIR, prefix=f"{model}.", suffix=".arrow")
+        os.close(fd)
+        try:
+            with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, arrow_schema) as writer:
+                for frame in frames:
+                    writer.write_batch(to_arrow(frame, arrow_schema))
+                frames.clear()
+                for chunk in chunks:
+                    writer.write_batch(to_arrow(chunk, arrow_schema))
+            table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        finally:
+            # The mapping outlives the directory entry; the disk space is freed with the frame
+            os.remove(path)
+        logger.info(f"Spilled {table.num_rows} rows of '{model}' ({table.nbytes / 1024 / 1024:.0f} MB)")
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    def extract_and_save(self, model: str, fields: Optional[List[str]], filename: str,
+                         domain: Optional[List[Any]] = None) -> int:
+        """
+        Stream model's records to outputs/<filename>, in the storage format its
+        extension names (.csv or .parquet), a page at a time. Returns the rows written.
+        """
+        from .storage import _import_pyarrow, storage_for_path
 
-    def extract_and_save(self, model: str, fields: List[str], filename: str, domain: Optional[List] = None, limit: int = 100) -> None:
-        df = self.extract(model, fields, domain, limit)
         os.makedirs("outputs", exist_ok=True)
         path = os.path.join("outputs", filename)
-        df.to_csv(path, index=False)
-        logger.info(f"Extracted '{model}' and saved to '{path}'.")
+        storage = storage_for_path(path)
+        rows = 0
+        if storage.name == "parquet":
+            # Parquet takes the Arrow batches as they are: many2one pairs become structs
+            pa = _import_pyarrow()
+            writer = None
+            try:
+                for batch in self.extract(model, fields, domain, output="arrow"):
+                    if writer is None:
+                        writer = pa.parquet.ParquetWriter(path, batch.schema)
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            with storage.open_writer(path) as writer:
+                for chunk in self.extract(model, fields, domain, output="chunks"):
+                    writer.write(chunk)
+                    rows += len(chunk)
+        logger.info(f"Extracted {rows} rows of '{model}' and saved them to '{path}'.")
+        return rows
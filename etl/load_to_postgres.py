@@ -1,196 +1,716 @@
-from typing import Optional
-import pandas as pd
-import psycopg2
-from psycopg2.extras import execute_batch
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from config import config
+from etl.batching import RetryPolicy
+from etl.checkpoint import CheckpointStore
+from etl.metrics import RunMetrics
+from etl.registry import (
+    AGGREGATES, REGISTRY, AggregateSpec, ModelSpec, enabled_aggregates, enabled_specs, get_aggregate, get_spec,
+    views_reading
+)
+from etl.storage import get_storage, read_frame
 import logging
-import numpy as np
-from typing import List, Tuple
+from typing import List, Set, Tuple, Type, TypeVar
+
+if TYPE_CHECKING:
+    # Imported where they are used, so importing the loader (Airflow, the CLI) stays cheap
+    import numpy as np
+    import pandas as pd
+    import psycopg2.extensions
+    import psycopg2.pool
 
 
 logger = logging.getLogger(__name__)
 
+LOAD_METHODS = ("execute_batch", "execute_values", "copy")
+# Version of the DDL last applied to each warehouse table and view (see create_tables)
+SCHEMA_VERSION_TABLE = "etl_schema_version"
+# Rows per fetch when streaming a table's keys, and keys per UPDATE/DELETE statement
+KEY_FETCH_ROWS = 100_000
+KEY_CHUNK_ROWS = 10_000
+
+T = TypeVar("T")
+
+def retriable_errors() -> Tuple[Type[Exception], ...]:
+    """Errors after which a chunk is retried on a fresh connection."""
+    import psycopg2.extensions
+    return (psycopg2.OperationalError, psycopg2.extensions.TransactionRollbackError)
+
+def connection_params() -> Dict[str, Any]:
+    params: Dict[str, Any] = dict(
+        host=config.PG_HOST,
+        dbname=config.PG_DB,
+        port=config.PG_PORT,
+        user=config.PG_USER,
+        password=config.PG_PASSWORD
+    )
+    if config.PG_SYNCHRONOUS_COMMIT:
+        # Set per session at connect time; the warehouse can always be reloaded from Odoo
+        params["options"] = f"-c synchronous_commit={config.PG_SYNCHRONOUS_COMMIT}"
+    return params
+
+def merge_clause(table: str, columns: List[str], key: str = "id") -> str:
+    """
+    ON CONFLICT clause that updates an existing row only when one of its
+    columns actually changed, so re-sent but unchanged rows cost no write.
+    key may list several columns ("id, date_order").
+    """
+    keys = [k.strip() for k in key.split(",")]
+    updates = [c for c in columns if c not in keys]
+    if not updates:
+        return f"ON CONFLICT ({key}) DO NOTHING"
+    assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in updates)
+    current = ", ".join(f"{table}.{c}" for c in updates)
+    incoming = ", ".join(f"EXCLUDED.{c}" for c in updates)
+    return (
+        f"ON CONFLICT ({key}) DO UPDATE SET {assignments} "
+        f"WHERE ({current}) IS DISTINCT FROM ({incoming})"
+    )
+
 class PostgresLoader:
-    def __init__(self) -> None:
-        self.conn: Optional[psycopg2.extensions.connection] = None
-        self.cur: Optional[psycopg2.extensions.cursor] = None
-        self.connect()
-        self.create_tables()
+    """
+    Loads the transformed CSVs into the analytics warehouse.
+
+    load_methods maps a table name to one of LOAD_METHODS; tables not listed
+    use execute_batch. "copy" streams rows with COPY FROM STDIN into a
+    temporary staging table and merges them with INSERT ... SELECT, which is
+    much faster than parameter binding at large volumes.
+
+    create_tables also manages the physical schema declared in the registry:
+    secondary indexes, monthly partitions of partitioned tables (created on
+    demand as rows arrive) and the materialized views, which refresh_views
+    brings up to date after a load.
+
+    Each load_file call is recorded in metrics (a RunMetrics) under the "load" stage.
+    The loader opens its own connection on first use unless given one (e.g. from a
+    pool), which close() then leaves open. Tables are created by create_tables, not
+    on construction.
+    """
+
+    def __init__(
+        self,
+        load_methods: Optional[Dict[str, str]] = None,
+        copy_chunk_rows: int = 100_000,
+        metrics: Optional[RunMetrics] = None,
+        conn: Optional["psycopg2.extensions.connection"] = None
+    ) -> None:
+        self.load_methods = dict(config.PG_LOAD_METHODS if load_methods is None else load_methods)
+        unknown = {m for m in self.load_methods.values() if m not in LOAD_METHODS}
+        if unknown:
+            raise ValueError(f"Unknown load method(s) {sorted(unknown)}, expected one of {LOAD_METHODS}")
+        self.copy_chunk_rows = copy_chunk_rows
+        self.metrics = metrics or RunMetrics("load")
+        self._conn: Optional["psycopg2.extensions.connection"] = conn
+        self._cur: Optional["psycopg2.extensions.cursor"] = conn.cursor() if conn is not None else None
+        self._owns_conn = conn is None
+
+    @property
+    def conn(self) -> "psycopg2.extensions.connection":
+        if self._conn is None:
+            self.connect()
+        return self._conn
+
+    @property
+    def cur(self) -> "psycopg2.extensions.cursor":
+        if self._cur is None:
+            self.connect()
+        return self._cur
 
     def connect(self) -> None:
+        import psycopg2
+
         try:
-            self.conn = psycopg2.connect(
-                host=config.PG_HOST,
-                dbname=config.PG_DB,
-                port=config.PG_PORT,
-                user=config.PG_USER,
-                password=config.PG_PASSWORD
-            )
-            self.cur = self.conn.cursor()
+            self._conn = psycopg2.connect(**connection_params())
+            self._cur = self._conn.cursor()
             logger.info("Connected to PostgreSQL database.")
         except Exception as e:
             logger.error(f"Failed to connect to PostgreSQL: {e}")
             raise
 
-    def create_tables(self) -> None:
-        create_customers = """
-        CREATE TABLE IF NOT EXISTS customers (
-            id INTEGER PRIMARY KEY,
-            name TEXT,
-            email TEXT,
-            phone TEXT,
-            city TEXT,
-            country_name TEXT
-        );"""
-        create_products = """
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY,
-            name TEXT,
-            default_code TEXT,
-            list_price NUMERIC(10, 2)
-        );"""
-        create_sales_orders = """
-        CREATE TABLE IF NOT EXISTS sales_orders (
-            id INTEGER PRIMARY KEY,
-            name TEXT,
-            customer_id INTEGER,
-            customer_name TEXT,
-            amount_total NUMERIC(10, 2),
-            state TEXT,
-            date_order TIMESTAMP,
-            order_month TEXT,
-            revenue_bucket TEXT
-        );"""
-        create_order_lines = """
-        CREATE TABLE IF NOT EXISTS order_lines (
-            order_id INTEGER,
-            product_id INTEGER,
-            product_uom_qty NUMERIC,
-            price_unit NUMERIC(10, 2),
-            price_subtotal NUMERIC(10, 2)
-        );"""
+    def create_tables(self, specs: Optional[List[ModelSpec]] = None,
+                      summaries: Optional[List[AggregateSpec]] = None) -> None:
+        """
+        CREATE TABLE IF NOT EXISTS (plus migrations and indexes) for the given registry
+        entries and summary tables, every one of them when neither is given, then the
+        materialized views over those tables whose inputs all exist.
+
+        The version of the DDL applied to each table and view is recorded in
+        SCHEMA_VERSION_TABLE, in the same transaction. Objects that exist at their
+        recorded version are left alone: their DDL would change nothing, yet the
+        ALTERs would still queue an ACCESS EXCLUSIVE lock behind the dashboards' reads.
+        """
+        if specs is None and summaries is None:
+            specs, summaries = REGISTRY, AGGREGATES
+        unkeyed: Dict[str, int] = {}
         try:
-            self.cur.execute(create_customers)
-            self.cur.execute(create_products)
-            self.cur.execute(create_sales_orders)
-            self.cur.execute(create_order_lines)
+            applied = self._applied_versions()
+            for spec in specs or []:
+                if applied.get(spec.table) == spec.schema_version():
+                    continue
+                if spec.partition_by:
+                    self._partition_existing(spec)
+                self.cur.execute(spec.create_table_sql())
+                for migration in spec.migrations:
+                    self.cur.execute(migration)
+                # Rows an older schema left without a key (order_lines before it was keyed on the
+                # Odoo id) can never be merged or reconciled; the model is re-extracted in full.
+                # The key is then NOT NULL, as it is in tables created with it, so this runs once
+                if self._column_nullable(spec.table, spec.key):
+                    self.cur.execute(f"DELETE FROM {spec.table} WHERE {spec.key} IS NULL;")
+                    if self.cur.rowcount > 0:
+                        unkeyed[spec.name] = self.cur.rowcount
+                    self.cur.execute(f"ALTER TABLE {spec.table} ALTER COLUMN {spec.key} SET NOT NULL;")
+                # Tables created before reconciliation existed lack the column
+                if self._column_nullable(spec.table, "deleted_at") is None:
+                    self.cur.execute(f"ALTER TABLE {spec.table} ADD COLUMN deleted_at TIMESTAMP;")
+                for index in spec.index_sql():
+                    self.cur.execute(index)
+                self._record_version(spec.table, spec.schema_version())
+            for summary in summaries or []:
+                if applied.get(summary.table) != summary.schema_version():
+                    self.cur.execute(summary.create_table_sql())
+                    self._record_version(summary.table, summary.schema_version())
+            # Again: partitioning a legacy table drops the views reading it
+            applied = self._applied_versions()
+            for view in views_reading([spec.table for spec in specs or []]):
+                if applied.get(view.name) == view.schema_version():
+                    continue
+                self.cur.execute("SELECT bool_and(to_regclass(t) IS NOT NULL) FROM unnest(%s::text[]) AS t;",
+                                 (view.tables,))
+                if self.cur.fetchone()[0]:
+                    self.cur.execute(view.create_sql())
+                    self._record_version(view.name, view.schema_version())
             self.conn.commit()
             logger.info("Tables created/verified successfully.")
         except Exception as e:
             logger.error(f"Error creating tables: {e}")
             self.conn.rollback()
             raise
+        for name, rows in unkeyed.items():
+            logger.warning(f"Removed {rows} rows without a key from {get_spec(name).table}; "
+                           f"the next extraction of '{name}' reads every record again.")
+            CheckpointStore(config.ETL_CHECKPOINT_FILE).reset(name)
 
-    def _prepare_records(self, df: pd.DataFrame) -> List[Tuple]:
+    def _column_nullable(self, table: str, column: str) -> Optional[bool]:
+        """Whether table's column admits NULLs; None when the table has no such column."""
+        self.cur.execute(
+            "SELECT NOT attnotnull FROM pg_attribute "
+            "WHERE attrelid = to_regclass(%s) AND attname = %s AND NOT attisdropped;",
+            (table, column)
+        )
+        row = self.cur.fetchone()
+        return None if row is None else row[0]
+
+    def _applied_versions(self) -> Dict[str, str]:
         """
-        Convert dataframe rows to list of tuples with native Python types.
-        Handles numpy types and missing values.
+        Recorded DDL version of each table and view that still is the relation it was
+        recorded for: one dropped and created again outside the loader has a new oid.
+        """
+        self.cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (name TEXT PRIMARY KEY, version TEXT NOT NULL, "
+            "relid OID NOT NULL, applied_at TIMESTAMP NOT NULL DEFAULT now());"
+        )
+        self.cur.execute(f"SELECT name, version FROM {SCHEMA_VERSION_TABLE} WHERE relid = to_regclass(name);")
+        return dict(self.cur.fetchall())
+
+    def _record_version(self, name: str, version: str) -> None:
+        self.cur.execute(
+            f"INSERT INTO {SCHEMA_VERSION_TABLE} (name, version, relid) VALUES (%s, %s, to_regclass(%s)) "
+            "ON CONFLICT (name) DO UPDATE SET version = EXCLUDED.version, relid = EXCLUDED.relid, applied_at = now();",
+            (name, version, name)
+        )
+
+    def _partition_existing(self, spec: ModelSpec) -> None:
         """
-        return [
-            tuple(
-                None if pd.isna(x) else x.item() if isinstance(x, (np.integer, np.floating)) else x
-                for x in row
+        Convert spec's table into its partitioned form if it exists as a plain table
+        (created before it was partitioned): rename it, create the partitioned
+        table, copy the rows over and drop the old one, in the caller's transaction.
+
+        Nothing is changed, and a RuntimeError says why, while the table has rows
+        without a partition key (the new primary key cannot hold them) or views
+        other than the registry's own materialized views read it.
+        """
+        self.cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s);", (spec.table,))
+        row = self.cur.fetchone()
+        if not row or row[0] != "r":
+            return
+        self.cur.execute(f"SELECT count(*) FROM {spec.table} WHERE {spec.partition_by} IS NULL;")
+        unkeyed = self.cur.fetchone()[0]
+        if unkeyed:
+            raise RuntimeError(
+                f"{unkeyed} row(s) of {spec.table} have no {spec.partition_by}; set or delete them "
+                f"before the table can be partitioned by it"
             )
-            for row in df.itertuples(index=False, name=None)
-        ]
-    
-    def insert_customers(self, filepath: str) -> None:
-        df = pd.read_csv(filepath)
-        df = df[["id", "name", "email", "phone", "city", "country_name"]]
-        records = self._prepare_records(df)
-        sql = """
-        INSERT INTO customers (id, name, email, phone, city, country_name)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        ON CONFLICT (id) DO NOTHING;
+        self.cur.execute(
+            "SELECT DISTINCT v.oid::regclass::text FROM pg_depend d "
+            "JOIN pg_rewrite r ON r.oid = d.objid JOIN pg_class v ON v.oid = r.ev_class "
+            "WHERE d.classid = 'pg_rewrite'::regclass AND d.refobjid = %s::regclass AND v.oid <> d.refobjid;",
+            (spec.table,)
+        )
+        managed = {view.name for view in views_reading([spec.table])}
+        dependents = sorted(name for (name,) in self.cur.fetchall())
+        blocking = [name for name in dependents if name not in managed]
+        if blocking:
+            raise RuntimeError(
+                f"View(s) {', '.join(blocking)} read {spec.table}; drop them before it can be partitioned "
+                f"by {spec.partition_by}, and recreate them afterwards"
+            )
+        for name in dependents:
+            # create_tables recreates them over the partitioned table
+            self.cur.execute(f"DROP MATERIALIZED VIEW {name};")
+        old = f"{spec.table}_unpartitioned"
+        columns = ", ".join([*spec.columns, "deleted_at"])
+        logger.warning(f"Rewriting {spec.table} as a table partitioned by {spec.partition_by}.")
+        # Its columns must have the new table's types before they are copied
+        for migration in spec.migrations:
+            self.cur.execute(migration)
+        self.cur.execute(f"ALTER TABLE {spec.table} RENAME TO {old};")
+        self.cur.execute(f"ALTER INDEX IF EXISTS {spec.table}_pkey RENAME TO {old}_pkey;")
+        self.cur.execute(f"ALTER TABLE {old} ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;")
+        self.cur.execute(spec.create_table_sql())
+        self.cur.execute(
+            f"SELECT DISTINCT to_char({spec.partition_by}, 'YYYY-MM') FROM {old};"
+        )
+        for (month,) in self.cur.fetchall():
+            self.cur.execute(spec.partition_sql(month))
+        self.cur.execute(f"INSERT INTO {spec.table} ({columns}) SELECT {columns} FROM {old};")
+        self.cur.execute(f"DROP TABLE {old};")
+
+    def ensure_partitions(self, spec: ModelSpec, df: "pd.DataFrame") -> List[str]:
         """
+        Create the monthly partitions of spec's table that rows of df fall into
+        and that do not exist yet, and commit. Returns the months created.
+        """
+        import numpy as np
+        import pandas as pd
+
+        dates = pd.to_datetime(df[spec.partition_by]).dropna().to_numpy(dtype="datetime64[ns]")
+        months = np.datetime_as_string(np.unique(dates.astype("datetime64[M]")), unit="M").tolist()
+        self.cur.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass;", (spec.table,)
+        )
+        existing = {row[0] for row in self.cur.fetchall()}
+        missing = [month for month in months if spec.partition_name(month) not in existing]
         try:
-            execute_batch(self.cur, sql, records)
+            for month in missing:
+                self.cur.execute(spec.partition_sql(month))
             self.conn.commit()
-            logger.info(f"Inserted {len(records)} customers.")
-        except Exception as e:
-            logger.error(f"Failed to insert customers: {e}")
+        except Exception:
             self.conn.rollback()
             raise
+        if missing:
+            logger.info(f"Created partitions of {spec.table} for {', '.join(missing)}.")
+        return missing
+
+    @staticmethod
+    def _column_values(col: "pd.Series") -> list:
+        """
+        Native Python values for one column, with None for missing values.
+        Conversion happens once per column in numpy/pandas; only object columns
+        holding numeric values (which may be numpy scalars) are converted per cell.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if isinstance(col.dtype, np.dtype) and col.dtype.kind in "iub":
+            # numpy ints/bools cannot hold missing values; tolist() yields Python scalars
+            return col.to_numpy().tolist()
+        if isinstance(col.dtype, np.dtype) and col.dtype.kind == "M":
+            # datetime.datetime (with None for NaT) at PostgreSQL's microsecond precision;
+            # much cheaper than materialising pd.Timestamp objects
+            return col.to_numpy(dtype="datetime64[us]").astype(object).tolist()
+        values = col.to_numpy(dtype=object, na_value=None)
+        inferred = pd.api.types.infer_dtype(values, skipna=True) if col.dtype == object else ""
+        if inferred.startswith(("integer", "floating", "mixed-integer")):
+            return [x.item() if isinstance(x, (np.integer, np.floating)) else x for x in values]
+        return values.tolist()
+
+    def _prepare_records(self, df: "pd.DataFrame") -> List[Tuple]:
+        """
+        Convert dataframe rows to list of tuples with native Python types.
+        Handles numpy types and missing values column by column.
+        """
+        if not len(df.columns):
+            return [()] * len(df)
+        return list(zip(*(self._column_values(df[col]) for col in df.columns)))
+
+    @staticmethod
+    def _integral_floats_as_int(df: "pd.DataFrame") -> "pd.DataFrame":
+        """
+        pd.read_csv turns integer columns with gaps into float64, which COPY would
+        write as "201.0" and INTEGER columns reject. Write whole floats as integers.
+        """
+        converted = {
+            col: df[col].astype("Int64")
+            for col in df.columns
+            if df[col].dtype.kind == "f" and (df[col].dropna() % 1 == 0).all()
+        }
+        return df.assign(**converted) if converted else df
+
+    def _copy_from_stdin(self, table: str, df: "pd.DataFrame", on_conflict: str) -> None:
+        """COPY df into a temp staging table in chunks, then merge it into table."""
+        df = self._integral_floats_as_int(df)
+        columns = ", ".join(df.columns)
+        staging = f"_stage_{table}"
+        self.cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP;"
+        )
+        copy_sql = f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        for start in range(0, len(df), self.copy_chunk_rows):
+            buf = io.StringIO()
+            df.iloc[start:start + self.copy_chunk_rows].to_csv(buf, index=False, header=False)
+            buf.seek(0)
+            self.cur.copy_expert(copy_sql, buf)
+        self.cur.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} {on_conflict};"
+        )
 
-    def insert_products(self, filepath: str) -> None:
-        df = pd.read_csv(filepath)
-        df = df[["id", "name", "default_code", "list_price"]]
-        records = self._prepare_records(df)
-        sql = """
-        INSERT INTO products (id, name, default_code, list_price)
-        VALUES (%s, %s, %s, %s)
-        ON CONFLICT (id) DO NOTHING;
+    def _insert(self, table: str, df: "pd.DataFrame", key: str = "id", partition_by: Optional[str] = None) -> int:
+        """
+        Merge df into table on key with the table's configured load method and commit.
+        Rows are inserted, or updated only when a column changed (see merge_clause).
+        For a table partitioned on partition_by, the merge is on (key, partition_by);
+        rows whose partition value changed are first removed from their old partition.
         """
+        from psycopg2.extras import execute_batch, execute_values
+
+        df = df.drop_duplicates(subset=key, keep="last")
+        columns = list(df.columns)
+        on_conflict = merge_clause(table, columns, f"{key}, {partition_by}" if partition_by else key)
+        method = self.load_methods.get(table, "execute_batch")
         try:
-            execute_batch(self.cur, sql, records)
+            if partition_by:
+                self.cur.execute(
+                    f"DELETE FROM {table} t USING unnest(%s::bigint[], %s::timestamp[]) AS s(k, p) "
+                    f"WHERE t.{key} = s.k AND t.{partition_by} IS DISTINCT FROM s.p;",
+                    (self._column_values(df[key]), self._column_values(df[partition_by]))
+                )
+            if method == "copy":
+                self._copy_from_stdin(table, df, on_conflict)
+            else:
+                records = self._prepare_records(df)
+                if method == "execute_values":
+                    execute_values(
+                        self.cur,
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s {on_conflict};",
+                        records,
+                        page_size=1000
+                    )
+                else:
+                    placeholders = ", ".join(["%s"] * len(columns))
+                    execute_batch(
+                        self.cur,
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) {on_conflict};",
+                        records
+                    )
             self.conn.commit()
-            logger.info(f"Inserted {len(records)} products.")
-        except Exception as e:
-            logger.error(f"Failed to insert products: {e}")
+        except Exception:
             self.conn.rollback()
             raise
+        return len(df)
 
-    def insert_sales_orders(self, filepath: str) -> None:
-        df = pd.read_csv(filepath)
-        df = df[[
-            "id", "name", "customer_id", "customer_name", "amount_total",
-            "state", "date_order", "order_month", "revenue_bucket"
-        ]]
-        records = self._prepare_records(df)
-
-        sql = """
-        INSERT INTO sales_orders (
-            id, name, customer_id, customer_name, amount_total,
-            state, date_order, order_month, revenue_bucket
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (id) DO NOTHING;
+    def load_file(self, name: str, filepath: str) -> int:
+        """Upsert an extracted file into the table of registry entry ``name``."""
+        spec = get_spec(name)
+        df = read_frame(filepath, list(spec.columns))
+        if spec.partition_by:
+            self.ensure_partitions(spec, df)
+        count = self.load_frame(name, df)
+        file_bytes = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        self.metrics.add("load", name, bytes=file_bytes)
+        return count
+
+    def load_frame(self, name: str, df: "pd.DataFrame") -> int:
+        """
+        Upsert rows of registry entry ``name`` into its table and commit. The
+        partitions the rows fall into must exist (see ensure_partitions).
         """
+        spec = get_spec(name)
+        start = time.perf_counter()
+        with self.metrics.span("load", name):
+            try:
+                count = self._insert(spec.table, df, spec.key, spec.partition_by)
+                logger.info(f"Upserted {count} rows into {spec.table}.")
+            except Exception as e:
+                logger.error(f"Failed to load {spec.table}: {e}")
+                raise
+        self.metrics.add("load", name, rows=count, busy_seconds=time.perf_counter() - start)
+        return count
+
+    def load_summary(self, name: str, filepath: str) -> int:
+        """
+        Replace the rows of summary table ``name`` with an extracted read_group file,
+        in one transaction, so readers see either the previous or the new summary.
+        """
+        spec = get_aggregate(name)
+        start = time.perf_counter()
+        with self.metrics.span("load", name):
+            df = read_frame(filepath, list(spec.columns))
+            try:
+                self.cur.execute(f"DELETE FROM {spec.table};")
+                self._copy_from_stdin(spec.table, df, "")
+                self.conn.commit()
+                logger.info(f"Replaced {spec.table} with {len(df)} rows.")
+            except Exception as e:
+                self.conn.rollback()
+                logger.error(f"Failed to load {spec.table}: {e}")
+                raise
+        file_bytes = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+        self.metrics.add("load", name, rows=len(df), bytes=file_bytes, busy_seconds=time.perf_counter() - start)
+        return len(df)
+
+    def fetch_keys(self, table: str, key: str = "id", deleted: Optional[bool] = None) -> "np.ndarray":
+        """
+        Sorted int64 array of table's non-NULL keys, streamed through a server-side
+        cursor. deleted=False/True restricts it to live/soft-deleted rows.
+        """
+        import numpy as np
+
+        where = f"{key} IS NOT NULL"
+        if deleted is not None:
+            where += f" AND deleted_at IS {'NOT ' if deleted else ''}NULL"
+        chunks = []
+        with self.conn.cursor(name=f"_keys_{table}") as cur:
+            cur.execute(f"SELECT {key} FROM {table} WHERE {where};")
+            while True:
+                rows = cur.fetchmany(KEY_FETCH_ROWS)
+                if not rows:
+                    break
+                chunks.append(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)))
+        keys = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+        keys.sort()
+        return keys
+
+    def _execute_for_keys(self, sql: str, keys: "np.ndarray") -> int:
+        changed = 0
+        for start in range(0, len(keys), KEY_CHUNK_ROWS):
+            self.cur.execute(sql, (keys[start:start + KEY_CHUNK_ROWS].tolist(),))
+            changed += self.cur.rowcount
+        return changed
+
+    def mark_deleted(self, table: str, key: str, gone: "np.ndarray", restored: "np.ndarray") -> None:
+        """Set deleted_at on the gone keys and clear it on the restored ones, in one transaction."""
         try:
-            execute_batch(self.cur, sql, records)
+            self._execute_for_keys(
+                f"UPDATE {table} SET deleted_at = now() WHERE {key} = ANY(%s) AND deleted_at IS NULL;", gone
+            )
+            self._execute_for_keys(f"UPDATE {table} SET deleted_at = NULL WHERE {key} = ANY(%s);", restored)
             self.conn.commit()
-            logger.info(f"Inserted {len(records)} sales orders.")
-        except Exception as e:
-            logger.error(f"Failed to insert sales orders: {e}")
+        except Exception:
             self.conn.rollback()
             raise
 
-    def insert_order_lines(self, filepath: str) -> None:
-        df = pd.read_csv(filepath)
-        df = df[["order_id", "product_id", "product_uom_qty", "price_unit", "price_subtotal"]]
-        records = self._prepare_records(df)
-        sql = """
-        INSERT INTO order_lines (
-            order_id, product_id, product_uom_qty, price_unit, price_subtotal
-        )
-        VALUES (%s, %s, %s, %s, %s);
-        """
+    def delete_keys(self, table: str, key: str, gone: "np.ndarray") -> int:
         try:
-            execute_batch(self.cur, sql, records)
+            deleted = self._execute_for_keys(f"DELETE FROM {table} WHERE {key} = ANY(%s);", gone)
             self.conn.commit()
-            logger.info(f"Inserted {len(records)} order lines.")
-        except Exception as e:
-            logger.error(f"Failed to insert order lines: {e}")
+        except Exception:
             self.conn.rollback()
             raise
+        return deleted
+
+    def refresh_views(self, tables: List[str]) -> List[str]:
+        """
+        Refresh the materialized views reading any of tables, each in its own
+        transaction, and return their names. Populated views are refreshed
+        CONCURRENTLY, so dashboards keep reading the previous contents meanwhile;
+        views not created yet (their inputs were missing) are skipped.
+        """
+        refreshed = []
+        for view in views_reading(tables):
+            with self.metrics.span("refresh", view.name):
+                try:
+                    self.cur.execute("SELECT ispopulated FROM pg_matviews WHERE matviewname = %s;", (view.name,))
+                    row = self.cur.fetchone()
+                    if row is None:
+                        self.conn.rollback()
+                        continue
+                    # The first refresh cannot be concurrent: there is nothing to diff against
+                    concurrently = "CONCURRENTLY " if row[0] else ""
+                    self.cur.execute(f"REFRESH MATERIALIZED VIEW {concurrently}{view.name};")
+                    self.conn.commit()
+                except Exception:
+                    self.conn.rollback()
+                    raise
+            refreshed.append(view.name)
+        if refreshed:
+            logger.info(f"Refreshed {', '.join(refreshed)}.")
+        return refreshed
+
+    def close(self) -> None:
+        if self._cur is not None:
+            self._cur.close()
+            self._cur = None
+        if self._conn is not None and self._owns_conn:
+            self._conn.close()
+            self._conn = None
+            logger.info("PostgreSQL connection closed.")
+
+class ParallelLoader:
+    """
+    Loads several extracted files at once, max_workers connections at a time.
+
+    Tables are independent, so their loads run concurrently, and a file of more
+    than chunk_rows rows is split into chunks of distinct keys that are loaded
+    in parallel too. Each chunk is merged and committed on its own, so a chunk
+    failing on a connection error or deadlock is retried alone (up to retries
+    times, on a fresh connection) rather than the whole file. DDL runs on the
+    first load() of each table, so a long-lived loader (etl.cli --every) checks
+    the schema once, and the materialized views reading the loaded tables are
+    refreshed once every chunk is in.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        chunk_rows: Optional[int] = None,
+        retries: Optional[int] = None,
+        load_methods: Optional[Dict[str, str]] = None,
+        metrics: Optional[RunMetrics] = None
+    ) -> None:
+        self.max_workers = max_workers or config.PG_LOAD_WORKERS
+        self.chunk_rows = chunk_rows or config.PG_LOAD_CHUNK_ROWS
+        self.retry_policy = RetryPolicy(max_retries=config.PG_LOAD_RETRIES if retries is None else retries)
+        self.load_methods = load_methods
+        self.metrics = metrics or RunMetrics("load")
+        self._pool: Optional["psycopg2.pool.ThreadedConnectionPool"] = None
+        self._pool_lock = threading.Lock()
+        # Registry and summary names whose tables create_tables has verified
+        self._created: Set[str] = set()
+
+    @property
+    def pool(self) -> "psycopg2.pool.ThreadedConnectionPool":
+        """Opened on first use; connections then stay open across load() calls until close()."""
+        with self._pool_lock:
+            if self._pool is None:
+                import psycopg2.pool
+                # One connection per worker, plus one for the work load() does itself
+                # (partitions, views) while workers hold theirs: getconn never waits
+                self._pool = psycopg2.pool.ThreadedConnectionPool(1, self.max_workers + 1, **connection_params())
+            return self._pool
+
+    def _with_loader(self, work: Callable[[PostgresLoader], T]) -> T:
+        """Run work on a loader over a pooled connection, retrying retriable errors."""
+        attempt = 0
+        while True:
+            conn = self.pool.getconn()
+            loader = PostgresLoader(self.load_methods, metrics=self.metrics, conn=conn)
+            try:
+                result = work(loader)
+            except retriable_errors() as e:
+                loader.close()
+                self.pool.putconn(conn, close=True)
+                attempt += 1
+                if attempt > self.retry_policy.max_retries:
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                logger.warning(f"Retrying load in {delay:.1f}s (attempt {attempt}/{self.retry_policy.max_retries}): {e}")
+                time.sleep(delay)
+                continue
+            except Exception:
+                loader.close()
+                self.pool.putconn(conn)
+                raise
+            loader.close()
+            self.pool.putconn(conn)
+            return result
+
+    def load(self, files: Dict[str, str], summaries: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+        """
+        Load registry entry name -> extracted file and summary name -> file.
+        Returns the rows loaded per name; raises the first failure once every
+        other started chunk has finished.
+        """
+        summaries = summaries or {}
+        new_files = [name for name in files if name not in self._created]
+        new_summaries = [name for name in summaries if name not in self._created]
+        if new_files or new_summaries:
+            self._with_loader(lambda loader: loader.create_tables(
+                [get_spec(name) for name in new_files], [get_aggregate(name) for name in new_summaries]
+            ))
+            self._created.update(new_files + new_summaries)
+        counts = {name: 0 for name in [*files, *summaries]}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="load") as executor:
+            futures = [
+                (name, executor.submit(self._with_loader, lambda loader, n=name, p=path: loader.load_summary(n, p)))
+                for name, path in summaries.items()
+            ]
+            # Files are read here, one at a time, while chunks of the previous ones load
+            for name, path in files.items():
+                spec = get_spec(name)
+                # Keys must not repeat across chunks: concurrent upserts of one key would block each other
+                df = read_frame(path, list(spec.columns)).drop_duplicates(subset=spec.key, keep="last")
+                self.metrics.add("load", name, bytes=os.path.getsize(path))
+                if spec.partition_by:
+                    # Up front: chunks creating the same partition concurrently would conflict
+                    self._with_loader(lambda loader, s=spec, d=df: loader.ensure_partitions(s, d))
+                for start in range(0, len(df), self.chunk_rows):
+                    chunk = df.iloc[start:start + self.chunk_rows]
+                    futures.append((name, executor.submit(
+                        self._with_loader, lambda loader, n=name, c=chunk: loader.load_frame(n, c)
+                    )))
+            for name, future in futures:
+                counts[name] += future.result()
+        if files:
+            self._with_loader(lambda loader: loader.refresh_views([get_spec(name).table for name in files]))
+        return counts
 
     def close(self) -> None:
-        if self.cur:
-            self.cur.close()
-        if self.conn:
-            self.conn.close()
-        logger.info("PostgreSQL connection closed.")
-
-def run_load_to_postgres():
-    try:
-        loader = PostgresLoader()
-        loader.insert_customers("outputs/customers.csv")
-        loader.insert_products("outputs/products.csv")
-        loader.insert_sales_orders("outputs/sales_orders.csv")
-        loader.insert_order_lines("outputs/order_lines.csv")
-    finally:
-        loader.close()
-        print("✅ Data loaded into PostgreSQL (analytics) successfully.")
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+def publish_metrics(metrics: RunMetrics) -> None:
+    metrics.publish(config.ETL_METRICS_DIR, config.ETL_PROMETHEUS_TEXTFILE_DIR, config.ETL_PUSHGATEWAY_URL)
+
+def _load_outputs(names: List[str], summary_names: List[str], label: str,
+                  loader: Optional[ParallelLoader] = None) -> RunMetrics:
+    """
+    Load outputs/<name>.<ext> of each name that has a file, in parallel: on
+    loader if given (which stays open), else on a loader of its own.
+    """
+    ext = get_storage(config.ETL_STORAGE_FORMAT).extension
+    found = {}
+    for name in [*names, *summary_names]:
+        path = f"outputs/{name}{ext}"
+        if os.path.exists(path):
+            found[name] = path
+        else:
+            logger.info(f"Nothing to load for {name}: {path} does not exist.")
+    metrics = RunMetrics(label)
+    if found:
+        owned = loader is None
+        if owned:
+            loader = ParallelLoader(metrics=metrics)
+        else:
+            loader.metrics = metrics
+        try:
+            loader.load({n: p for n, p in found.items() if n in names},
+                        {n: p for n, p in found.items() if n in summary_names})
+        finally:
+            if owned:
+                loader.close()
+        publish_metrics(metrics)
+    return metrics
+
+def load_table(name: str) -> None:
+    """Load one extracted file (outputs/<name>.<ext>) into its registry table."""
+    _load_outputs([name], [], f"load-{name}")
+
+def load_summary_table(name: str) -> None:
+    """Load one extracted summary file (outputs/<name>.<ext>) into its summary table."""
+    _load_outputs([], [name], f"load-{name}")
+
+def run_load_to_postgres(loader: Optional[ParallelLoader] = None) -> None:
+    _load_outputs([spec.name for spec in enabled_specs()], [spec.name for spec in enabled_aggregates()], "load",
+                  loader)
+    print("✅ Data loaded into PostgreSQL (analytics) successfully.")
 
 # Allow CLI execution
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "odoo_etl"
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class StageMetrics:
+    """
+    Totals for one (stage, model).
+
+    - wall_seconds: from the first span start to the last span end; stays 0 for
+      stages that only run interleaved with another one (transform, write)
+    - busy_seconds: summed time spent in the stage; exceeds wall time when shards overlap
+    - rows: rows handled
+    - bytes: bytes over the wire (extract) or written/read (write, load)
+    - retries: retried calls
+    - peak_rss_bytes: process peak RSS when the stage was last recorded
+    """
+    wall_seconds: float = 0.0
+    busy_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    retries: int = 0
+    peak_rss_bytes: int = 0
+
+
+class RunMetrics:
+    """
+    Collects StageMetrics per (stage, model) for one run, from any thread.
+
+    Stages used by the pipeline: "extract" (Odoo calls), "transform",
+    "write" (intermediate files) and "load" (PostgreSQL). The run is
+    published as a JSON report and, optionally, in the Prometheus text
+    format to a node_exporter textfile directory and/or a Pushgateway.
+    """
+
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._stages: Dict[Tuple[str, str], StageMetrics] = {}
+        self._spans: Dict[Tuple[str, str], Tuple[float, float]] = {}
+
+    def add(self, stage: str, model: str, **deltas: float) -> None:
+        """Add to the counters of (stage, model), e.g. add("transform", "products", rows=10, busy_seconds=0.1)."""
+        with self._lock:
+            metrics = self._stages.setdefault((stage, model), StageMetrics())
+            for key, value in deltas.items():
+                setattr(metrics, key, getattr(metrics, key) + value)
+            metrics.peak_rss_bytes = max(metrics.peak_rss_bytes, peak_rss_bytes())
+
+    @contextmanager
+    def span(self, stage: str, model: str) -> Iterator[None]:
+        """
+        Mark a block as part of (stage, model) for wall time (overlapping spans
+        count once) and peak RSS. Busy time is added separately with add().
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                first, last = self._spans.get((stage, model), (start, end))
+                self._spans[(stage, model)] = (min(first, start), max(last, end))
+                metrics = self._stages.setdefault((stage, model), StageMetrics())
+                metrics.wall_seconds = self._spans[(stage, model)][1] - self._spans[(stage, model)][0]
+                metrics.peak_rss_bytes = max(metrics.peak_rss_bytes, peak_rss_bytes())
+
+    def get(self, stage: str, model: str) -> StageMetrics:
+        with self._lock:
+            return StageMetrics(**asdict(self._stages.get((stage, model), StageMetrics())))
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = [
+                {"stage": stage, "model": model, **asdict(metrics)}
+                for (stage, model), metrics in self._stages.items()
+            ]
+        return {
+            "label": self.label,
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            "duration_seconds": time.time() - self.started_at,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": stages,
+        }
+
+    def to_prometheus(self) -> str:
+        """The run's metrics in the Prometheus text exposition format."""
+        report = self.report()
+        lines = []
+        for field in StageMetrics.__dataclass_fields__:
+            name = f"{METRIC_PREFIX}_stage_{field}"
+            lines.append(f"# TYPE {name} gauge")
+            for stage in report["stages"]:
+                lines.append(f'{name}{{run="{self.label}",stage="{stage["stage"]}",model="{stage["model"]}"}} '
+                             f'{stage[field]}')
+        for name, value in (("run_duration_seconds", report["duration_seconds"]),
+                            ("run_peak_rss_bytes", report["peak_rss_bytes"]),
+                            ("run_started_timestamp_seconds", self.started_at)):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines.append(f'{METRIC_PREFIX}_{name}{{run="{self.label}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def publish(self, report_dir: Optional[str] = None, textfile_dir: Optional[str] = None,
+                pushgateway_url: Optional[str] = None) -> Optional[str]:
+        """
+        Write the JSON report to report_dir (one file per run, so runs can be
+        compared), the Prometheus text to textfile_dir/<prefix>_<label>.prom,
+        and push it to pushgateway_url. Each target is skipped when not set;
+        a failed push is logged, not raised. Returns the report path.
+        """
+        report_path = None
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+            stamp = datetime.fromtimestamp(self.started_at, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            report_path = os.path.join(report_dir, f"{self.label}-{stamp}.json")
+            _write_atomic(report_path, json.dumps(self.report(), indent=2))
+            logger.info(f"Wrote run metrics to {report_path}")
+        if textfile_dir:
+            os.makedirs(textfile_dir, exist_ok=True)
+            _write_atomic(os.path.join(textfile_dir, f"{METRIC_PREFIX}_{self.label}.prom"), self.to_prometheus())
+        if pushgateway_url:
+            url = f"{pushgateway_url.rstrip('/')}/metrics/job/{METRIC_PREFIX}/run/{self.label}"
+            request = urllib.request.Request(url, data=self.to_prometheus().encode(), method="PUT",
+                                             headers={"Content-Type": "text/plain; version=0.0.4"})
+            try:
+                urllib.request.urlopen(request, timeout=10).close()
+            except OSError as e:
+                logger.warning(f"Failed to push metrics to {url}: {e}")
+        return report_path
+
+
+def _write_atomic(path: str, text: str) -> None:
+    # textfile collectors may read at any moment; never expose a half-written file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
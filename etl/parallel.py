@@ -0,0 +1,143 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    # Only for annotations: the registry imports ExtractJob, and must stay cheap to import
+    from .connector import OdooConnector
+
+logger = logging.getLogger(__name__)
+
+# sink(job, shard_index, batches) consumes one shard's batches and returns its result
+ShardSink = Callable[["ExtractJob", int, Iterator[List[Dict[str, Any]]]], Any]
+
+
+@dataclass
+class ExtractJob:
+    """
+    One model to extract. ``shards`` > 1 splits it into id ranges fetched concurrently.
+    ``target_latency`` (seconds per call) adapts the page size starting from ``batch_size``.
+
+    ``id_ranges`` fixes the shard plan instead of computing it (e.g. when resuming
+    a checkpointed run), and ``resume_after`` maps a shard index to the last id it
+    already delivered, so fetching continues after it. ``many2one_ids`` reads
+    many2one fields as bare ids (see OdooConnector.iter_batches).
+    """
+    name: str
+    model: str
+    fields: List[str]
+    domain: List[Any] = field(default_factory=list)
+    additional_filter: List[Any] = field(default_factory=list)
+    batch_size: int = 1000
+    shards: int = 1
+    target_latency: Optional[float] = None
+    id_ranges: Optional[List[Optional[Tuple[int, int]]]] = None
+    resume_after: Dict[int, int] = field(default_factory=dict)
+    many2one_ids: bool = False
+
+
+def split_id_range(min_id: int, max_id: int, shards: int) -> List[Tuple[int, int]]:
+    """
+    Split the inclusive id range [min_id, max_id] into at most ``shards``
+    contiguous half-open ranges [lo, hi), in ascending order.
+    """
+    shards = max(1, min(shards, max_id - min_id + 1))
+    step, remainder = divmod(max_id - min_id + 1, shards)
+    ranges = []
+    lo = min_id
+    for i in range(shards):
+        hi = lo + step + (1 if i < remainder else 0)
+        ranges.append((lo, hi))
+        lo = hi
+    return ranges
+
+
+class ExtractionScheduler:
+    """
+    Runs extraction jobs concurrently on a bounded thread pool.
+
+    ``max_workers`` caps the number of in-flight XML-RPC calls across all
+    models and shards, so a run never puts more than that many requests on
+    the Odoo workers at once. Each pool thread uses its own connector clone
+    (and therefore its own ServerProxy). Results are reassembled in shard
+    order, so every model's records come back in ascending id order no
+    matter how the work was interleaved.
+    """
+
+    def __init__(self, connector: "OdooConnector", max_workers: int = 4) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.connector = connector
+        self.max_workers = max_workers
+        self._local = threading.local()
+
+    def _thread_connector(self) -> "OdooConnector":
+        connector = getattr(self._local, "connector", None)
+        if connector is None:
+            connector = self.connector.clone()
+            self._local.connector = connector
+        return connector
+
+    def plan(self, job: ExtractJob) -> List[Optional[Tuple[int, int]]]:
+        """Id ranges to fetch for a job; [None] means a single unbounded fetch."""
+        if job.id_ranges is not None:
+            return job.id_ranges
+        if job.shards <= 1:
+            return [None]
+        bounds = self.connector.fetch_id_bounds(job.model, job.domain + job.additional_filter)
+        if bounds is None:
+            return []
+        return split_id_range(bounds[0], bounds[1], job.shards)
+
+    def _fetch_shard(self, job: ExtractJob, shard_index: int, id_range: Optional[Tuple[int, int]],
+                     sink: ShardSink) -> Any:
+        additional_filter = list(job.additional_filter)
+        if id_range is not None:
+            additional_filter += [("id", ">=", id_range[0]), ("id", "<", id_range[1])]
+        if job.resume_after.get(shard_index):
+            additional_filter.append(("id", ">", job.resume_after[shard_index]))
+        batches = self._thread_connector().iter_batches(
+            model=job.model,
+            fields=job.fields,
+            domain=job.domain,
+            additional_filter=additional_filter,
+            batch_size=job.batch_size,
+            target_latency=job.target_latency,
+            many2one_ids=job.many2one_ids
+        )
+        return sink(job, shard_index, batches)
+
+    def run_shard(self, job: ExtractJob, shard_index: int, sink: ShardSink) -> Any:
+        """Fetch a single shard of job's plan in the calling thread, e.g. from one Airflow task."""
+        return self._fetch_shard(job, shard_index, self.plan(job)[shard_index], sink)
+
+    def run_streaming(self, jobs: List[ExtractJob], sink: ShardSink) -> Dict[str, List[Any]]:
+        """
+        Feed every shard's batch iterator to ``sink`` on the pool and return the
+        sink results per job name, in shard (i.e. ascending id) order.
+        """
+        names = [job.name for job in jobs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Job names must be unique, got {names}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="odoo-extract") as pool:
+            futures = {
+                job.name: [
+                    pool.submit(self._fetch_shard, job, i, id_range, sink)
+                    for i, id_range in enumerate(self.plan(job))
+                ]
+                for job in jobs
+            }
+            return {job.name: [future.result() for future in futures[job.name]] for job in jobs}
+
+    def run(self, jobs: List[ExtractJob]) -> Dict[str, List[Dict[str, Any]]]:
+        """Extract every job and return records keyed by job name."""
+        shards = self.run_streaming(jobs, lambda job, shard_index, batches: [r for b in batches for r in b])
+        results = {}
+        for job in jobs:
+            results[job.name] = [record for shard in shards[job.name] for record in shard]
+            logger.info(f"Extracted {len(results[job.name])} records for '{job.name}' "
+                        f"from {len(shards[job.name])} shard(s)")
+        return results
@@ -0,0 +1,151 @@
+"""
+Reconcile warehouse tables with the records that still exist in Odoo.
+
+The write_date filter of the incremental extracts only sees records that
+changed: deleted records vanish from every search, and archived ones
+(active=False) are hidden by Odoo's active_test. Instead of a full reload,
+a reconciliation lists just the ids of each model with ``search`` and diffs
+them against the table's keys as sorted integer arrays. Missing rows are
+then soft-deleted (deleted_at is set, and cleared again if a record comes
+back) or removed, depending on ETL_RECONCILE.
+
+    ETL_RECONCILE=soft python -m etl.reconcile
+"""
+import logging
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+from config import config
+from .connector import OdooConnector
+from .extractor import OdooDataExtractor
+from .load_to_postgres import PostgresLoader, publish_metrics
+from .metrics import RunMetrics
+from .registry import ModelSpec, enabled_specs, get_spec
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_MODES = ("soft", "delete")
+# ids per search call; no field is read, so pages can be much larger than record batches
+ID_PAGE_SIZE = 50_000
+
+
+@dataclass
+class Reconciliation:
+    """Outcome for one table; every array holds sorted int64 keys."""
+    deleted: "np.ndarray"
+    archived: "np.ndarray"
+    restored: "np.ndarray"
+
+    @property
+    def gone(self) -> "np.ndarray":
+        import numpy as np
+        return np.union1d(self.deleted, self.archived)
+
+
+def _sorted_ids(pages: Iterable[List[int]]) -> "np.ndarray":
+    import numpy as np
+
+    # search pages come in ascending id order, so their concatenation is sorted
+    chunks = [np.asarray(page, dtype=np.int64) for page in pages]
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+
+def _isin_sorted(keys: "np.ndarray", sorted_values: "np.ndarray") -> "np.ndarray":
+    """Mask of keys found in sorted_values, by binary search (no hash set of either side)."""
+    import numpy as np
+
+    if not len(sorted_values):
+        return np.zeros(len(keys), dtype=bool)
+    positions = np.searchsorted(sorted_values, keys).clip(max=len(sorted_values) - 1)
+    return sorted_values[positions] == keys
+
+
+def diff_keys(warehouse: "np.ndarray", existing: "np.ndarray", archived: "np.ndarray",
+              soft_deleted: "np.ndarray") -> Reconciliation:
+    """
+    Compare a table's live keys with Odoo's ids.
+
+    - warehouse: keys of rows not marked deleted
+    - existing: every id in Odoo, archived records included
+    - archived: ids of archived records
+    - soft_deleted: keys of rows marked deleted, which are restored when live again
+    """
+    in_odoo = _isin_sorted(warehouse, existing)
+    deleted = warehouse[~in_odoo]
+    present = warehouse[in_odoo]
+    archived_rows = present[_isin_sorted(present, archived)]
+    live = existing[~_isin_sorted(existing, archived)]
+    restored = soft_deleted[_isin_sorted(soft_deleted, live)]
+    return Reconciliation(deleted, archived_rows, restored)
+
+
+def reconcile_model(spec: ModelSpec, connector: OdooConnector, loader: PostgresLoader, mode: str,
+                    archivable: bool, page_size: int = ID_PAGE_SIZE) -> Reconciliation:
+    """
+    Reconcile spec's table with Odoo. archivable says whether the model has an
+    active field, in which case its archived ids are listed (usually few) and
+    treated like deleted ones.
+    """
+    import numpy as np
+
+    if mode not in RECONCILE_MODES:
+        raise ValueError(f"Unknown reconcile mode '{mode}', expected one of {RECONCILE_MODES}")
+    with loader.metrics.span("reconcile", spec.name):
+        existing = _sorted_ids(connector.iter_ids(spec.model, spec.domain, page_size, active_test=False))
+        archived = np.empty(0, dtype=np.int64)
+        if archivable:
+            archived = _sorted_ids(connector.iter_ids(
+                spec.model, spec.domain + [("active", "=", False)], page_size, active_test=False
+            ))
+
+        loader.create_tables([spec])
+        if mode == "soft":
+            warehouse = loader.fetch_keys(spec.table, spec.key, deleted=False)
+            soft_deleted = loader.fetch_keys(spec.table, spec.key, deleted=True)
+        else:
+            warehouse = loader.fetch_keys(spec.table, spec.key)
+            soft_deleted = np.empty(0, dtype=np.int64)
+        if not len(existing) and len(warehouse):
+            raise RuntimeError(f"Odoo returned no '{spec.model}' ids; refusing to remove every row of {spec.table}")
+
+        result = diff_keys(warehouse, existing, archived, soft_deleted)
+        if mode == "soft":
+            loader.mark_deleted(spec.table, spec.key, result.gone, result.restored)
+        else:
+            loader.delete_keys(spec.table, spec.key, result.gone)
+        if len(result.gone) or len(result.restored):
+            loader.refresh_views([spec.table])
+
+    loader.metrics.add("reconcile", spec.name, rows=len(existing) + len(archived))
+    logger.info(f"Reconciled {spec.table} with {len(existing)} '{spec.model}' ids: {len(result.deleted)} deleted, "
+                f"{len(result.archived)} archived, {len(result.restored)} restored ({mode})")
+    return result
+
+
+def reconcile(names: List[str], mode: Optional[str] = None, label: str = "reconcile",
+              extractor: Optional[OdooDataExtractor] = None) -> None:
+    """
+    Reconcile the tables of the given registry entries, with ETL_RECONCILE's mode
+    by default, over extractor's Odoo session (a new one if not given).
+    """
+    mode = mode or config.ETL_RECONCILE or "soft"
+    os.makedirs("outputs", exist_ok=True)
+    extractor = extractor or OdooDataExtractor()
+    connector = extractor.connector
+    loader = PostgresLoader(metrics=RunMetrics(label))
+    try:
+        for name in names:
+            spec = get_spec(name)
+            reconcile_model(spec, connector, loader, mode, "active" in extractor.schemas.get(spec.model).fields)
+    finally:
+        loader.close()
+    publish_metrics(loader.metrics)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    reconcile([spec.name for spec in enabled_specs()])
@@ -0,0 +1,506 @@
+"""
+Declarative registry of the entities the pipeline moves from Odoo to the warehouse.
+
+Each ModelSpec says where an entity comes from (Odoo model, fields, domain),
+how its batches are transformed, and where it lands (table, key, column
+types). The extract engine (etl.run_extracts), the Airflow DAG (etl.tasks)
+and the loader/DDL (etl.load_to_postgres) all run over REGISTRY, so adding
+an entity means adding one entry here plus its transform.
+
+AGGREGATES lists summary tables that Odoo computes itself with read_group,
+for consumers that only need aggregates: one row per group crosses the
+wire instead of every record. MATERIALIZED_VIEWS are aggregates the
+warehouse computes from the loaded tables, refreshed after each load.
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from config import config
+from .parallel import ExtractJob
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _transform(name: str) -> Callable[["pd.DataFrame"], "pd.DataFrame"]:
+    """
+    etl.transform.<name>, imported on first call. The registry is read when
+    Airflow parses the DAG and when the CLI starts, neither of which should
+    pay for importing pandas.
+    """
+    def transform(df: "pd.DataFrame") -> "pd.DataFrame":
+        from . import transform as transforms
+        return getattr(transforms, name)(df)
+    transform.__name__ = transform.__qualname__ = name
+    return transform
+
+
+def _ddl_version(*statements: str) -> str:
+    """
+    Digest of the DDL behind a warehouse object. The loader records it in
+    etl_schema_version once applied, and skips the DDL while it is unchanged.
+    """
+    import hashlib
+    return hashlib.sha1("\n".join(statements).encode()).hexdigest()[:16]
+
+
+@dataclass
+class ModelSpec:
+    """
+    One Odoo model and its warehouse table.
+
+    - name: entity name, used for the output file, the checkpoint and (by default) the table
+    - model: Odoo model to read
+    - fields: fields to request from Odoo (validated against fields_get)
+    - transform: turns a batch DataFrame of raw records into table rows
+    - columns: target column -> PostgreSQL type, in table order; the transform must produce them
+    - domain: Odoo domain selecting the records
+    - key: primary key column, used for upserts
+    - table: target table, defaults to name
+    - sharded: extract in ODOO_ORDER_LINE_SHARDS concurrent id-range shards (large models)
+    - migrations: SQL run after CREATE TABLE IF NOT EXISTS, to bring older tables up to date;
+      a plain table about to be partitioned is migrated before its rows are copied
+    - partition_by: TIMESTAMP/DATE column to range-partition the table on, one partition
+      per month; it becomes part of the primary key, as PostgreSQL requires
+    - indexes: columns that get a secondary index (dashboard filters and joins)
+    - dimensions: many2one field -> Odoo model, for the fields whose display name the
+      transform keeps; when ETL_DIMENSION_CACHE_SIZE is set, records arrive with bare
+      ids and these names are filled in from the run's DimensionCache, in a column next
+      to the ids that the transform reads with etl.transform.many2one_columns
+    """
+    name: str
+    model: str
+    fields: List[str]
+    transform: Callable[["pd.DataFrame"], "pd.DataFrame"]
+    columns: Dict[str, str]
+    domain: List[Any] = field(default_factory=list)
+    key: str = "id"
+    table: Optional[str] = None
+    sharded: bool = False
+    migrations: List[str] = field(default_factory=list)
+    partition_by: Optional[str] = None
+    indexes: List[str] = field(default_factory=list)
+    dimensions: Dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.table = self.table or self.name
+        unknown = {self.key, self.partition_by, *self.indexes} - set(self.columns) - {None}
+        if unknown:
+            raise ValueError(f"Column(s) {sorted(unknown)} of '{self.name}' are not among its columns")
+
+    @property
+    def conflict_key(self) -> str:
+        """Columns of the primary key, which upserts conflict on."""
+        return f"{self.key}, {self.partition_by}" if self.partition_by else self.key
+
+    def extract_job(self) -> ExtractJob:
+        return ExtractJob(
+            name=self.name,
+            model=self.model,
+            fields=list(self.fields),
+            domain=list(self.domain),
+            batch_size=config.ODOO_BATCH_SIZE,
+            target_latency=config.ODOO_TARGET_LATENCY or None,
+            shards=config.ODOO_ORDER_LINE_SHARDS if self.sharded else 1,
+            many2one_ids=config.ETL_DIMENSION_CACHE_SIZE > 0
+        )
+
+    def create_table_sql(self) -> str:
+        # deleted_at is set by reconciliation (etl.reconcile); the views leave such rows out
+        if self.partition_by:
+            columns = ",\n            ".join(
+                [f"{col} {sql_type}" for col, sql_type in self.columns.items()]
+                + ["deleted_at TIMESTAMP", f"PRIMARY KEY ({self.conflict_key})"]
+            )
+            return f"""
+        CREATE TABLE IF NOT EXISTS {self.table} (
+            {columns}
+        ) PARTITION BY RANGE ({self.partition_by});
+        CREATE TABLE IF NOT EXISTS {self.table}_default PARTITION OF {self.table} DEFAULT;"""
+        columns = ",\n            ".join(
+            [f"{col} {sql_type} PRIMARY KEY" if col == self.key else f"{col} {sql_type}"
+             for col, sql_type in self.columns.items()]
+            + ["deleted_at TIMESTAMP"]
+        )
+        return f"""
+        CREATE TABLE IF NOT EXISTS {self.table} (
+            {columns}
+        );"""
+
+    def partition_name(self, month: str) -> str:
+        """Partition holding the rows of month ("YYYY-MM")."""
+        return f"{self.table}_{month.replace('-', '_')}"
+
+    def partition_sql(self, month: str) -> str:
+        year, number = map(int, month.split("-"))
+        end = f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.partition_name(month)} PARTITION OF {self.table} "
+            f"FOR VALUES FROM ('{month}-01') TO ('{end}-01');"
+        )
+
+    def index_sql(self) -> List[str]:
+        # On a partitioned table the index cascades to every partition, present and future
+        return [f"CREATE INDEX IF NOT EXISTS {self.table}_{col}_idx ON {self.table} ({col});" for col in self.indexes]
+
+    def schema_version(self) -> str:
+        return _ddl_version(self.create_table_sql(), *self.migrations, *self.index_sql())
+
+
+REGISTRY: List[ModelSpec] = [
+    ModelSpec(
+        name="sales_orders",
+        model="sale.order",
+        fields=["id", "name", "partner_id", "amount_total", "state", "date_order", "write_date"],
+        transform=_transform("transform_sales_orders"),
+        columns={
+            "id": "INTEGER",
+            "name": "TEXT",
+            "customer_id": "INTEGER",
+            "customer_name": "TEXT",
+            "amount_total": "NUMERIC(10, 2)",
+            "state": "TEXT",
+            "date_order": "TIMESTAMP",
+            "order_month": "DATE",
+            "revenue_bucket": "TEXT",
+        },
+        # Dashboards filter on a date range: monthly partitions let the planner skip the rest
+        partition_by="date_order",
+        indexes=["customer_id"],
+        dimensions={"partner_id": "res.partner"},
+        # order_month was once a "YYYY-MM" TEXT copy of the month; it is now its first day
+        migrations=[
+            """
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM pg_attribute
+                    WHERE attrelid = 'sales_orders'::regclass AND attname = 'order_month'
+                      AND atttypid = 'text'::regtype
+                ) THEN
+                    ALTER TABLE sales_orders ALTER COLUMN order_month TYPE DATE
+                        USING to_date(order_month, 'YYYY-MM');
+                END IF;
+            END $$;""",
+        ],
+    ),
+    ModelSpec(
+        name="products",
+        model="product.product",
+        fields=["id", "name", "default_code", "list_price", "write_date"],
+        transform=_transform("transform_products"),
+        columns={
+            "id": "INTEGER",
+            "name": "TEXT",
+            "default_code": "TEXT",
+            "list_price": "NUMERIC(10, 2)",
+        },
+    ),
+    ModelSpec(
+        name="customers",
+        model="res.partner",
+        domain=[("customer_rank", ">", 0)],
+        fields=["id", "name", "email", "phone", "city", "country_id", "write_date"],
+        transform=_transform("transform_customers"),
+        columns={
+            "id": "INTEGER",
+            "name": "TEXT",
+            "email": "TEXT",
+            "phone": "TEXT",
+            "city": "TEXT",
+            "country_name": "TEXT",
+        },
+        dimensions={"country_id": "res.country"},
+    ),
+    # Order lines are by far the largest model, so split them into id-range shards
+    ModelSpec(
+        name="order_lines",
+        model="sale.order.line",
+        fields=["id", "order_id", "product_id", "product_uom_qty", "price_unit", "price_subtotal", "write_date"],
+        transform=_transform("transform_order_lines"),
+        columns={
+            "id": "INTEGER",
+            "order_id": "INTEGER",
+            "product_id": "INTEGER",
+            "product_uom_qty": "NUMERIC",
+            "price_unit": "NUMERIC(10, 2)",
+            "price_subtotal": "NUMERIC(10, 2)",
+        },
+        sharded=True,
+        indexes=["order_id", "product_id"],
+        # order_lines tables created before lines were keyed on the Odoo line id get the
+        # column, and a unique index for ON CONFLICT (id) unless a primary key or unique
+        # constraint already covers it (an earlier version added the index to those too).
+        # Their rows without an id are removed by create_tables.
+        migrations=[
+            "ALTER TABLE order_lines ADD COLUMN IF NOT EXISTS id INTEGER;",
+            """
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+                    WHERE i.indrelid = 'order_lines'::regclass AND i.indisunique AND i.indnatts = 1
+                      AND a.attname = 'id' AND c.relname <> 'order_lines_id_key'
+                ) THEN
+                    DROP INDEX IF EXISTS order_lines_id_key;
+                ELSE
+                    CREATE UNIQUE INDEX IF NOT EXISTS order_lines_id_key ON order_lines (id);
+                END IF;
+            END $$;""",
+        ],
+    ),
+    ModelSpec(
+        name="stock_moves",
+        model="stock.move",
+        fields=["id", "reference", "product_id", "product_uom_qty", "location_id", "location_dest_id",
+                "state", "date", "write_date"],
+        transform=_transform("transform_stock_moves"),
+        columns={
+            "id": "INTEGER",
+            "reference": "TEXT",
+            "product_id": "INTEGER",
+            "product_uom_qty": "NUMERIC",
+            "location_id": "INTEGER",
+            "location_dest_id": "INTEGER",
+            "state": "TEXT",
+            "date": "TIMESTAMP",
+        },
+        sharded=True,
+    ),
+    ModelSpec(
+        name="account_move_lines",
+        model="account.move.line",
+        fields=["id", "move_id", "account_id", "partner_id", "product_id", "date", "quantity",
+                "debit", "credit", "balance", "parent_state", "write_date"],
+        transform=_transform("transform_account_move_lines"),
+        columns={
+            "id": "INTEGER",
+            "move_id": "INTEGER",
+            "account_id": "INTEGER",
+            "partner_id": "INTEGER",
+            "product_id": "INTEGER",
+            "date": "DATE",
+            "quantity": "NUMERIC",
+            "debit": "NUMERIC(14, 2)",
+            "credit": "NUMERIC(14, 2)",
+            "balance": "NUMERIC(14, 2)",
+            "parent_state": "TEXT",
+        },
+        sharded=True,
+    ),
+    ModelSpec(
+        name="stock_quants",
+        model="stock.quant",
+        fields=["id", "product_id", "location_id", "quantity", "reserved_quantity", "write_date"],
+        transform=_transform("transform_stock_quants"),
+        columns={
+            "id": "INTEGER",
+            "product_id": "INTEGER",
+            "location_id": "INTEGER",
+            "quantity": "NUMERIC",
+            "reserved_quantity": "NUMERIC",
+        },
+    ),
+]
+
+
+@dataclass
+class AggregateSpec:
+    """
+    A summary table aggregated by Odoo (read_group, lazy=False) rather than from extracted rows.
+
+    - name: summary name, used for the output file and (by default) the table
+    - model: Odoo model to aggregate
+    - groupby: group column -> read_group groupby spec, e.g. "state" or "date_order:month";
+      many2one groups land as the id, date groups as the first day of their period
+    - aggregates: aggregate column -> "agg(field)" (e.g. "sum(amount_total)"), or "__count"
+      for the number of records in the group
+    - columns: column -> PostgreSQL type, in table order; must cover groupby and aggregates
+    - domain: Odoo domain selecting the aggregated records
+    - table: target table, defaults to name; its rows are replaced on every load
+    """
+    name: str
+    model: str
+    groupby: Dict[str, str]
+    aggregates: Dict[str, str]
+    columns: Dict[str, str]
+    domain: List[Any] = field(default_factory=list)
+    table: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        self.table = self.table or self.name
+        if set(self.columns) != set(self.groupby) | set(self.aggregates):
+            raise ValueError(f"Columns of '{self.name}' must be exactly its groupby and aggregate columns")
+
+    def read_group_fields(self) -> List[str]:
+        return [f"{col}:{agg}" for col, agg in self.aggregates.items() if agg != "__count"]
+
+    def transform(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """Turn a page of read_group results into table rows."""
+        import pandas as pd
+
+        out = {}
+        ranges = df["__range"] if "__range" in df.columns else pd.Series(None, index=df.index)
+        for col, spec in self.groupby.items():
+            if ":" in spec:
+                # The label ("May 2024") is localised; the period start is not
+                starts = [r[spec]["from"] if isinstance(r, dict) and spec in r else None for r in ranges]
+                out[col] = pd.to_datetime(starts).date
+            else:
+                out[col] = [v[0] if isinstance(v, list) else (None if v is False else v) for v in df[spec]]
+        for col, agg in self.aggregates.items():
+            out[col] = df["__count" if agg == "__count" else col]
+        return pd.DataFrame(out, index=df.index)[list(self.columns)]
+
+    def create_table_sql(self) -> str:
+        columns = ",\n            ".join(f"{col} {sql_type}" for col, sql_type in self.columns.items())
+        return f"""
+        CREATE TABLE IF NOT EXISTS {self.table} (
+            {columns}
+        );"""
+
+    def schema_version(self) -> str:
+        return _ddl_version(self.create_table_sql())
+
+
+_CONFIRMED_SALES = [("state", "in", ["sale", "done"])]
+
+AGGREGATES: List[AggregateSpec] = [
+    AggregateSpec(
+        name="revenue_by_month",
+        model="sale.order",
+        domain=_CONFIRMED_SALES,
+        groupby={"month": "date_order:month", "state": "state"},
+        aggregates={"order_count": "__count", "revenue": "sum(amount_total)"},
+        columns={"month": "DATE", "state": "TEXT", "order_count": "INTEGER", "revenue": "NUMERIC(14, 2)"},
+    ),
+    AggregateSpec(
+        name="revenue_by_customer",
+        model="sale.order",
+        domain=_CONFIRMED_SALES,
+        groupby={"customer_id": "partner_id"},
+        aggregates={"order_count": "__count", "revenue": "sum(amount_total)"},
+        columns={"customer_id": "INTEGER", "order_count": "INTEGER", "revenue": "NUMERIC(14, 2)"},
+    ),
+    AggregateSpec(
+        name="product_sales",
+        model="sale.order.line",
+        groupby={"product_id": "product_id"},
+        aggregates={"line_count": "__count", "quantity": "sum(product_uom_qty)", "revenue": "sum(price_subtotal)"},
+        columns={"product_id": "INTEGER", "line_count": "INTEGER", "quantity": "NUMERIC", "revenue": "NUMERIC(14, 2)"},
+    ),
+]
+
+
+@dataclass
+class MaterializedView:
+    """
+    A pre-aggregated materialized view over warehouse tables, for dashboards.
+
+    - name: view name
+    - query: SELECT defining the view
+    - unique_key: columns identifying a row; their unique index is what lets the
+      view be refreshed CONCURRENTLY, without blocking readers
+    - tables: tables the query reads; the view is refreshed after any of them is loaded
+    """
+    name: str
+    query: str
+    unique_key: List[str]
+    tables: List[str]
+
+    def create_sql(self) -> str:
+        # WITH NO DATA: the first refresh after a load populates it
+        return f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS {self.name} AS {self.query}
+        WITH NO DATA;
+        CREATE UNIQUE INDEX IF NOT EXISTS {self.name}_key ON {self.name} ({', '.join(self.unique_key)});"""
+
+    def schema_version(self) -> str:
+        return _ddl_version(self.create_sql())
+
+
+_CONFIRMED_ORDERS = "o.state IN ('sale', 'done') AND o.deleted_at IS NULL"
+
+MATERIALIZED_VIEWS: List[MaterializedView] = [
+    MaterializedView(
+        name="mv_revenue_by_month",
+        query=f"""
+        SELECT date_trunc('month', o.date_order)::date AS month,
+               count(*) AS order_count,
+               sum(o.amount_total) AS revenue
+        FROM sales_orders o
+        WHERE {_CONFIRMED_ORDERS}
+        GROUP BY 1""",
+        unique_key=["month"],
+        tables=["sales_orders"],
+    ),
+    MaterializedView(
+        name="mv_revenue_by_customer",
+        query=f"""
+        SELECT o.customer_id,
+               max(o.customer_name) AS customer_name,
+               count(*) AS order_count,
+               sum(o.amount_total) AS revenue,
+               min(o.date_order) AS first_order,
+               max(o.date_order) AS last_order
+        FROM sales_orders o
+        WHERE {_CONFIRMED_ORDERS}
+        GROUP BY o.customer_id""",
+        unique_key=["customer_id"],
+        tables=["sales_orders"],
+    ),
+    MaterializedView(
+        name="mv_revenue_by_product_month",
+        query=f"""
+        SELECT l.product_id,
+               date_trunc('month', o.date_order)::date AS month,
+               count(*) AS line_count,
+               sum(l.product_uom_qty) AS quantity,
+               sum(l.price_subtotal) AS revenue
+        FROM order_lines l
+        JOIN sales_orders o ON o.id = l.order_id
+        WHERE {_CONFIRMED_ORDERS} AND l.deleted_at IS NULL
+        GROUP BY l.product_id, 2""",
+        unique_key=["product_id", "month"],
+        tables=["order_lines", "sales_orders"],
+    ),
+]
+
+
+def enabled_specs() -> List[ModelSpec]:
+    """REGISTRY entries selected by ETL_MODELS (all of them when it is empty), in registry order."""
+    if not config.ETL_MODELS:
+        return list(REGISTRY)
+    unknown = set(config.ETL_MODELS) - {spec.name for spec in REGISTRY}
+    if unknown:
+        raise ValueError(f"Unknown model(s) in ETL_MODELS: {sorted(unknown)}")
+    return [spec for spec in REGISTRY if spec.name in config.ETL_MODELS]
+
+
+def get_spec(name: str) -> ModelSpec:
+    for spec in REGISTRY:
+        if spec.name == name:
+            return spec
+    raise ValueError(f"Unknown model '{name}', expected one of {[spec.name for spec in REGISTRY]}")
+
+
+def enabled_aggregates() -> List[AggregateSpec]:
+    """AGGREGATES entries selected by ETL_AGGREGATES (none when it is empty), in registry order."""
+    unknown = set(config.ETL_AGGREGATES) - {spec.name for spec in AGGREGATES}
+    if unknown:
+        raise ValueError(f"Unknown summary table(s) in ETL_AGGREGATES: {sorted(unknown)}")
+    return [spec for spec in AGGREGATES if spec.name in config.ETL_AGGREGATES]
+
+
+def get_aggregate(name: str) -> AggregateSpec:
+    for spec in AGGREGATES:
+        if spec.name == name:
+            return spec
+    raise ValueError(f"Unknown summary table '{name}', expected one of {[spec.name for spec in AGGREGATES]}")
+
+
+def views_reading(tables: List[str]) -> List[MaterializedView]:
+    """MATERIALIZED_VIEWS that read any of the given tables, in registry order."""
+    return [view for view in MATERIALIZED_VIEWS if set(view.tables) & set(tables)]
@@ -1,23 +1,30 @@
-from typing import NoReturn
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
 import os
-import pandas as pd
 import logging
-from datetime import datetime
+import time
+from itertools import islice
 
+from config import config
+from .checkpoint import CheckpointStore, Watermark, incremental_since
+from .connector import FetchStats
 from .extractor import OdooDataExtractor
-from .transform import (
-    transform_sales_orders,
-    transform_products,
-    transform_customers,
-    transform_order_lines
-)
+from .metrics import RunMetrics
+from .parallel import ExtractJob, ExtractionScheduler
+from .registry import AggregateSpec, ModelSpec, enabled_aggregates, enabled_specs, get_spec
+from .storage import Storage, get_storage, merge_parts
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 LAST_EXTRACT_FILE = "outputs/last_extract_timestamp.txt"
 
 def read_last_extract_timestamp() -> str:
-    """Read last extraction timestamp from a file, or return a default old timestamp"""
+    """
+    Read the timestamp left by the old single-file incremental state, or return a
+    default old timestamp. Only seeds models that have no checkpoint watermark yet.
+    """
     if os.path.exists(LAST_EXTRACT_FILE):
         with open(LAST_EXTRACT_FILE, "r") as f:
             ts = f.read().strip()
@@ -29,87 +36,252 @@ def read_last_extract_timestamp() -> str:
         logger.info(f"No last extract timestamp found, using default {default_ts}")
         return default_ts
 
-def write_last_extract_timestamp(ts: str) -> None:
-    """Write the latest extraction timestamp to a file"""
-    with open(LAST_EXTRACT_FILE, "w") as f:
-        f.write(ts)
-    logger.info(f"Updated last extract timestamp to: {ts}")
-
-def main() -> NoReturn:
-    extractor = OdooDataExtractor()
-    os.makedirs("outputs", exist_ok=True)
-
-    last_extract_ts = read_last_extract_timestamp()
-
-    # --- Sales Orders ---
-    # Incremental filter: fetch records updated since last extract
-    sales_domain = []
-    sales_incremental_filter = [('write_date', '>=', last_extract_ts)]
-    df_sales = pd.DataFrame(extractor.connector.fetch_all_records(
-        model="sale.order",
-        fields=["id", "name", "partner_id", "amount_total", "state", "date_order", "write_date"],
-        domain=sales_domain,
-        additional_filter=sales_incremental_filter,
-        batch_size=1000
-    ))
-    if not df_sales.empty:
-        df_sales = transform_sales_orders(df_sales)
-        df_sales.to_csv("outputs/sales_orders.csv", index=False)
-        logger.info("Transformed & saved sales_orders.csv")
-    else:
-        logger.info("No new sales orders to extract.")
-
-    # --- Products ---
-    # For products, you can also apply incremental filter on 'write_date' if desired
-    products_incremental_filter = [('write_date', '>=', last_extract_ts)]
-    df_products = pd.DataFrame(extractor.connector.fetch_all_records(
-        model="product.product",
-        fields=["id", "name", "default_code", "list_price", "write_date"],
-        additional_filter=products_incremental_filter,
-        batch_size=1000
-    ))
-    if not df_products.empty:
-        df_products = transform_products(df_products)
-        df_products.to_csv("outputs/products.csv", index=False)
-        logger.info("Transformed & saved products.csv")
-    else:
-        logger.info("No new products to extract.")
-
-    # --- Customers ---
-    customers_domain = [("customer_rank", ">", 0)]
-    customers_incremental_filter = [('write_date', '>=', last_extract_ts)]
-    df_customers = pd.DataFrame(extractor.connector.fetch_all_records(
-        model="res.partner",
-        domain=customers_domain,
-        fields=["id", "name", "email", "phone", "city", "country_id", "write_date"],
-        additional_filter=customers_incremental_filter,
-        batch_size=1000
-    ))
-    if not df_customers.empty:
-        df_customers = transform_customers(df_customers)
-        df_customers.to_csv("outputs/customers.csv", index=False)
-        logger.info("Transformed & saved customers.csv")
-    else:
-        logger.info("No new customers to extract.")
-
-    # --- Order Lines ---
-    order_lines_incremental_filter = [('write_date', '>=', last_extract_ts)]
-    df_lines = pd.DataFrame(extractor.connector.fetch_all_records(
-        model="sale.order.line",
-        fields=["order_id", "product_id", "product_uom_qty", "price_unit", "price_subtotal", "write_date"],
-        additional_filter=order_lines_incremental_filter,
-        batch_size=1000
-    ))
-    if not df_lines.empty:
-        df_lines = transform_order_lines(df_lines)
-        df_lines.to_csv("outputs/order_lines.csv", index=False)
-        logger.info("Transformed & saved order_lines.csv")
-    else:
-        logger.info("No new order lines to extract.")
+def write_batches(
+    batches: Iterable[List[Dict[str, Any]]],
+    transform: Callable[["pd.DataFrame"], "pd.DataFrame"],
+    path: str,
+    storage: Storage,
+    dtypes: Optional[Dict[str, str]] = None,
+    metrics: Optional[RunMetrics] = None,
+    name: str = ""
+) -> int:
+    """
+    Transform each batch and append it to path as it arrives, so only one batch
+    is in memory at a time. Nothing is written when there are no records.
+    dtypes (see etl.schema) types the raw columns before the transform.
+    Time spent transforming and writing is added to metrics under name.
+    Returns the number of rows written.
+    """
+    from .schema import to_frame
+
+    rows = 0
+    writer = None
+    try:
+        for batch in batches:
+            start = time.perf_counter()
+            df = transform(to_frame(batch, dtypes))
+            transformed = time.perf_counter()
+            if writer is None:
+                writer = storage.open_writer(path)
+            writer.write(df)
+            rows += len(df)
+            if metrics is not None:
+                metrics.add("transform", name, rows=len(df), busy_seconds=transformed - start)
+                metrics.add("write", name, rows=len(df), busy_seconds=time.perf_counter() - transformed)
+    finally:
+        if writer is not None:
+            writer.close()
+    if metrics is not None and writer is not None:
+        metrics.add("write", name, bytes=os.path.getsize(path))
+    return rows
+
+def write_checkpointed(
+    batches: Iterable[List[Dict[str, Any]]],
+    transform: Callable[["pd.DataFrame"], "pd.DataFrame"],
+    part_prefix: str,
+    storage: Storage,
+    store: CheckpointStore,
+    name: str,
+    shard_index: int,
+    checkpoint_pages: int = 10,
+    dtypes: Optional[Dict[str, str]] = None,
+    metrics: Optional[RunMetrics] = None
+) -> List[Tuple[str, int]]:
+    """
+    write_batches for one shard of a checkpointed run. Starts a new part file
+    every checkpoint_pages batches and records each closed part, with the last
+    id it holds, in store; a resumed shard keeps its recorded parts and only
+    writes what comes after them. Returns the shard's (part_path, rows) list.
+    """
+    progress = store.shard_progress(name, shard_index)
+    parts = [(part, rows) for part, rows in progress["parts"]]
+    if progress["done"]:
+        return parts
+
+    batches = iter(batches)
+    while True:
+        last_ids: List[int] = []
+
+        def page_group() -> Iterable[List[Dict[str, Any]]]:
+            for batch in islice(batches, checkpoint_pages):
+                yield batch
+                last_ids.append(batch[-1]["id"])
+
+        part = f"{part_prefix}.{len(parts)}"
+        rows = write_batches(page_group(), transform, part, storage, dtypes, metrics, name)
+        if not last_ids:
+            break
+        parts.append((part, rows))
+        store.record_part(name, shard_index, part, rows, last_ids[-1])
+
+    store.finish_shard(name, shard_index)
+    return parts
+
+def build_jobs() -> List[ExtractJob]:
+    """One ExtractJob per enabled registry entry."""
+    return [spec.extract_job() for spec in enabled_specs()]
+
+class ExtractRun:
+    """
+    What every extraction stage shares: the Odoo session, storage backend,
+    checkpoint store, schema cache and many2one name cache. Used by main() for a whole run in one
+    process, and by the Airflow tasks (etl.tasks) one stage at a time.
+    """
+
+    def __init__(self, label: str = "extract", extractor: Optional[OdooDataExtractor] = None) -> None:
+        from .dimensions import DimensionCache
+
+        os.makedirs("outputs", exist_ok=True)
+        self.metrics = RunMetrics(label)
+        self.extractor = extractor or OdooDataExtractor()
+        # A reused session (etl.cli) starts each run's call totals from zero
+        self.extractor.connector.fetch_stats.clear()
+        self.storage = get_storage(config.ETL_STORAGE_FORMAT)
+        self.store = CheckpointStore(config.ETL_CHECKPOINT_FILE)
+        self.scheduler = ExtractionScheduler(self.extractor.connector, max_workers=config.ODOO_MAX_WORKERS)
+        self.schemas = self.extractor.schemas
+        self.dtypes: Dict[str, Dict[str, str]] = {}
+        self.dimensions = DimensionCache(self.extractor.connector, config.ETL_DIMENSION_CACHE_SIZE,
+                                         config.ODOO_BATCH_SIZE)
+
+    def output_path(self, job: ExtractJob) -> str:
+        return f"outputs/{job.name}{self.storage.extension}"
+
+    def prepare(self, job: ExtractJob) -> None:
+        """
+        Validate job's fields against fields_get (cached on disk), then start or
+        resume its checkpointed run.
+
+        Each model is filtered on write_date since its own watermark. A new run takes
+        its next watermark from Odoo *before* fetching, so anything written during the
+        run is picked up next time, and fixes its shard plan; an interrupted run
+        resumes with the same filter and plan, after the last id each shard checkpointed.
+        """
+        schema = self.schemas.get(job.model)
+        job.fields = schema.validate(job.fields)
+        self.dtypes[job.name] = schema.dtypes(job.fields)
+
+        run = self.store.pending_run(job.name)
+        if run is None:
+            since = incremental_since(
+                self.store.watermark(job.name), read_last_extract_timestamp(), config.ODOO_WATERMARK_OVERLAP
+            )
+            latest = self.extractor.connector.fetch_latest_write(job.model, job.domain)
+            job.additional_filter = [("write_date", ">=", since)]
+            self.store.start_run(job.name, since, Watermark(*latest) if latest else None, self.scheduler.plan(job))
+            run = self.store.pending_run(job.name)
+        else:
+            logger.info(f"Resuming interrupted extraction of '{job.name}' from write_date >= {run['since']}")
+        job.additional_filter = [("write_date", ">=", run["since"])]
+        job.id_ranges = [tuple(r) if r else None for r in run["shards"]]
+        job.resume_after = {int(i): p["last_id"] for i, p in run["progress"].items() if not p["done"]}
+
+    def transform(self, spec: ModelSpec) -> Callable[["pd.DataFrame"], "pd.DataFrame"]:
+        """spec's transform, preceded by filling in names from the cache when many2one ids come bare."""
+        if not (spec.dimensions and config.ETL_DIMENSION_CACHE_SIZE > 0):
+            return spec.transform
+        return lambda df: spec.transform(self.dimensions.resolve(df, spec.dimensions))
+
+    def save_shard(self, job: ExtractJob, shard_index: int,
+                   batches: Iterable[List[Dict[str, Any]]]) -> List[Tuple[str, int]]:
+        """
+        Shard sink: transforms the shard's batches and appends them to checkpointed
+        part files as they arrive, so memory is bounded by batch size.
+        """
+        part_prefix = f"{self.output_path(job)}.part{shard_index}"
+        with self.metrics.span("extract", job.name):
+            return write_checkpointed(batches, self.transform(get_spec(job.name)), part_prefix, self.storage,
+                                      self.store, job.name, shard_index, config.ETL_CHECKPOINT_PAGES,
+                                      self.dtypes[job.name], self.metrics)
+
+    def finish(self, job: ExtractJob) -> int:
+        """Merge job's shard parts in id order into its output file and commit its watermark."""
+        run = self.store.pending_run(job.name)
+        if run is None:
+            raise RuntimeError(f"No extraction of '{job.name}' in progress")
+        progress = [self.store.shard_progress(job.name, i) for i in range(len(run["shards"]))]
+        unfinished = [i for i, p in enumerate(progress) if not p["done"]]
+        if unfinished:
+            raise RuntimeError(f"Shard(s) {unfinished} of '{job.name}' have not finished extracting")
+
+        parts = [(part, rows) for p in progress for part, rows in p["parts"]]
+        path = self.output_path(job)
+        if parts and not all(os.path.exists(part) for part, _ in parts):
+            # merge_parts removes parts only after the output is in place
+            rows = sum(rows for _, rows in parts)
+            logger.info(f"{path} was already merged before the last run stopped")
+        else:
+            rows = merge_parts(parts, path, self.storage)
+        if rows:
+            logger.info(f"Transformed & saved {rows} rows to {path}")
+        else:
+            logger.info(f"No new {job.name.replace('_', ' ')} to extract.")
+        self.store.complete_run(job.name)
+        return rows
+
+    def extract_aggregate(self, spec: AggregateSpec) -> int:
+        """
+        Fetch summary spec from Odoo's read_group and write it to its output file,
+        replacing the previous one. A summary is always recomputed in full: groups
+        of an incremental slice could not be merged with the previous totals.
+        """
+        connector = self.extractor.connector
+        stats_key = f"{spec.model}:read_group"
+        before = connector.fetch_stats.get(stats_key, FetchStats())
+        path = f"outputs/{spec.name}{self.storage.extension}"
+        tmp_path = f"{path}.tmp"
+        with self.metrics.span("extract", spec.name):
+            groups = connector.iter_groups(spec.model, list(spec.groupby.values()), spec.read_group_fields(),
+                                           spec.domain, config.ODOO_BATCH_SIZE)
+            rows = write_batches(groups, spec.transform, tmp_path, self.storage,
+                                 metrics=self.metrics, name=spec.name)
+        if rows:
+            logger.info(f"Saved {rows} groups of '{spec.model}' to {path}")
+        else:
+            # An empty file still replaces the previous one, so the summary table is emptied
+            # rather than reloaded with stale totals
+            import pandas as pd
+            with self.storage.open_writer(tmp_path) as writer:
+                writer.write(pd.DataFrame({col: pd.Series(dtype=object) for col in spec.columns}))
+            logger.info(f"No groups of '{spec.model}' for {spec.name}; {path} is now empty.")
+        os.replace(tmp_path, path)
+
+        after = connector.fetch_stats.get(stats_key, FetchStats())
+        self.metrics.add("extract", spec.name, rows=after.rows - before.rows,
+                         busy_seconds=after.seconds - before.seconds, retries=after.retries - before.retries,
+                         bytes=after.bytes_sent + after.bytes_received - before.bytes_sent - before.bytes_received)
+        return rows
+
+    def publish_metrics(self, jobs: List[ExtractJob]) -> None:
+        """Add the connector's per-model call totals to the run metrics and publish them."""
+        for job in jobs:
+            stats = self.extractor.connector.fetch_stats.get(job.model)
+            if stats is None:
+                continue
+            logger.info(f"{job.model}: {stats.rows} rows in {stats.calls} calls, {stats.retries} retries, "
+                        f"{stats.bytes_received} bytes received, {stats.rows_per_second:.0f} rows/s")
+            self.metrics.add("extract", job.name, rows=stats.rows, busy_seconds=stats.seconds,
+                             bytes=stats.bytes_sent + stats.bytes_received, retries=stats.retries)
+        if self.dimensions.hits or self.dimensions.misses:
+            logger.info(f"Name cache: {self.dimensions.hits} hits, {self.dimensions.misses} ids fetched, "
+                        f"{self.dimensions.evictions} evicted, {len(self.dimensions)} cached")
+        self.metrics.publish(config.ETL_METRICS_DIR, config.ETL_PROMETHEUS_TEXTFILE_DIR,
+                             config.ETL_PUSHGATEWAY_URL)
+
+def main(extractor: Optional[OdooDataExtractor] = None) -> None:
+    """Extract every enabled model and summary table, over extractor's Odoo session if given."""
+    extract_run = ExtractRun(extractor=extractor)
+    jobs = build_jobs()
+    for job in jobs:
+        extract_run.prepare(job)
+
+    extract_run.scheduler.run_streaming(jobs, extract_run.save_shard)
+    for job in jobs:
+        extract_run.finish(job)
+    for spec in enabled_aggregates():
+        extract_run.extract_aggregate(spec)
 
-    # Update last extract timestamp to current UTC time (ISO format)
-    new_extract_ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    write_last_extract_timestamp(new_extract_ts)
+    extract_run.publish_metrics(jobs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .connector import OdooConnector
+from .storage import _import_pyarrow
+
+logger = logging.getLogger(__name__)
+
+# fields_get attributes the schema layer needs
+FIELD_ATTRIBUTES = ["type", "store", "string", "relation"]
+
+# pandas dtype per Odoo field type; relational fields stay object ([id, name] pairs, id lists)
+ODOO_DTYPES: Dict[str, str] = {
+    "integer": "Int64",
+    "float": "float64",
+    "monetary": "float64",
+    "boolean": "boolean",
+    "char": "string",
+    "text": "string",
+    "html": "string",
+    "selection": "string",
+    "date": "datetime64[ns]",
+    "datetime": "datetime64[ns]",
+}
+
+# Never fetched unless asked for by name: large payloads that no warehouse table uses
+HEAVY_TYPES = ("binary", "one2many", "many2many", "html")
+
+
+@dataclass
+class ModelSchema:
+    """fields_get metadata of one Odoo model."""
+    model: str
+    fields: Dict[str, Dict[str, Any]]
+
+    def default_fields(self) -> List[str]:
+        """Stored fields, without binary, x2many and html columns."""
+        return [
+            name for name, meta in self.fields.items()
+            if meta.get("store", True) and meta.get("type") not in HEAVY_TYPES
+        ]
+
+    def validate(self, requested: Optional[List[str]]) -> List[str]:
+        """
+        Check a field projection against the model and return the list to request.
+        An empty projection becomes default_fields() instead of "every column".
+        Unknown fields and non-stored (computed on every read) fields are rejected.
+        """
+        if not requested:
+            return self.default_fields()
+        unknown = [f for f in requested if f not in self.fields and f != "id"]
+        if unknown:
+            raise ValueError(f"Model '{self.model}' has no field(s) {unknown}")
+        computed = [f for f in requested if f != "id" and not self.fields[f].get("store", True)]
+        if computed:
+            raise ValueError(
+                f"Field(s) {computed} of '{self.model}' are not stored; "
+                f"Odoo would compute them for every row read"
+            )
+        return list(requested)
+
+    def _types(self) -> Dict[str, Optional[str]]:
+        return {"id": "integer", **{name: meta.get("type") for name, meta in self.fields.items()}}
+
+    def dtypes(self, fields: List[str]) -> Dict[str, str]:
+        """pandas dtypes for the typed fields among ``fields``."""
+        types = self._types()
+        return {f: ODOO_DTYPES[types[f]] for f in fields if types.get(f) in ODOO_DTYPES}
+
+    def arrow_schema(self, fields: List[str]):
+        """
+        pyarrow schema for ``fields``, fixed up front so that every page of a model
+        converts to the same types, however many of its values are empty.
+        """
+        pa = _import_pyarrow()
+        arrow_types = {
+            "integer": pa.int64(), "float": pa.float64(), "monetary": pa.float64(), "boolean": pa.bool_(),
+            "date": pa.timestamp("ns"), "datetime": pa.timestamp("ns"),
+            "many2one": pa.struct([("id", pa.int64()), ("name", pa.string())]),
+            "one2many": pa.list_(pa.int64()), "many2many": pa.list_(pa.int64()),
+        }
+        types = self._types()
+        return pa.schema([(f, arrow_types.get(types.get(f), pa.string())) for f in fields])
+
+
+def to_frame(records: List[Dict[str, Any]], dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Build a DataFrame from search_read records with the given column dtypes.
+    Odoo sends False for every empty non-boolean value; those become missing.
+    """
+    df = pd.DataFrame(records)
+    if not dtypes:
+        return df
+    converted = {}
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if dtype != "boolean" and values.dtype == object:
+            values = pd.Series([None if v is False else v for v in values], index=df.index, dtype=object)
+        if dtype.startswith("datetime"):
+            converted[col] = pd.to_datetime(values)
+        elif dtype == "float64":
+            converted[col] = pd.to_numeric(values).astype(dtype)
+        else:
+            converted[col] = values.astype(dtype)
+    return df.assign(**converted)
+
+
+def _many2one_struct(value: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(value, (list, tuple)):
+        return {"id": value[0], "name": value[1]}
+    if value is None or value is False:
+        return None
+    return {"id": value, "name": None}
+
+
+def to_arrow(df: pd.DataFrame, schema):
+    """
+    Convert a to_frame() result to a pyarrow RecordBatch with ``schema`` (see
+    ModelSchema.arrow_schema). Many2one [id, name] pairs, or bare ids, become
+    {id, name} structs; Odoo's False for an empty value becomes null.
+    """
+    pa = _import_pyarrow()
+    arrays = []
+    for field in schema:
+        values = df[field.name]
+        if pa.types.is_struct(field.type):
+            values = [_many2one_struct(v) for v in values]
+        elif values.dtype == object:
+            values = [None if v is False else v for v in values]
+        arrays.append(pa.array(values, type=field.type, from_pandas=True))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class SchemaCache:
+    """
+    Calls fields_get at most once per model per ``ttl`` seconds. Results are
+    kept in memory and in a JSON file at ``path``, so runs within the TTL
+    make no metadata calls at all.
+    """
+
+    def __init__(self, connector: OdooConnector, path: str, ttl: float = 86400.0) -> None:
+        self.connector = connector
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    def _save(self) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def get(self, model: str) -> ModelSchema:
+        with self._lock:
+            entry = self._entries.get(model)
+            if entry is None or time.time() - entry["fetched_at"] > self.ttl:
+                fields = self.connector.fields_get(model, FIELD_ATTRIBUTES)
+                entry = {"fetched_at": time.time(), "fields": fields}
+                self._entries[model] = entry
+                self._save()
+                logger.info(f"Fetched {len(fields)} field definitions for '{model}'")
+            return ModelSchema(model, entry["fields"])
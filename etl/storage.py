@@ -0,0 +1,207 @@
+import os
+import shutil
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class FrameWriter:
+    """Appends transformed batches to one intermediate file."""
+
+    def write(self, df: "pd.DataFrame") -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "FrameWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Storage:
+    """
+    Intermediate format between the extract and load stages.
+
+    Files are written batch by batch through open_writer, shard parts are
+    merged with concat, and the loader reads them back with read, which
+    may project to a subset of columns.
+    """
+    name = ""
+    extension = ""
+
+    def open_writer(self, path: str) -> FrameWriter:
+        raise NotImplementedError
+
+    def concat(self, parts: List[str], path: str) -> None:
+        raise NotImplementedError
+
+    def read(self, path: str, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        raise NotImplementedError
+
+
+class _CsvWriter(FrameWriter):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.header = True
+
+    def write(self, df: "pd.DataFrame") -> None:
+        df.to_csv(self.path, mode="w" if self.header else "a", header=self.header, index=False)
+        self.header = False
+
+
+class CsvStorage(Storage):
+    """Plain CSV; every value goes through text and dtypes are re-inferred on read."""
+    name = "csv"
+    extension = ".csv"
+
+    def open_writer(self, path: str) -> FrameWriter:
+        return _CsvWriter(path)
+
+    def concat(self, parts: List[str], path: str) -> None:
+        with open(path, "wb") as out:
+            for i, part in enumerate(parts):
+                with open(part, "rb") as f:
+                    if i:
+                        f.readline()
+                    shutil.copyfileobj(f, out)
+
+    def read(self, path: str, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        import pandas as pd
+        df = pd.read_csv(path, usecols=columns)
+        return df if columns is None else df[columns]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("The parquet storage format requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _file_schema(pa, schema):
+    """
+    schema with dictionary (categorical) columns given int32 indices. Arrow picks
+    the narrowest index type that fits one batch's categories, e.g. int8, which a
+    later batch or part with more categories would overflow when cast to it.
+    """
+    return pa.schema([
+        f.with_type(pa.dictionary(pa.int32(), f.type.value_type, f.type.ordered))
+        if pa.types.is_dictionary(f.type) else f
+        for f in schema
+    ], metadata=schema.metadata)
+
+
+class _ParquetWriter(FrameWriter):
+    def __init__(self, path: str) -> None:
+        self.pa = _import_pyarrow()
+        self.path = path
+        self.writer = None
+
+    def _to_table(self, df: "pd.DataFrame"):
+        pa = self.pa
+        # Odoo sends False for empty char fields; Arrow cannot mix it with strings.
+        df = df.assign(**{
+            col: df[col].where(df[col].map(lambda v: v is not False), None)
+            for col in df.columns
+            if df[col].dtype == object
+        })
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            # A column that is entirely empty in the first batch would be typed null
+            # and reject later values; assume it holds strings.
+            schema = pa.schema([
+                f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema
+            ], metadata=table.schema.metadata)
+            return table.cast(_file_schema(pa, schema))
+        return table.cast(self.writer.schema)
+
+    def write(self, df: "pd.DataFrame") -> None:
+        table = self._to_table(df)
+        if self.writer is None:
+            self.writer = self.pa.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+class ParquetStorage(Storage):
+    """
+    Parquet via pyarrow. Keeps column types (ints stay ints, date_order stays a
+    timestamp), compresses per column and reads back only the requested columns.
+    """
+    name = "parquet"
+    extension = ".parquet"
+
+    def open_writer(self, path: str) -> FrameWriter:
+        return _ParquetWriter(path)
+
+    def concat(self, parts: List[str], path: str) -> None:
+        pa = _import_pyarrow()
+        writer = None
+        try:
+            for part in parts:
+                source = pa.parquet.ParquetFile(part)
+                if writer is None:
+                    writer = pa.parquet.ParquetWriter(path, _file_schema(pa, source.schema_arrow))
+                for i in range(source.num_row_groups):
+                    writer.write_table(source.read_row_group(i).cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def read(self, path: str, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+        pa = _import_pyarrow()
+        return pa.parquet.read_table(path, columns=columns).to_pandas()
+
+
+STORAGES: Dict[str, Storage] = {s.name: s for s in (CsvStorage(), ParquetStorage())}
+
+
+def get_storage(name: str) -> Storage:
+    try:
+        return STORAGES[name]
+    except KeyError:
+        raise ValueError(f"Unknown storage format '{name}', expected one of {sorted(STORAGES)}") from None
+
+
+def storage_for_path(path: str) -> Storage:
+    """Pick the storage backend from a file's extension."""
+    ext = os.path.splitext(path)[1]
+    for storage in STORAGES.values():
+        if storage.extension == ext:
+            return storage
+    raise ValueError(f"No storage format handles '{path}'")
+
+
+def read_frame(path: str, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+    """Read an intermediate file, with the backend chosen by its extension."""
+    return storage_for_path(path).read(path, columns)
+
+
+def merge_parts(parts: List[Tuple[str, int]], path: str, storage: Storage) -> int:
+    """
+    Concatenate (part_path, rows) parts, in order, into path and remove them.
+    path is replaced atomically and left untouched when no part has rows; parts
+    are only removed once path is in place, so a missing part means a merge
+    already completed. Returns the total number of rows.
+    """
+    written = [part for part, rows in parts if rows]
+    if not written:
+        return 0
+    tmp_path = f"{path}.tmp"
+    storage.concat(written, tmp_path)
+    os.replace(tmp_path, path)
+    for part in written:
+        os.remove(part)
+    return sum(rows for _, rows in parts)
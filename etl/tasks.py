@@ -0,0 +1,87 @@
+"""
+Python callables for the per-model Airflow DAG (airflow_dags/odoo_etl_dags.py).
+
+Each function runs one stage for one model in the task's own process:
+plan_extract starts (or resumes) the model's checkpointed run and returns
+the shard indices to map over, extract_shard fetches and transforms one
+shard, finish_extract merges the shards and commits the watermark, and
+load loads the result; with ETL_RECONCILE set, reconcile then marks or
+removes the rows deleted or archived in Odoo. Summary tables
+(etl.registry.AGGREGATES) take two tasks: extract_aggregate and
+load_summary. All state passes through the checkpoint store and the
+outputs/ directory, so a retried task resumes where it stopped.
+
+Airflow imports this module every time it parses the DAG, so the stage
+modules (and pandas, numpy and psycopg2 with them) are only imported by
+the callables that run them.
+"""
+from typing import List
+
+from .parallel import ExtractJob
+from .registry import enabled_aggregates, enabled_specs, get_aggregate, get_spec
+
+
+def model_names() -> List[str]:
+    return [spec.name for spec in enabled_specs()]
+
+
+def aggregate_names() -> List[str]:
+    return [spec.name for spec in enabled_aggregates()]
+
+
+def _job(name: str) -> ExtractJob:
+    return get_spec(name).extract_job()
+
+
+def plan_extract(name: str) -> List[int]:
+    from .run_extracts import ExtractRun
+
+    job = _job(name)
+    ExtractRun().prepare(job)
+    return list(range(len(job.id_ranges)))
+
+
+def extract_shard(name: str, shard_index: int) -> int:
+    """Extract and transform one shard; returns the rows written."""
+    from .run_extracts import ExtractRun
+
+    extract_run = ExtractRun(label=f"extract-{name}-{shard_index}")
+    job = _job(name)
+    extract_run.prepare(job)
+    parts = extract_run.scheduler.run_shard(job, shard_index, extract_run.save_shard)
+    extract_run.publish_metrics([job])
+    return sum(rows for _, rows in parts)
+
+
+def finish_extract(name: str) -> int:
+    from .run_extracts import ExtractRun
+
+    return ExtractRun().finish(_job(name))
+
+
+def load(name: str) -> None:
+    from .load_to_postgres import load_table
+
+    load_table(name)
+
+
+def reconcile(name: str) -> None:
+    from .reconcile import reconcile as reconcile_tables
+
+    reconcile_tables([name], label=f"reconcile-{name}")
+
+
+def extract_aggregate(name: str) -> int:
+    """Fetch one summary table from Odoo's read_group; returns the groups written."""
+    from .run_extracts import ExtractRun
+
+    extract_run = ExtractRun(label=f"extract-{name}")
+    rows = extract_run.extract_aggregate(get_aggregate(name))
+    extract_run.publish_metrics([])
+    return rows
+
+
+def load_summary(name: str) -> None:
+    from .load_to_postgres import load_summary_table
+
+    load_summary_table(name)
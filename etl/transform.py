@@ -1,50 +1,160 @@
 import pandas as pd
+import numpy as np
 import ast
-from typing import Optional
+from operator import itemgetter
+from typing import Any, Optional, Sequence, Tuple
 
-def extract_id(val: Optional[str]) -> Optional[int]:
+from config import config
+
+# Odoo ids are PostgreSQL INTEGERs, so they fit in 32 bits
+ID_DTYPE = "Int32"
+REVENUE_BUCKETS = ("low", "medium", "high")
+
+# Odoo returns many2one values as [id, display_name], or False when empty
+_PAIR_TYPES = (list, tuple)
+_EMPTY_MANY2ONE = (0, None)
+
+def _parse_legacy_many2one(val: Any) -> Tuple[Any, Any]:
+    """Parse a bare id or the legacy "[id, 'name']" string form; anything else is empty."""
+    if type(val) is int:
+        # read with load="" (see etl.dimensions): the id without its name
+        return val, None
+    if not isinstance(val, str):
+        return _EMPTY_MANY2ONE
     try:
-        return ast.literal_eval(str(val))[0]
+        parsed = ast.literal_eval(val)
     except Exception:
-        return None
+        return _EMPTY_MANY2ONE
+    if type(parsed) in _PAIR_TYPES and len(parsed) == 2:
+        return parsed
+    return _EMPTY_MANY2ONE
+
+def split_many2one(series: pd.Series, id_dtype: str = "Int64") -> Tuple[pd.Series, pd.Series]:
+    """
+    Split a many2one column into (ids, names) in one pass.
+
+    Handles [id, name] lists/tuples, bare ids (with a None name), False,
+    None/NaN and the legacy string form. Ids come back as nullable id_dtype ("Int64" or "Int32") and names
+    as object, both None where the value is empty.
+    """
+    values = series.to_numpy(dtype=object)
+    pairs = [
+        v if type(v) in _PAIR_TYPES and len(v) == 2 else _parse_legacy_many2one(v)
+        for v in values
+    ]
+    n = len(pairs)
+    ids = np.fromiter(map(itemgetter(0), pairs), dtype=pd.api.types.pandas_dtype(id_dtype).numpy_dtype, count=n)
+    names = np.fromiter(map(itemgetter(1), pairs), dtype=object, count=n)
+    missing = np.fromiter((p is _EMPTY_MANY2ONE for p in pairs), dtype=bool, count=n)
+    return (
+        pd.Series(pd.arrays.IntegerArray(ids, missing), index=series.index, name=series.name),
+        pd.Series(names, index=series.index, name=series.name, dtype=object),
+    )
+
+# etl.dimensions resolves a many2one field to its id column plus this name column
+RESOLVED_NAME_SUFFIX = "__name"
+
+def many2one_columns(df: pd.DataFrame, field: str, id_dtype: str = "Int64") -> Tuple[pd.Series, pd.Series]:
+    """
+    (ids, names) of many2one column ``field`` of df: split from Odoo's values,
+    or taken as they are when etl.dimensions has already resolved the field.
+    """
+    name_col = field + RESOLVED_NAME_SUFFIX
+    if name_col in df.columns:
+        return df[field].astype(id_dtype), df[name_col]
+    return split_many2one(df[field], id_dtype)
+
+def _drop_many2one(df: pd.DataFrame, field: str) -> pd.DataFrame:
+    return df.drop(columns=[col for col in (field, field + RESOLVED_NAME_SUFFIX) if col in df.columns])
+
+def extract_id(val: Optional[str]) -> Optional[int]:
+    pair = val if type(val) in _PAIR_TYPES and len(val) == 2 else _parse_legacy_many2one(val)
+    return None if pair is _EMPTY_MANY2ONE else pair[0]
 
 def extract_name(val: Optional[str]) -> Optional[str]:
-    try:
-        return ast.literal_eval(str(val))[1]
-    except Exception:
-        return None
+    pair = val if type(val) in _PAIR_TYPES and len(val) == 2 else _parse_legacy_many2one(val)
+    return None if pair is _EMPTY_MANY2ONE else pair[1]
 
-def transform_sales_orders(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["customer_id"] = df["partner_id"].apply(extract_id)
-    df["customer_name"] = df["partner_id"].apply(extract_name)
-    df = df.drop(columns=["partner_id"])
+def revenue_bucket(amount: pd.Series, thresholds: Optional[Sequence[float]] = None) -> pd.Series:
+    """
+    Categorical low/medium/high bucket of each amount: below thresholds[0] is
+    "low", below thresholds[1] "medium", the rest "high". Missing amounts stay
+    missing. Thresholds default to ETL_REVENUE_BUCKETS.
+    """
+    thresholds = list(config.ETL_REVENUE_BUCKETS if thresholds is None else thresholds)
+    if len(thresholds) != len(REVENUE_BUCKETS) - 1 or thresholds != sorted(thresholds):
+        raise ValueError(f"Expected {len(REVENUE_BUCKETS) - 1} ascending revenue bucket thresholds, got {thresholds}")
+    return pd.cut(amount, bins=[-np.inf, *thresholds, np.inf], labels=list(REVENUE_BUCKETS), right=False)
 
-    df["date_order"] = pd.to_datetime(df["date_order"])
-    df["order_month"] = df["date_order"].dt.to_period("M").astype(str)
+def month_starts(dates: pd.Series) -> pd.Series:
+    """
+    First day of each timestamp's month (NaT stays NaT), for a DATE column.
+    Truncated in numpy, without building a Period or a string per row.
+    """
+    months = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[M]")
+    return pd.Series(months.astype("datetime64[s]"), index=dates.index, name=dates.name)
+
+def _own(df: pd.DataFrame) -> pd.DataFrame:
+    # Transforms only add, replace or drop whole columns, so a shallow copy is
+    # enough to leave the caller's frame untouched.
+    return df.copy(deep=False)
 
-    def bucket(amount: float) -> str:
-        if amount < 500:
-            return "low"
-        elif amount < 1500:
-            return "medium"
-        else:
-            return "high"
+def _downcast_id(df: pd.DataFrame) -> None:
+    if "id" in df.columns:
+        df["id"] = df["id"].astype(ID_DTYPE)
+
+def transform_sales_orders(df: pd.DataFrame) -> pd.DataFrame:
+    df = _own(df)
+    _downcast_id(df)
+    df["customer_id"], df["customer_name"] = many2one_columns(df, "partner_id", ID_DTYPE)
+    df = _drop_many2one(df, "partner_id")
 
-    df["revenue_bucket"] = df["amount_total"].apply(bucket)
+    df["date_order"] = pd.to_datetime(df["date_order"])
+    df["order_month"] = month_starts(df["date_order"])
+    df["revenue_bucket"] = revenue_bucket(df["amount_total"])
+    df["state"] = df["state"].astype("category")
     return df
 
 def transform_products(df: pd.DataFrame) -> pd.DataFrame:
-    return df.copy()
+    df = _own(df)
+    _downcast_id(df)
+    return df
 
 def transform_customers(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["country_name"] = df["country_id"].apply(extract_name)
-    df = df.drop(columns=["country_id"])
-    return df
+    df = _own(df)
+    _downcast_id(df)
+    _, country_names = many2one_columns(df, "country_id", ID_DTYPE)
+    df["country_name"] = country_names.astype("category")
+    return _drop_many2one(df, "country_id")
 
 def transform_order_lines(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["order_id"] = df["order_id"].apply(extract_id)
-    df["product_id"] = df["product_id"].apply(extract_id)
+    df = _own(df)
+    _downcast_id(df)
+    df["order_id"], _ = split_many2one(df["order_id"], ID_DTYPE)
+    df["product_id"], _ = split_many2one(df["product_id"], ID_DTYPE)
+    return df
+
+def transform_stock_moves(df: pd.DataFrame) -> pd.DataFrame:
+    df = _own(df)
+    _downcast_id(df)
+    for col in ("product_id", "location_id", "location_dest_id"):
+        df[col], _ = split_many2one(df[col], ID_DTYPE)
+    df["state"] = df["state"].astype("category")
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+def transform_account_move_lines(df: pd.DataFrame) -> pd.DataFrame:
+    df = _own(df)
+    _downcast_id(df)
+    for col in ("move_id", "account_id", "partner_id", "product_id"):
+        df[col], _ = split_many2one(df[col], ID_DTYPE)
+    df["parent_state"] = df["parent_state"].astype("category")
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+def transform_stock_quants(df: pd.DataFrame) -> pd.DataFrame:
+    df = _own(df)
+    _downcast_id(df)
+    df["product_id"], _ = split_many2one(df["product_id"], ID_DTYPE)
+    df["location_id"], _ = split_many2one(df["location_id"], ID_DTYPE)
     return df
@@ -0,0 +1,286 @@
+import errno
+import gzip
+import http.client
+import itertools
+import json
+import logging
+import threading
+import xmlrpc.client
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of idle keep-alive HTTP(S) connections, keyed by host.
+
+    Params:
+    - use_https: open HTTPSConnection instead of HTTPConnection
+    - pool_size: max idle connections kept per host
+    - timeout: socket timeout in seconds for connect and reads
+    - context: ssl.SSLContext for HTTPS
+    """
+
+    def __init__(
+        self,
+        use_https: bool = False,
+        pool_size: int = 8,
+        timeout: Optional[float] = 60.0,
+        context=None
+    ) -> None:
+        self.use_https = use_https
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.context = context
+        self._idle: Dict[str, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def open(self, host: str, x509: Optional[Dict[str, Any]] = None) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections_opened += 1
+        if self.use_https:
+            return http.client.HTTPSConnection(host, timeout=self.timeout, context=self.context, **(x509 or {}))
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def checkout(self, host: str) -> Optional[http.client.HTTPConnection]:
+        """Return an idle connection to host, or None if the caller must open one."""
+        with self._lock:
+            idle = self._idle.get(host)
+            return idle.pop() if idle else None
+
+    def checkin(self, host: str, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(host, [])
+            if len(idle) < self.pool_size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+class _WireBytes:
+    """
+    Counts request and response body bytes as sent over the wire (after gzip),
+    per thread, so a caller can attribute them to the call it just made.
+    """
+
+    def _count_wire(self, sent: int = 0, received: int = 0) -> None:
+        local = self._wire_local
+        local.sent = getattr(local, "sent", 0) + sent
+        local.received = getattr(local, "received", 0) + received
+
+    def take_wire_bytes(self) -> Tuple[int, int]:
+        """(sent, received) bytes of the calling thread since its previous take_wire_bytes()."""
+        local = self._wire_local
+        taken = getattr(local, "sent", 0), getattr(local, "received", 0)
+        local.sent = local.received = 0
+        return taken
+
+
+class PooledTransport(_WireBytes, xmlrpc.client.Transport):
+    """
+    Thread-safe keep-alive transport for xmlrpc.client.ServerProxy.
+
+    The stock Transport caches a single connection and must not be shared
+    between threads. This one checks a connection out of a ConnectionPool
+    per call and returns it once the response has been read, so later calls
+    (from any thread) skip the TCP and TLS handshakes. Connections that fail
+    mid-call are discarded, and the inherited request() retries once when a
+    pooled connection has gone cold.
+
+    Params are those of ConnectionPool, plus:
+    - gzip: gzip request bodies above gzip_threshold bytes and accept gzip responses
+    """
+
+    def __init__(
+        self,
+        use_https: bool = False,
+        pool_size: int = 8,
+        timeout: Optional[float] = 60.0,
+        gzip: bool = False,
+        gzip_threshold: int = 1024,
+        context=None
+    ) -> None:
+        super().__init__()
+        self.pool = ConnectionPool(use_https, pool_size, timeout, context)
+        self.accept_gzip_encoding = gzip
+        self.encode_threshold = gzip_threshold if gzip else None
+        self._local = threading.local()
+        self._wire_local = threading.local()
+
+    @property
+    def connections_opened(self) -> int:
+        return self.pool.connections_opened
+
+    def make_connection(self, host: str) -> http.client.HTTPConnection:
+        conn = self.pool.checkout(host)
+        if conn is None:
+            chost, self._extra_headers, x509 = self.get_host_info(host)
+            conn = self.pool.open(chost, x509)
+        self._local.checked_out = (host, conn)
+        return conn
+
+    def send_content(self, connection, request_body):
+        if self.encode_threshold is not None and self.encode_threshold < len(request_body):
+            connection.putheader("Content-Encoding", "gzip")
+            request_body = xmlrpc.client.gzip_encode(request_body)
+        self._count_wire(sent=len(request_body))
+        connection.putheader("Content-Length", str(len(request_body)))
+        connection.endheaders(request_body)
+
+    def parse_response(self, response):
+        self._count_wire(received=int(response.getheader("Content-Length") or 0))
+        return super().parse_response(response)
+
+    def single_request(self, host, handler, request_body, verbose=False):
+        # xmlrpc.client.Transport.single_request, except that the connection only goes
+        # back to the pool once its response has been read to the end: the unread body
+        # of an error response without a Content-Length would precede the next response.
+        response = None
+        try:
+            conn = self.send_request(host, handler, request_body, verbose)
+            response = conn.getresponse()
+            if response.status == 200:
+                self.verbose = verbose
+                return self.parse_response(response)
+            if response.getheader("content-length", ""):
+                response.read()
+            raise xmlrpc.client.ProtocolError(host + handler, response.status, response.reason,
+                                              dict(response.getheaders()))
+        except (xmlrpc.client.Fault, xmlrpc.client.ProtocolError):
+            raise
+        except Exception:
+            # A transport error: close() discards the connection
+            self.close()
+            raise
+        finally:
+            checked_out: Optional[Tuple[str, http.client.HTTPConnection]] = getattr(self._local, "checked_out", None)
+            if checked_out is not None:
+                self._local.checked_out = None
+                if response is not None and response.isclosed():
+                    self.pool.checkin(*checked_out)
+                else:
+                    checked_out[1].close()
+
+    def close(self) -> None:
+        """Discard the calling thread's checked-out connection, if any."""
+        checked_out = getattr(self._local, "checked_out", None)
+        if checked_out is not None:
+            self._local.checked_out = None
+            checked_out[1].close()
+
+    def close_all(self) -> None:
+        self.pool.close_all()
+
+
+class JsonRpcTransport(_WireBytes):
+    """
+    Posts Odoo JSON-RPC calls ("/jsonrpc") over a keep-alive ConnectionPool.
+
+    JSON is much cheaper than XML-RPC to encode and decode for wide
+    search_read payloads. Server errors are raised as xmlrpc.client.Fault,
+    so callers handle both protocols the same way.
+    """
+
+    def __init__(
+        self,
+        use_https: bool = False,
+        pool_size: int = 8,
+        timeout: Optional[float] = 60.0,
+        gzip: bool = False,
+        gzip_threshold: int = 1024,
+        context=None
+    ) -> None:
+        self.pool = ConnectionPool(use_https, pool_size, timeout, context)
+        self.gzip = gzip
+        self.gzip_threshold = gzip_threshold
+        self._ids = itertools.count(1)
+        self._wire_local = threading.local()
+
+    @property
+    def connections_opened(self) -> int:
+        return self.pool.connections_opened
+
+    def _post(self, host: str, path: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, str, bytes, str]:
+        conn = self.pool.checkout(host) or self.pool.open(host)
+        try:
+            conn.request("POST", path, body, headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        self.pool.checkin(host, conn)
+        self._count_wire(sent=len(body), received=len(data))
+        return resp.status, resp.reason, data, resp.getheader("Content-Encoding", "")
+
+    def call(self, host: str, service: str, method: str, args: List[Any]) -> Any:
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"service": service, "method": method, "args": args},
+            "id": next(self._ids),
+        }
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.gzip:
+            headers["Accept-Encoding"] = "gzip"
+            if len(body) > self.gzip_threshold:
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+
+        # retry once if a pooled connection has gone cold
+        for attempt in (0, 1):
+            try:
+                status, reason, data, encoding = self._post(host, "/jsonrpc", body, headers)
+                break
+            except http.client.RemoteDisconnected:
+                if attempt:
+                    raise
+            except OSError as e:
+                if attempt or e.errno not in (errno.ECONNRESET, errno.ECONNABORTED, errno.EPIPE):
+                    raise
+
+        if status != 200:
+            raise xmlrpc.client.ProtocolError(host + "/jsonrpc", status, reason, {})
+        if encoding == "gzip":
+            data = gzip.decompress(data)
+        response = json.loads(data)
+        error = response.get("error")
+        if error:
+            detail = error.get("data") or {}
+            raise xmlrpc.client.Fault(error.get("code", 0), detail.get("message") or error.get("message", ""))
+        return response.get("result")
+
+    def close_all(self) -> None:
+        self.pool.close_all()
+
+
+class JsonRpcProxy:
+    """
+    ServerProxy-like handle on one Odoo JSON-RPC service ("common" or "object"),
+    so proxy.authenticate(...) and proxy.execute_kw(...) work for both protocols.
+    """
+
+    def __init__(self, url: str, service: str, transport: JsonRpcTransport) -> None:
+        self._host = urlsplit(url).netloc
+        self._service = service
+        self._transport = transport
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def call(*args: Any) -> Any:
+            return self._transport.call(self._host, self._service, method, list(args))
+        return call
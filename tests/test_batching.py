@@ -0,0 +1,64 @@
+import xmlrpc.client
+
+import pytest
+from benchmarks.fake_odoo import FakeOdoo, serve_odoo
+from etl.batching import AdaptiveBatchSize, RetryPolicy
+from etl.connector import OdooConnector
+
+
+def test_adaptive_batch_size_steers_toward_target_latency():
+    sizer = AdaptiveBatchSize(initial=1000, target_latency=1.0, min_size=100, max_size=4000)
+    sizer.observe(1000, 0.25)   # 4x too fast: capped at doubling
+    assert sizer.size == 2000
+    sizer.observe(2000, 1.6)
+    assert sizer.size == 1250
+    sizer.observe(10, 0.01)     # short last page: ignored
+    assert sizer.size == 1250
+    for _ in range(5):
+        sizer.shrink()
+    assert sizer.size == 100
+
+
+def test_retry_policy_classifies_errors():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    assert policy.is_retriable(TimeoutError())
+    assert policy.is_retriable(ConnectionResetError())
+    assert policy.is_retriable(xmlrpc.client.ProtocolError("h", 503, "Unavailable", {}))
+    assert not policy.is_retriable(xmlrpc.client.ProtocolError("h", 404, "Not Found", {}))
+    assert not policy.is_retriable(xmlrpc.client.Fault(1, "AccessError"))
+    assert all(0 <= policy.delay(attempt) <= 4.0 for attempt in range(1, 10))
+
+
+@pytest.mark.parametrize("protocol", ["xmlrpc", "jsonrpc"])
+def test_fetch_all_records_retries_injected_faults(protocol):
+    odoo = FakeOdoo({"sale.order": 1000}, fault_rate=0.3, seed=7)
+    with serve_odoo(odoo) as url:
+        connector = OdooConnector(url, "db", "user", "pw", protocol=protocol,
+                                  retry_policy=RetryPolicy(max_retries=10, base_delay=0.001))
+        records = connector.fetch_all_records("sale.order", fields=["name"], batch_size=50, target_latency=5.0)
+
+    assert [r["id"] for r in records] == list(range(1, 1001))
+    stats = connector.fetch_stats["sale.order"]
+    assert stats.retries == odoo.faults > 0
+    assert stats.rows == 1000
+    assert stats.bytes_received > stats.bytes_sent > 0
+
+
+def test_fetch_all_records_gives_up_after_max_retries():
+    odoo = FakeOdoo({"sale.order": 10}, fault_rate=1.0)
+    with serve_odoo(odoo) as url:
+        connector = OdooConnector(url, "db", "user", "pw", retry_policy=RetryPolicy(max_retries=2, base_delay=0.001))
+        with pytest.raises(xmlrpc.client.ProtocolError):
+            connector.fetch_all_records("sale.order", fields=["name"])
+    assert odoo.faults == 3
+
+
+def test_adaptive_batches_shrink_when_pages_are_slow():
+    # 1ms per row: a 1000-row page takes ~1s against a 0.1s target
+    odoo = FakeOdoo({"sale.order": 2000}, latency_per_row=0.001)
+    with serve_odoo(odoo) as url:
+        connector = OdooConnector(url, "db", "user", "pw")
+        sizes = [len(b) for b in connector.iter_batches("sale.order", ["name"], batch_size=1000, target_latency=0.1)]
+
+    assert sum(sizes) == 2000
+    assert sizes[0] == 1000 and sizes[1] == 500 and sizes[2] == 250
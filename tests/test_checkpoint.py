@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+from etl.checkpoint import CheckpointStore, Watermark, incremental_since
+from etl.run_extracts import write_checkpointed
+from etl.storage import CsvStorage, merge_parts
+from etl.transform import transform_products
+
+
+def test_incremental_since_reads_overlap_behind_watermark():
+    assert incremental_since(None, "1970-01-01 00:00:00", 300) == "1970-01-01 00:00:00"
+    watermark = Watermark("2024-06-01 12:00:00", 42)
+    assert incremental_since(watermark, "1970-01-01 00:00:00", 300) == "2024-06-01 11:55:00"
+
+
+def test_checkpoint_store_persists_run_and_commits_watermark(tmp_path):
+    path = str(tmp_path / "state.json")
+    store = CheckpointStore(path)
+    store.start_run("order_lines", "1970-01-01 00:00:00", Watermark("2024-06-01 12:00:00", 9), [(1, 5), (5, 10)])
+    store.record_part("order_lines", 1, "lines.part1.0", 3, 7)
+
+    reopened = CheckpointStore(path)
+    run = reopened.pending_run("order_lines")
+    assert run["shards"] == [[1, 5], [5, 10]]
+    assert reopened.shard_progress("order_lines", 1) == {"last_id": 7, "parts": [["lines.part1.0", 3]], "done": False}
+    assert reopened.shard_progress("order_lines", 0)["last_id"] == 0
+    assert reopened.watermark("order_lines") is None
+
+    reopened.complete_run("order_lines")
+    assert CheckpointStore(path).watermark("order_lines") == Watermark("2024-06-01 12:00:00", 9)
+    assert CheckpointStore(path).pending_run("order_lines") is None
+
+
+def _pages(ids, size=2, fail_after=None):
+    for n, start in enumerate(range(0, len(ids), size)):
+        if n == fail_after:
+            raise ConnectionResetError("lost Odoo")
+        yield [{"id": i, "name": f"P{i}", "default_code": False, "list_price": 1.0} for i in ids[start:start + size]]
+
+
+def test_write_checkpointed_resumes_after_last_checkpoint(tmp_path):
+    storage = CsvStorage()
+    store = CheckpointStore(str(tmp_path / "state.json"))
+    store.start_run("products", "1970-01-01 00:00:00", None, [None])
+    prefix = str(tmp_path / "products.csv.part0")
+    ids = list(range(1, 12))
+
+    # Crash on the 4th page: the first part (pages 1-2) is checkpointed, page 3 is not.
+    with pytest.raises(ConnectionResetError):
+        write_checkpointed(_pages(ids, fail_after=3), transform_products, prefix, storage,
+                           store, "products", 0, checkpoint_pages=2)
+    progress = store.shard_progress("products", 0)
+    assert progress["last_id"] == 4 and not progress["done"]
+
+    # The scheduler resumes the shard with ('id', '>', last_id)
+    remaining = [i for i in ids if i > progress["last_id"]]
+    parts = write_checkpointed(_pages(remaining), transform_products, prefix, storage,
+                               store, "products", 0, checkpoint_pages=2)
+    assert store.shard_progress("products", 0)["done"]
+    assert write_checkpointed(iter([]), transform_products, prefix, storage, store, "products", 0) == parts
+
+    path = str(tmp_path / "products.csv")
+    assert merge_parts(parts, path, storage) == 11
+    assert pd.read_csv(path)["id"].tolist() == ids
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from etl import cli
+
+
+def test_stages_default_to_extract_and_load():
+    assert cli.parse_args([]).stages == ["extract", "load"]
+    with patch.object(cli.config, "ETL_RECONCILE", "soft"):
+        assert cli.parse_args([]).stages == ["extract", "load", "reconcile"]
+    with pytest.raises(SystemExit):
+        cli.parse_args(["transform"])
+
+
+def test_daemon_reuses_one_pipeline_and_survives_failed_runs():
+    calls = []
+
+    def extract(self):
+        calls.append(("extract", id(self)))
+        runs = sum(stage == "extract" for stage, _ in calls)
+        if runs == 1:
+            raise RuntimeError("Odoo is down")
+        if runs == 3:
+            raise KeyboardInterrupt
+
+    def load(self):
+        calls.append(("load", id(self)))
+
+    with patch.object(cli.Pipeline, "extract", extract), patch.object(cli.Pipeline, "load", load), \
+            patch.object(cli.Pipeline, "close") as close, patch("etl.cli.signal.signal"):
+        with pytest.raises(KeyboardInterrupt):
+            cli.main(["extract", "load", "--every", "0.01"])
+
+    # the failed extract skips that run's load; the next run starts over
+    assert [stage for stage, _ in calls] == ["extract", "extract", "load", "extract"]
+    assert len({pipeline for _, pipeline in calls}) == 1
+    close.assert_called_once()
+
+
+def test_a_single_run_raises_its_failure():
+    with patch.object(cli.Pipeline, "extract", side_effect=RuntimeError("boom")), \
+            patch.object(cli.Pipeline, "close") as close:
+        with pytest.raises(RuntimeError):
+            cli.main(["extract"])
+    close.assert_called_once()
+
+
+def test_entry_points_import_without_pandas_numpy_or_psycopg2():
+    modules = ["etl.cli", "etl.tasks", "etl.run_extracts", "etl.load_to_postgres", "etl.reconcile"]
+    code = (f"import sys\nfor m in {modules}: __import__(m)\n"
+            "print(sorted({'pandas', 'numpy', 'psycopg2', 'pyarrow'} & set(sys.modules)))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=root, check=True)
+    assert result.stdout.strip() == "[]"
@@ -10,3 +10,54 @@ def test_authenticate_success(mock_server_proxy):
 
     conn = OdooConnector("http://localhost:8069", "test_db", "user", "pass")
     assert conn.uid == 123
+
+
+def _fake_search_read(rows):
+    """Mimic Odoo's search_read over ``rows`` for id bounds, limit, offset and id ordering."""
+    def execute_kw(db, uid, password, model, method, args, kwargs):
+        matching = sorted(rows, key=lambda r: r["id"])
+        for field, op, value in args[0]:
+            assert field == "id" and op == ">"
+            matching = [r for r in matching if r["id"] > value]
+        offset = kwargs.get("offset", 0)
+        return matching[offset:offset + kwargs["limit"]]
+    return execute_kw
+
+
+@patch("etl.connector.xmlrpc.client.ServerProxy")
+def test_fetch_all_records_keyset_matches_offset(mock_server_proxy):
+    rows = [{"id": i, "name": f"SO{i}"} for i in (3, 1, 7, 4, 9, 12, 15)]
+    proxy = MagicMock()
+    proxy.authenticate.return_value = 1
+    proxy.execute_kw.side_effect = _fake_search_read(rows)
+    mock_server_proxy.return_value = proxy
+
+    conn = OdooConnector("http://localhost:8069", "test_db", "user", "pass")
+    keyset = conn.fetch_all_records("sale.order", batch_size=3, pagination="keyset")
+    offset = conn.fetch_all_records("sale.order", batch_size=3, pagination="offset")
+
+    assert keyset == offset
+    assert [r["id"] for r in keyset] == [1, 3, 4, 7, 9, 12, 15]
+
+
+@patch("etl.connector.xmlrpc.client.ServerProxy")
+def test_fetch_all_records_keyset_domain(mock_server_proxy):
+    proxy = MagicMock()
+    proxy.authenticate.return_value = 1
+    proxy.execute_kw.return_value = [{"id": 5}]
+    mock_server_proxy.return_value = proxy
+
+    conn = OdooConnector("http://localhost:8069", "test_db", "user", "pass")
+    conn.fetch_all_records("sale.order", fields=["name"], batch_size=10)
+
+    args, kwargs = proxy.execute_kw.call_args
+    assert args[5] == [[("id", ">", 0)]]
+    assert args[6] == {"fields": ["name"], "limit": 10, "order": "id asc"}
+
+
+@patch("etl.connector.xmlrpc.client.ServerProxy")
+def test_fetch_all_records_rejects_unknown_pagination(mock_server_proxy):
+    mock_server_proxy.return_value.authenticate.return_value = 1
+    conn = OdooConnector("http://localhost:8069", "test_db", "user", "pass")
+    with pytest.raises(ValueError):
+        conn.fetch_all_records("sale.order", pagination="cursor")
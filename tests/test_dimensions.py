@@ -0,0 +1,97 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_odoo import FakeOdoo, serve_odoo
+from etl.connector import OdooConnector
+from etl.dimensions import DimensionCache
+from etl.registry import get_spec
+from etl.schema import to_frame
+
+
+class _NamesStub:
+    def __init__(self):
+        self.requested = []
+
+    def clone(self):
+        return self
+
+    def fetch_names(self, model, ids, batch_size):
+        self.requested.append(list(ids))
+        return [{"id": i, "display_name": f"{model} {i}"} for i in ids if i != 404]
+
+
+def test_names_are_fetched_once_per_id_and_unknown_ids_cached_as_none():
+    stub = _NamesStub()
+    cache = DimensionCache(stub, max_entries=100)
+
+    assert cache.names("res.partner", np.array([3, 1, 3, 404])).tolist() == \
+        ["res.partner 3", "res.partner 1", "res.partner 3", None]
+    assert cache.names("res.partner", np.array([1, 2, 404])).tolist() == ["res.partner 1", "res.partner 2", None]
+    assert stub.requested == [[1, 3, 404], [2]]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_least_recently_used_ids_are_evicted():
+    stub = _NamesStub()
+    cache = DimensionCache(stub, max_entries=4)
+    cache.names("res.partner", np.array([1, 2]))
+    cache.names("res.country", np.array([7, 8]))
+    cache.names("res.partner", np.array([1]))
+    cache.names("res.partner", np.array([3]))    # 5 entries: res.partner 2 was used longest ago
+
+    assert len(cache) == 4 and cache.evictions == 1
+    cache.names("res.partner", np.array([1, 2, 3]))
+    assert stub.requested[-1] == [2]
+
+
+def test_lookups_go_on_while_another_thread_fetches():
+    stub = _NamesStub()
+    cache = DimensionCache(stub, max_entries=100)
+    cache.names("res.partner", np.array([1, 5]))
+    fetching, release = threading.Event(), threading.Event()
+    fetch_names = stub.fetch_names
+
+    def slow_fetch_names(model, ids, batch_size):
+        fetching.set()
+        release.wait(5)
+        return fetch_names(model, ids, batch_size)
+    stub.fetch_names = slow_fetch_names
+
+    slow = threading.Thread(target=cache.names, args=("res.partner", np.array([3, 1])))
+    slow.start()
+    fetching.wait(5)
+    hits = []
+    lookup = threading.Thread(target=lambda: hits.append(cache.names("res.partner", np.array([5, 1]))))
+    lookup.start()
+    lookup.join(1)
+    assert not lookup.is_alive() and hits[0].tolist() == ["res.partner 5", "res.partner 1"]
+    release.set()
+    slow.join(5)
+    assert cache.names("res.partner", np.array([1, 3, 5])).tolist() == \
+        ["res.partner 1", "res.partner 3", "res.partner 5"]
+    assert stub.requested == [[1, 5], [3]]
+
+
+def test_bare_ids_resolve_to_the_names_odoo_would_send():
+    odoo = FakeOdoo({"sale.order": 300, "res.partner": 5000})
+    with serve_odoo(odoo) as url:
+        connector = OdooConnector(url, "db", "user", "pw")
+        fields = get_spec("sales_orders").fields
+        classic = [r for b in connector.iter_batches("sale.order", fields, batch_size=100) for r in b]
+        classic_bytes = connector.fetch_stats["sale.order"].bytes_received
+        bare = [r for b in connector.iter_batches("sale.order", fields, batch_size=100, many2one_ids=True)
+                for r in b]
+        bare_bytes = connector.fetch_stats["sale.order"].bytes_received - classic_bytes
+        cache = DimensionCache(connector, batch_size=50)
+        resolved = cache.resolve(to_frame(bare), {"partner_id": "res.partner"})
+
+    assert isinstance(bare[0]["partner_id"], int)
+    assert str(resolved["partner_id"].dtype) == "Int64"
+    assert resolved["partner_id__name"].iloc[0] == classic[0]["partner_id"][1]
+    assert bare_bytes < classic_bytes
+    expected = get_spec("sales_orders").transform(to_frame(classic))
+    pd.testing.assert_frame_equal(get_spec("sales_orders").transform(resolved), expected)
+    # 300 orders reference 300 distinct partners, looked up in pages of 50
+    assert connector.fetch_stats["res.partner:names"].calls == 6
@@ -0,0 +1,62 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_odoo import FakeOdoo, serve_odoo
+from config import config
+from etl.extractor import OdooDataExtractor
+
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ODOO_SCHEMA_CACHE", str(tmp_path / "schema_cache.json"))
+    monkeypatch.setattr(config, "ETL_SPILL_DIR", str(tmp_path / "spill"))
+    monkeypatch.setattr(config, "ODOO_TARGET_LATENCY", 0.0)    # fixed page sizes
+    with serve_odoo(FakeOdoo({"res.partner": 120})) as url:
+        monkeypatch.setattr(config, "ODOO_URL", url)
+        yield OdooDataExtractor()
+
+
+def test_extract_returns_typed_frames_chunks_and_arrow_batches(extractor):
+    df = extractor.extract("res.partner", ["name", "country_id", "active"], [("customer_rank", ">", 0)])
+    assert list(df.columns) == ["id", "name", "country_id", "active"]
+    assert len(df) == 120 - 120 // 97    # archived partners are left out
+    assert str(df["id"].dtype) == "Int64" and str(df["active"].dtype) == "boolean"
+    assert df["country_id"].iloc[0] == [2, "Country 2"]
+
+    chunks = list(extractor.extract("res.partner", ["name"], output="chunks", batch_size=50))
+    assert [len(chunk) for chunk in chunks] == [50, 50, 19]
+
+    batches = list(extractor.extract("res.partner", ["country_id", "write_date"], output="arrow", batch_size=50))
+    assert len({batch.schema for batch in batches}) == 1
+    countries = batches[0].column("country_id").to_pylist()
+    assert countries[0] == {"id": 2, "name": "Country 2"}
+    assert countries[9] is None    # Odoo's False
+
+
+def test_extract_spills_frames_past_the_memory_budget(extractor):
+    in_memory = extractor.extract("res.partner", ["name", "country_id"], batch_size=20)
+    spilled = extractor.extract("res.partner", ["name", "country_id"], batch_size=20, memory_budget_mb=0.001)
+
+    assert isinstance(spilled["id"].dtype, pd.ArrowDtype)
+    assert spilled["id"].tolist() == in_memory["id"].tolist()
+    assert spilled["name"].tolist() == in_memory["name"].tolist()
+    assert spilled["country_id"].iloc[0] == {"id": 2, "name": "Country 2"}
+    # the file is unlinked once mapped
+    assert os.listdir(config.ETL_SPILL_DIR) == []
+
+    with pytest.raises(ValueError, match="no field"):
+        extractor.extract("res.partner", ["colour"])
+    with pytest.raises(ValueError, match="Unknown extract output"):
+        extractor.extract("res.partner", output="json")
+
+
+def test_extract_and_save_streams_to_the_storage_format(extractor, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert extractor.extract_and_save("res.partner", ["name", "country_id"], "partners.parquet") == 119
+    assert extractor.extract_and_save("res.partner", ["name"], "partners.csv") == 119
+
+    parquet = pd.read_parquet(tmp_path / "outputs" / "partners.parquet")
+    assert parquet["country_id"].iloc[0] == {"id": 2, "name": "Country 2"}
+    assert pd.read_csv(tmp_path / "outputs" / "partners.csv")["name"].iloc[-1] == "Customer 120"
@@ -1,11 +1,12 @@
+import pytest
 import pandas as pd
 from unittest.mock import patch, MagicMock
 from etl.load_to_postgres import PostgresLoader
 
 
-@patch("etl.load_to_postgres.psycopg2.connect")
-@patch("etl.load_to_postgres.pd.read_csv")
-@patch("etl.load_to_postgres.execute_batch")
+@patch("psycopg2.connect")
+@patch("pandas.read_csv")
+@patch("psycopg2.extras.execute_batch")
 def test_insert_customers_success(mock_execute_batch, mock_read_csv, mock_connect):
     sample_data = pd.DataFrame([{
         "id": 1,
@@ -23,21 +24,24 @@ def test_insert_customers_success(mock_execute_batch, mock_read_csv, mock_connec
     mock_connect.return_value = mock_conn
 
     loader = PostgresLoader()
-    loader.insert_customers("fake_path.csv")
-
-    expected_sql = """
-        INSERT INTO customers (id, name, email, phone, city, country_name)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        ON CONFLICT (id) DO NOTHING;
-        """
+    loader.load_file("customers", "fake_path.csv")
+
+    expected_sql = (
+        "INSERT INTO customers (id, name, email, phone, city, country_name) "
+        "VALUES (%s, %s, %s, %s, %s, %s) "
+        "ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name, email = EXCLUDED.email, "
+        "phone = EXCLUDED.phone, city = EXCLUDED.city, country_name = EXCLUDED.country_name "
+        "WHERE (customers.name, customers.email, customers.phone, customers.city, customers.country_name) "
+        "IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.email, EXCLUDED.phone, EXCLUDED.city, EXCLUDED.country_name);"
+    )
     expected_records = [(1, "Alice", "alice@example.com", "123456", "New York", "USA")]
 
     mock_execute_batch.assert_called_once_with(mock_cursor, expected_sql, expected_records)
     assert mock_conn.commit.call_count >= 1
 
-@patch("etl.load_to_postgres.psycopg2.connect")
-@patch("etl.load_to_postgres.pd.read_csv")
-@patch("etl.load_to_postgres.execute_batch")
+@patch("psycopg2.connect")
+@patch("pandas.read_csv")
+@patch("psycopg2.extras.execute_batch")
 def test_insert_products_success(mock_execute_batch, mock_read_csv, mock_connect):
     sample_data = pd.DataFrame([{
         "id": 201,
@@ -53,22 +57,25 @@ def test_insert_products_success(mock_execute_batch, mock_read_csv, mock_connect
     mock_connect.return_value = mock_conn
 
     loader = PostgresLoader()
-    loader.insert_products("fake_path.csv")
-
-    expected_sql = """
-        INSERT INTO products (id, name, default_code, list_price)
-        VALUES (%s, %s, %s, %s)
-        ON CONFLICT (id) DO NOTHING;
-        """
+    loader.load_file("products", "fake_path.csv")
+
+    expected_sql = (
+        "INSERT INTO products (id, name, default_code, list_price) "
+        "VALUES (%s, %s, %s, %s) "
+        "ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name, default_code = EXCLUDED.default_code, "
+        "list_price = EXCLUDED.list_price "
+        "WHERE (products.name, products.default_code, products.list_price) "
+        "IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.default_code, EXCLUDED.list_price);"
+    )
     expected_records = [(201, "Notebook", "NB123", 9.99)]
 
     mock_execute_batch.assert_called_once_with(mock_cursor, expected_sql, expected_records)
     assert mock_conn.commit.call_count >= 1
 
 
-@patch("etl.load_to_postgres.psycopg2.connect")
-@patch("etl.load_to_postgres.pd.read_csv")
-@patch("etl.load_to_postgres.execute_batch")
+@patch("psycopg2.connect")
+@patch("pandas.read_csv")
+@patch("psycopg2.extras.execute_batch")
 def test_insert_sales_orders_success(mock_execute_batch, mock_read_csv, mock_connect):
     sample_data = pd.DataFrame([{
         "id": 301,
@@ -78,7 +85,7 @@ def test_insert_sales_orders_success(mock_execute_batch, mock_read_csv, mock_con
         "amount_total": 1234.56,
         "state": "sale",
         "date_order": "2024-06-01 12:00:00",
-        "order_month": "2024-06",
+        "order_month": "2024-06-01",
         "revenue_bucket": "medium"
     }])
     mock_read_csv.return_value = sample_data
@@ -89,26 +96,40 @@ def test_insert_sales_orders_success(mock_execute_batch, mock_read_csv, mock_con
     mock_connect.return_value = mock_conn
 
     loader = PostgresLoader()
-    loader.insert_sales_orders("fake_path.csv")
-
-    expected_sql = """
-        INSERT INTO sales_orders (
-            id, name, customer_id, customer_name, amount_total,
-            state, date_order, order_month, revenue_bucket
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (id) DO NOTHING;
-        """
-    expected_records = [(301, "SO123", 10, "Alice", 1234.56, "sale", "2024-06-01 12:00:00", "2024-06", "medium")]
+    loader.load_file("sales_orders", "fake_path.csv")
+
+    expected_sql = (
+        "INSERT INTO sales_orders (id, name, customer_id, customer_name, amount_total, "
+        "state, date_order, order_month, revenue_bucket) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) "
+        "ON CONFLICT (id, date_order) DO UPDATE SET name = EXCLUDED.name, customer_id = EXCLUDED.customer_id, "
+        "customer_name = EXCLUDED.customer_name, amount_total = EXCLUDED.amount_total, "
+        "state = EXCLUDED.state, "
+        "order_month = EXCLUDED.order_month, revenue_bucket = EXCLUDED.revenue_bucket "
+        "WHERE (sales_orders.name, sales_orders.customer_id, sales_orders.customer_name, "
+        "sales_orders.amount_total, sales_orders.state, "
+        "sales_orders.order_month, sales_orders.revenue_bucket) "
+        "IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.customer_id, EXCLUDED.customer_name, "
+        "EXCLUDED.amount_total, EXCLUDED.state, "
+        "EXCLUDED.order_month, EXCLUDED.revenue_bucket);"
+    )
+    expected_records = [(301, "SO123", 10, "Alice", 1234.56, "sale", "2024-06-01 12:00:00", "2024-06-01", "medium")]
 
     mock_execute_batch.assert_called_once_with(mock_cursor, expected_sql, expected_records)
     assert mock_conn.commit.call_count >= 1
-
-@patch("etl.load_to_postgres.psycopg2.connect")
-@patch("etl.load_to_postgres.pd.read_csv")
-@patch("etl.load_to_postgres.execute_batch")
+    statements = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert ("CREATE TABLE IF NOT EXISTS sales_orders_2024_06 PARTITION OF sales_orders "
+            "FOR VALUES FROM ('2024-06-01') TO ('2024-07-01');") in statements
+    # an order whose date moved to another month leaves its old partition first
+    assert statements[-1].startswith("DELETE FROM sales_orders t USING unnest(")
+    assert mock_cursor.execute.call_args.args[1] == ([301], ["2024-06-01 12:00:00"])
+
+@patch("psycopg2.connect")
+@patch("pandas.read_csv")
+@patch("psycopg2.extras.execute_batch")
 def test_insert_order_lines_success(mock_execute_batch, mock_read_csv, mock_connect):
     sample_data = pd.DataFrame([{
+        "id": 401,
         "order_id": 301,
         "product_id": 201,
         "product_uom_qty": 2,
@@ -123,16 +144,87 @@ def test_insert_order_lines_success(mock_execute_batch, mock_read_csv, mock_conn
     mock_connect.return_value = mock_conn
 
     loader = PostgresLoader()
-    loader.insert_order_lines("fake_path.csv")
-
-    expected_sql = """
-        INSERT INTO order_lines (
-            order_id, product_id, product_uom_qty, price_unit, price_subtotal
-        )
-        VALUES (%s, %s, %s, %s, %s);
-        """
-    expected_records = [(301, 201, 2, 5.00, 10.00)]
+    loader.load_file("order_lines", "fake_path.csv")
+
+    expected_sql = (
+        "INSERT INTO order_lines (id, order_id, product_id, product_uom_qty, price_unit, price_subtotal) "
+        "VALUES (%s, %s, %s, %s, %s, %s) "
+        "ON CONFLICT (id) DO UPDATE SET order_id = EXCLUDED.order_id, product_id = EXCLUDED.product_id, "
+        "product_uom_qty = EXCLUDED.product_uom_qty, price_unit = EXCLUDED.price_unit, "
+        "price_subtotal = EXCLUDED.price_subtotal "
+        "WHERE (order_lines.order_id, order_lines.product_id, order_lines.product_uom_qty, "
+        "order_lines.price_unit, order_lines.price_subtotal) "
+        "IS DISTINCT FROM (EXCLUDED.order_id, EXCLUDED.product_id, EXCLUDED.product_uom_qty, "
+        "EXCLUDED.price_unit, EXCLUDED.price_subtotal);"
+    )
+    expected_records = [(401, 301, 201, 2, 5.00, 10.00)]
 
     mock_execute_batch.assert_called_once_with(mock_cursor, expected_sql, expected_records)
     assert mock_conn.commit.call_count >= 1  
-       
\ No newline at end of file
+       
+
+@patch("psycopg2.connect")
+@patch("pandas.read_csv")
+@patch("psycopg2.extras.execute_batch")
+def test_insert_order_lines_copy(mock_execute_batch, mock_read_csv, mock_connect):
+    mock_read_csv.return_value = pd.DataFrame([
+        {"id": 401, "order_id": 301, "product_id": 201, "product_uom_qty": 2, "price_unit": 5.00, "price_subtotal": 10.00},
+        {"id": 402, "order_id": 302, "product_id": None, "product_uom_qty": 1, "price_unit": 3.50, "price_subtotal": 3.50},
+        {"id": 402, "order_id": 302, "product_id": None, "product_uom_qty": 2, "price_unit": 3.50, "price_subtotal": 7.00},
+    ])
+
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_connect.return_value = mock_conn
+    copied = []
+    mock_cursor.copy_expert.side_effect = lambda sql, buf: copied.append((sql, buf.read()))
+
+    loader = PostgresLoader(load_methods={"order_lines": "copy"}, copy_chunk_rows=1)
+    loader.load_file("order_lines", "fake_path.csv")
+
+    columns = "id, order_id, product_id, product_uom_qty, price_unit, price_subtotal"
+    assert [sql for sql, _ in copied] == [f"COPY _stage_order_lines ({columns}) FROM STDIN WITH (FORMAT csv)"] * 2
+    # the later duplicate of line 402 wins
+    assert copied[0][1] == "401,301,201,2,5.0,10\n"
+    assert copied[1][1] == "402,302,,2,3.5,7\n"
+    merge_sql = mock_cursor.execute.call_args[0][0]
+    assert merge_sql.startswith(
+        f"INSERT INTO order_lines ({columns}) SELECT {columns} FROM _stage_order_lines ON CONFLICT (id) DO UPDATE SET "
+    )
+    mock_execute_batch.assert_not_called()
+    # COPY chunks and the merge are one transaction
+    assert mock_conn.commit.call_count == 1
+
+
+@patch("psycopg2.connect")
+@patch("pandas.read_csv")
+@patch("psycopg2.extras.execute_values")
+def test_insert_products_execute_values(mock_execute_values, mock_read_csv, mock_connect):
+    mock_read_csv.return_value = pd.DataFrame([{
+        "id": 201, "name": "Notebook", "default_code": "NB123", "list_price": 9.99
+    }])
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_connect.return_value = mock_conn
+
+    loader = PostgresLoader(load_methods={"products": "execute_values"})
+    loader.load_file("products", "fake_path.csv")
+
+    mock_execute_values.assert_called_once_with(
+        mock_cursor,
+        "INSERT INTO products (id, name, default_code, list_price) VALUES %s "
+        "ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name, default_code = EXCLUDED.default_code, "
+        "list_price = EXCLUDED.list_price "
+        "WHERE (products.name, products.default_code, products.list_price) "
+        "IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.default_code, EXCLUDED.list_price);",
+        [(201, "Notebook", "NB123", 9.99)],
+        page_size=1000
+    )
+
+
+@patch("psycopg2.connect")
+def test_unknown_load_method_rejected(mock_connect):
+    with pytest.raises(ValueError):
+        PostgresLoader(load_methods={"products": "bulk"})
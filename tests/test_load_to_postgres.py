@@ -1,13 +1,280 @@
+import threading
+import time
+
 import pandas as pd
-from etl.load_to_postgres import PostgresLoader
+import numpy as np
+import psycopg2
+import pytest
+from config import config
+from etl.checkpoint import FULL_EXTRACT_SINCE, CheckpointStore, Watermark
+from etl.load_to_postgres import ParallelLoader, PostgresLoader
+from etl.registry import MATERIALIZED_VIEWS, get_spec
 from unittest.mock import MagicMock, patch
 
-@patch("etl.load_to_postgres.psycopg2.connect")
+@patch("psycopg2.connect")
 def test_create_tables_called(mock_connect):
     mock_conn = MagicMock()
     mock_cursor = MagicMock()
     mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.rowcount = 0
+    mock_connect.return_value = mock_conn
+
+    loader = PostgresLoader()
+    mock_cursor.execute.assert_not_called()  # no DDL on construction
+    loader.create_tables()
+    mock_cursor.execute.assert_called()
+
+@patch("psycopg2.connect")
+def test_prepare_records_native_types(mock_connect):
+    df = pd.DataFrame({
+        "id": [1, 2, 3],
+        "customer_id": pd.array([10, None, 12], dtype="Int64"),
+        "amount": [1.5, float("nan"), 3.0],
+        "name": ["a", None, "c"],
+        "mixed": [np.int64(7), None, "x"],
+        "date_order": pd.to_datetime(["2024-06-01", None, "2024-06-03"]),
+    })
+    records = PostgresLoader()._prepare_records(df)
+
+    assert records == [
+        (1, 10, 1.5, "a", 7, pd.Timestamp("2024-06-01")),
+        (2, None, None, None, None, None),
+        (3, 12, 3.0, "c", "x", pd.Timestamp("2024-06-03")),
+    ]
+    assert type(records[0][0]) is int and type(records[0][1]) is int
+    assert type(records[0][2]) is float and type(records[0][4]) is int
+
+@patch("psycopg2.connect")
+def test_load_summary_replaces_table_in_one_transaction(mock_connect, tmp_path):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.rowcount = 0
+    mock_connect.return_value = mock_conn
+    path = tmp_path / "product_sales.csv"
+    pd.DataFrame({"product_id": [1, 2], "line_count": [3, 4], "quantity": [1.0, 2.0],
+                  "revenue": [9.5, 7.25]}).to_csv(path, index=False)
+
+    loader = PostgresLoader()
+    mock_cursor.reset_mock()
+    mock_conn.reset_mock()
+    assert loader.load_summary("product_sales", str(path)) == 2
+
+    statements = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert statements[0] == "DELETE FROM product_sales;"
+    assert statements[-1].startswith("INSERT INTO product_sales (product_id, line_count, quantity, revenue) SELECT")
+    mock_cursor.copy_expert.assert_called_once()
+    mock_conn.commit.assert_called_once()
+
+@patch("psycopg2.extras.execute_batch")
+@patch("psycopg2.connect")
+def test_parallel_loader_commits_chunks_and_retries_only_the_failed_one(mock_connect, mock_execute_batch, tmp_path):
+    mock_connect.side_effect = lambda **params: MagicMock(**{"cursor.return_value.rowcount": 0})
+    path = tmp_path / "products.csv"
+    pd.DataFrame({"id": range(1, 26), "name": "p", "default_code": "c", "list_price": 1.5}).to_csv(path, index=False)
+    loaded, failures = [], []
+
+    def execute_batch(cur, sql, records):
+        if records[0][0] == 11 and not failures:
+            failures.append(records[0][0])
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        loaded.append([r[0] for r in records])
+    mock_execute_batch.side_effect = execute_batch
+
+    loader = ParallelLoader(max_workers=3, chunk_rows=10, retries=2)
+    loader.retry_policy.base_delay = 0
+    try:
+        assert loader.load({"products": str(path)}) == {"products": 25}
+    finally:
+        loader.close()
+
+    assert sorted(loaded) == [list(range(1, 11)), list(range(11, 21)), list(range(21, 26))]
+    assert failures == [11]
+    assert mock_connect.call_args.kwargs["options"] == "-c synchronous_commit=off"
+    assert loader.metrics.get("load", "products").rows == 25
+
+@patch("psycopg2.connect")
+def test_parallel_loader_partitions_while_workers_hold_every_connection(mock_connect, tmp_path):
+    mock_connect.side_effect = lambda **params: MagicMock()
+    path = tmp_path / "sales_orders.csv"
+    pd.DataFrame({"id": [1, 2], "name": "SO", "customer_id": 7, "customer_name": "c", "amount_total": 1.0,
+                  "state": "sale", "date_order": ["2024-05-01", "2024-06-01"], "order_month": "2024-05-01",
+                  "revenue_bucket": "low"}).to_csv(path, index=False)
+    summary_started = threading.Event()
+
+    def load_summary(name, filepath):
+        summary_started.set()
+        time.sleep(0.2)    # holds the only worker's connection while sales_orders is partitioned
+        return 3
+
+    loader = ParallelLoader(max_workers=1)
+    with patch.object(PostgresLoader, "create_tables"), patch.object(PostgresLoader, "refresh_views"), \
+            patch.object(PostgresLoader, "load_summary", side_effect=load_summary), \
+            patch.object(PostgresLoader, "ensure_partitions", side_effect=lambda *a: summary_started.wait()) as ensure, \
+            patch.object(PostgresLoader, "load_frame", side_effect=lambda name, df: len(df)):
+        try:
+            counts = loader.load({"sales_orders": str(path)}, {"revenue_by_month": "unused.csv"})
+        finally:
+            loader.close()
+
+    assert counts == {"sales_orders": 2, "revenue_by_month": 3}
+    ensure.assert_called_once()
+
+@patch("psycopg2.connect")
+def test_create_tables_manages_partitions_indexes_and_views(mock_connect):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.rowcount = 0
+    mock_connect.return_value = mock_conn
+    # sales_orders does not exist yet (relkind), the views' inputs do (bool_and), and the
+    # tables are created with NOT NULL keys and deleted_at (pg_attribute)
+    answers = {"relkind": None, "bool_and": (True,), "pg_attribute": (False,)}
+    mock_cursor.fetchone.side_effect = lambda: next(
+        answer for marker, answer in answers.items() if marker in mock_cursor.execute.call_args.args[0]
+    )
+
+    loader = PostgresLoader()
+    loader.create_tables([get_spec("sales_orders"), get_spec("order_lines")], [])
+
+    sql = "\n".join(c.args[0] for c in mock_cursor.execute.call_args_list)
+    assert "deleted_at TIMESTAMP,\n            PRIMARY KEY (id, date_order)\n        ) PARTITION BY RANGE (date_order);" in sql
+    assert "ADD COLUMN deleted_at" not in sql and "DELETE" not in sql
+    assert "CREATE TABLE IF NOT EXISTS sales_orders_default PARTITION OF sales_orders DEFAULT;" in sql
+    assert "RENAME" not in sql
+    for index in ("sales_orders_customer_id_idx ON sales_orders (customer_id)",
+                  "order_lines_order_id_idx ON order_lines (order_id)",
+                  "order_lines_product_id_idx ON order_lines (product_id)"):
+        assert f"CREATE INDEX IF NOT EXISTS {index};" in sql
+    for view in ("mv_revenue_by_month", "mv_revenue_by_customer", "mv_revenue_by_product_month"):
+        assert f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view} AS" in sql
+        assert f"CREATE UNIQUE INDEX IF NOT EXISTS {view}_key ON {view}" in sql
+    mock_conn.commit.assert_called_once()
+
+@patch("psycopg2.connect")
+def test_create_tables_skips_ddl_already_applied(mock_connect):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.rowcount = 0
     mock_connect.return_value = mock_conn
+    specs = [get_spec("sales_orders"), get_spec("order_lines")]
+    applied = [(spec.table, spec.schema_version()) for spec in specs]
+    applied += [(view.name, view.schema_version()) for view in MATERIALIZED_VIEWS]
+    mock_cursor.fetchall.return_value = applied
 
     loader = PostgresLoader()
-    mock_cursor.execute.assert_called()  # At least called once
+    loader.create_tables(specs, [])
+    sql = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert len(sql) == 4    # the version table, read before the tables and again before the views
+    assert all(q.startswith(("CREATE TABLE IF NOT EXISTS etl_schema_version", "SELECT name, version")) for q in sql)
+
+    # order_lines' DDL changed since it was applied: only it runs, and its new version is recorded
+    mock_cursor.reset_mock()
+    mock_cursor.fetchall.return_value = [applied[0], ("order_lines", "0123456789abcdef")] + applied[2:]
+    loader.create_tables(specs, [])
+    sql = "\n".join(c.args[0] for c in mock_cursor.execute.call_args_list)
+    assert "CREATE INDEX IF NOT EXISTS order_lines_order_id_idx" in sql
+    assert "sales_orders_customer_id_idx" not in sql and "CREATE MATERIALIZED VIEW" not in sql
+    recorded = [c.args[1] for c in mock_cursor.execute.call_args_list if "INSERT INTO etl_schema_version" in c.args[0]]
+    assert recorded == [("order_lines", specs[1].schema_version(), "order_lines")]
+
+@patch("psycopg2.connect")
+def test_partitioning_a_legacy_table_stops_on_unkeyed_rows_and_foreign_views(mock_connect):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.rowcount = 0
+    mock_connect.return_value = mock_conn
+    loader = PostgresLoader()
+    spec = get_spec("sales_orders")
+
+    # a plain table (relkind "r") with 2 orders lacking date_order
+    mock_cursor.fetchone.side_effect = [("r",), (2,)]
+    with pytest.raises(RuntimeError, match="2 row.* no date_order"):
+        loader.create_tables([spec], [])
+    mock_conn.rollback.assert_called_once()
+
+    # every row keyed, but a Superset view reads the table next to a registry view
+    mock_cursor.reset_mock()
+    mock_cursor.fetchone.side_effect = [("r",), (0,)]
+    # no schema versions recorded yet, then the views depending on the table
+    mock_cursor.fetchall.side_effect = [[], [("mv_revenue_by_month",), ("superset_orders",)]]
+    with pytest.raises(RuntimeError, match="superset_orders read sales_orders"):
+        loader.create_tables([spec], [])
+    assert not any("RENAME" in c.args[0] or "DROP" in c.args[0] for c in mock_cursor.execute.call_args_list)
+
+    # only registry views: they are dropped, and recreated over the partitioned table
+    mock_cursor.reset_mock()
+    mock_cursor.fetchone.side_effect = [("r",), (0,), (False,), (True,)] + [(True,)] * 3
+    mock_cursor.fetchall.side_effect = [[], [("mv_revenue_by_month",)], [("2024-05",)], []]
+    loader.create_tables([spec], [])
+    sql = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    drop = sql.index("DROP MATERIALIZED VIEW mv_revenue_by_month;")
+    assert drop < sql.index("ALTER TABLE sales_orders RENAME TO sales_orders_unpartitioned;")
+    assert any("CREATE MATERIALIZED VIEW IF NOT EXISTS mv_revenue_by_month" in q for q in sql[drop:])
+
+@patch("psycopg2.connect")
+def test_unkeyed_legacy_rows_are_removed_and_their_model_re_extracted(mock_connect, tmp_path):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_connect.return_value = mock_conn
+    store = CheckpointStore(str(tmp_path / "state.json"))
+    store.start_run("order_lines", "2024-06-01 00:00:00", Watermark("2024-06-02 00:00:00", 9), [None])
+    store.complete_run("order_lines")
+
+    def execute(sql, params=None):
+        mock_cursor.rowcount = 4 if sql == "DELETE FROM order_lines WHERE id IS NULL;" else 0
+    mock_cursor.execute.side_effect = execute
+    mock_cursor.fetchone.return_value = (True,)    # id is still nullable
+
+    with patch.object(config, "ETL_CHECKPOINT_FILE", store.path):
+        PostgresLoader().create_tables([get_spec("order_lines")], [])
+
+    sql = "\n".join(c.args[0] for c in mock_cursor.execute.call_args_list)
+    # the id index is only created where no primary key or unique constraint covers id
+    assert "CREATE UNIQUE INDEX IF NOT EXISTS order_lines_id_key" in sql.split("ELSE")[1]
+    assert "ALTER TABLE order_lines ALTER COLUMN id SET NOT NULL;" in sql
+    assert store.watermark("order_lines") == Watermark(FULL_EXTRACT_SINCE, 0)
+
+    # a NOT NULL key cannot hold such rows: the table is not scanned for them
+    mock_cursor.reset_mock()
+    mock_cursor.fetchone.return_value = (False,)
+    PostgresLoader().create_tables([get_spec("order_lines")], [])
+    assert not any(c.args[0].startswith("DELETE") for c in mock_cursor.execute.call_args_list)
+
+@patch("psycopg2.connect")
+def test_ensure_partitions_creates_only_missing_months(mock_connect):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.rowcount = 0
+    mock_connect.return_value = mock_conn
+    mock_cursor.fetchall.return_value = [("sales_orders_default",), ("sales_orders_2024_05",)]
+    df = pd.DataFrame({"date_order": ["2024-05-31 23:59:59", "2024-12-01 00:00:00", None, "2024-05-01 00:00:00"]})
+
+    loader = PostgresLoader()
+    assert loader.ensure_partitions(get_spec("sales_orders"), df) == ["2024-12"]
+    assert mock_cursor.execute.call_args.args[0] == (
+        "CREATE TABLE IF NOT EXISTS sales_orders_2024_12 PARTITION OF sales_orders "
+        "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01');"
+    )
+
+@patch("psycopg2.connect")
+def test_refresh_views_concurrently_once_populated(mock_connect):
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.rowcount = 0
+    mock_connect.return_value = mock_conn
+    # mv_revenue_by_month populated, mv_revenue_by_customer never refreshed, the product view missing
+    mock_cursor.fetchone.side_effect = [(True,), (False,), None]
+
+    loader = PostgresLoader()
+    assert loader.refresh_views(["sales_orders"]) == ["mv_revenue_by_month", "mv_revenue_by_customer"]
+
+    refreshes = [c.args[0] for c in mock_cursor.execute.call_args_list if c.args[0].startswith("REFRESH")]
+    assert refreshes == ["REFRESH MATERIALIZED VIEW CONCURRENTLY mv_revenue_by_month;",
+                         "REFRESH MATERIALIZED VIEW mv_revenue_by_customer;"]
+    assert loader.refresh_views(["products"]) == []
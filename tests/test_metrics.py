@@ -0,0 +1,39 @@
+import json
+import threading
+import time
+
+from etl.metrics import RunMetrics
+
+
+def test_spans_count_overlap_once_and_add_accumulates():
+    metrics = RunMetrics("extract")
+
+    def shard():
+        with metrics.span("extract", "order_lines"):
+            time.sleep(0.05)
+            metrics.add("extract", "order_lines", rows=10, busy_seconds=0.05, retries=1)
+
+    threads = [threading.Thread(target=shard) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stage = metrics.get("extract", "order_lines")
+    assert stage.rows == 40 and stage.retries == 4
+    assert 0.05 <= stage.wall_seconds < stage.busy_seconds
+    assert stage.peak_rss_bytes > 0
+
+
+def test_publish_writes_json_report_and_prometheus_textfile(tmp_path):
+    metrics = RunMetrics("load")
+    metrics.add("load", "products", rows=3, bytes=120, busy_seconds=0.5)
+
+    report_path = metrics.publish(str(tmp_path / "reports"), str(tmp_path / "textfile"))
+    report = json.load(open(report_path))
+    assert report["label"] == "load"
+    assert report["stages"][0]["model"] == "products" and report["stages"][0]["bytes"] == 120
+
+    prom = (tmp_path / "textfile" / "odoo_etl_load.prom").read_text()
+    assert "# TYPE odoo_etl_stage_rows gauge" in prom
+    assert 'odoo_etl_stage_rows{run="load",stage="load",model="products"} 3' in prom
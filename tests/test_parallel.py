@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import MagicMock
+from etl.parallel import ExtractJob, ExtractionScheduler, split_id_range
+
+
+def test_split_id_range_covers_range():
+    assert split_id_range(1, 10, 3) == [(1, 5), (5, 8), (8, 11)]
+    assert split_id_range(5, 6, 4) == [(5, 6), (6, 7)]
+    assert split_id_range(7, 7, 2) == [(7, 8)]
+
+
+def _connector(rows):
+    """Connector stub whose iter_batches honours the scheduler's id-range filters."""
+    def iter_batches(model, fields, domain, additional_filter, batch_size, target_latency, many2one_ids):
+        matching = rows[model]
+        for field, op, value in additional_filter:
+            if op == ">=":
+                matching = [r for r in matching if r["id"] >= value]
+            elif op == "<":
+                matching = [r for r in matching if r["id"] < value]
+            elif op == ">":
+                matching = [r for r in matching if r["id"] > value]
+        return iter([matching[i:i + 10] for i in range(0, len(matching), 10)])
+
+    connector = MagicMock()
+    connector.clone.return_value = connector
+    connector.iter_batches.side_effect = iter_batches
+    connector.fetch_id_bounds.side_effect = lambda model, domain: (rows[model][0]["id"], rows[model][-1]["id"])
+    return connector
+
+
+def test_scheduler_shards_are_reassembled_in_order():
+    rows = {
+        "sale.order": [{"id": i} for i in range(1, 4)],
+        "sale.order.line": [{"id": i} for i in range(1, 101)],
+    }
+    jobs = [
+        ExtractJob("sales_orders", "sale.order", ["name"]),
+        ExtractJob("order_lines", "sale.order.line", ["order_id"], shards=7),
+    ]
+    results = ExtractionScheduler(_connector(rows), max_workers=3).run(jobs)
+
+    assert results["sales_orders"] == rows["sale.order"]
+    assert results["order_lines"] == rows["sale.order.line"]
+
+
+def test_scheduler_rejects_duplicate_job_names():
+    jobs = [ExtractJob("x", "sale.order", []), ExtractJob("x", "res.partner", [])]
+    with pytest.raises(ValueError):
+        ExtractionScheduler(MagicMock(), max_workers=2).run(jobs)
+
+
+def test_scheduler_uses_fixed_plan_and_resumes_shards():
+    rows = {"sale.order.line": [{"id": i} for i in range(1, 21)]}
+    connector = _connector(rows)
+    job = ExtractJob("order_lines", "sale.order.line", ["order_id"], shards=4,
+                     id_ranges=[(1, 11), (11, 21)], resume_after={0: 7})
+    results = ExtractionScheduler(connector, max_workers=2).run([job])
+
+    assert [r["id"] for r in results["order_lines"]] == [8, 9, 10] + list(range(11, 21))
+    connector.fetch_id_bounds.assert_not_called()
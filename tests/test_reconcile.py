@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from benchmarks.fake_odoo import FakeOdoo, serve_odoo
+from etl.connector import OdooConnector
+from etl.metrics import RunMetrics
+from etl.reconcile import diff_keys, reconcile_model
+from etl.registry import get_spec
+
+
+def _ids(*values):
+    return np.array(values, dtype=np.int64)
+
+
+def test_diff_keys_separates_deleted_archived_and_restored():
+    result = diff_keys(
+        warehouse=_ids(1, 2, 3, 5, 8),
+        existing=_ids(1, 2, 3, 4, 6, 7),
+        archived=_ids(3, 7),
+        soft_deleted=_ids(4, 6, 7),
+    )
+    assert result.deleted.tolist() == [5, 8]
+    assert result.archived.tolist() == [3]
+    assert result.gone.tolist() == [3, 5, 8]
+    assert result.restored.tolist() == [4, 6]
+
+
+def _loader(live, soft_deleted):
+    loader = MagicMock()
+    loader.metrics = RunMetrics("test")
+    loader.fetch_keys.side_effect = lambda table, key, deleted=None: soft_deleted if deleted else live
+    return loader
+
+
+def test_reconcile_model_soft_deletes_missing_and_archived_rows():
+    odoo = FakeOdoo({"res.partner": 300})
+    odoo.deleted["res.partner"] = {10, 11}
+    loader = _loader(live=np.arange(1, 301, dtype=np.int64), soft_deleted=_ids(400))
+    with serve_odoo(odoo) as url:
+        connector = OdooConnector(url, "db", "user", "pw")
+        result = reconcile_model(get_spec("customers"), connector, loader, "soft", archivable=True, page_size=100)
+
+    assert result.deleted.tolist() == [10, 11]
+    assert result.archived.tolist() == [97, 194, 291]
+    loader.create_tables.assert_called_once_with([get_spec("customers")])
+    table, key, gone, restored = loader.mark_deleted.call_args.args
+    assert (table, key, gone.tolist(), restored.tolist()) == ("customers", "id", [10, 11, 97, 194, 291], [])
+    assert connector.fetch_stats["res.partner:search"].rows == 298 + 3
+    assert loader.metrics.get("reconcile", "customers").rows == 301
+
+
+def test_reconcile_model_refuses_to_empty_a_table():
+    loader = _loader(live=_ids(1, 2), soft_deleted=_ids())
+    with serve_odoo(FakeOdoo({"sale.order": 0})) as url:
+        connector = OdooConnector(url, "db", "user", "pw")
+        with pytest.raises(RuntimeError, match="refusing"):
+            reconcile_model(get_spec("sales_orders"), connector, loader, "delete", archivable=False)
+    loader.delete_keys.assert_not_called()
@@ -0,0 +1,37 @@
+import pytest
+from benchmarks.fake_odoo import FIELDS, ROW_FACTORIES
+from config import config
+from etl.registry import REGISTRY, ModelSpec, enabled_specs, get_spec
+from etl.schema import ModelSchema, to_frame
+from etl.transform import transform_products
+
+
+@pytest.mark.parametrize("spec", REGISTRY, ids=lambda spec: spec.name)
+def test_transform_produces_registered_columns(spec):
+    schema = ModelSchema(spec.model, FIELDS[spec.model])
+    fields = schema.validate(spec.fields)
+    records = [{k: v for k, v in ROW_FACTORIES[spec.model](i).items() if k in fields} for i in range(1, 7)]
+
+    df = spec.transform(to_frame(records, schema.dtypes(fields)))
+    assert set(spec.columns) <= set(df.columns)
+    assert df[spec.key].is_unique
+
+
+def test_create_table_sql_declares_key_and_types():
+    sql = get_spec("products").create_table_sql()
+    assert "CREATE TABLE IF NOT EXISTS products (" in sql
+    assert "id INTEGER PRIMARY KEY," in sql
+    assert "list_price NUMERIC(10, 2)" in sql
+
+
+def test_spec_rejects_key_outside_columns():
+    with pytest.raises(ValueError):
+        ModelSpec("p", "product.product", ["id"], transform_products, {"name": "TEXT"})
+
+
+def test_enabled_specs_follow_etl_models(monkeypatch):
+    monkeypatch.setattr(config, "ETL_MODELS", ["stock_quants", "products"])
+    assert [spec.name for spec in enabled_specs()] == ["products", "stock_quants"]
+    monkeypatch.setattr(config, "ETL_MODELS", ["nope"])
+    with pytest.raises(ValueError):
+        enabled_specs()
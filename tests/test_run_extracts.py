@@ -0,0 +1,24 @@
+import pandas as pd
+from etl.run_extracts import write_batches
+from etl.storage import CsvStorage
+from etl.transform import transform_order_lines
+
+
+def test_write_batches_appends_each_batch(tmp_path):
+    batches = [
+        [{"order_id": [1, "SO1"], "product_id": [7, "Pen"], "price_subtotal": 2.5}],
+        [{"order_id": [2, "SO2"], "product_id": [8, "Ink"], "price_subtotal": 4.0},
+         {"order_id": [2, "SO2"], "product_id": [9, "Pad"], "price_subtotal": 1.0}],
+    ]
+    path = tmp_path / "order_lines.csv"
+
+    assert write_batches(iter(batches), transform_order_lines, str(path), CsvStorage()) == 3
+    df = pd.read_csv(path)
+    assert df["order_id"].tolist() == [1, 2, 2]
+    assert df["product_id"].tolist() == [7, 8, 9]
+
+
+def test_write_batches_no_batches_writes_nothing(tmp_path):
+    path = tmp_path / "empty.csv"
+    assert write_batches(iter([]), transform_order_lines, str(path), CsvStorage()) == 0
+    assert not path.exists()
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from etl.schema import ModelSchema, SchemaCache, to_frame
+
+FIELDS = {
+    "id": {"type": "integer", "store": True},
+    "name": {"type": "char", "store": True},
+    "list_price": {"type": "float", "store": True},
+    "active": {"type": "boolean", "store": True},
+    "write_date": {"type": "datetime", "store": True},
+    "categ_id": {"type": "many2one", "store": True},
+    "image_1920": {"type": "binary", "store": True},
+    "qty_available": {"type": "float", "store": False},
+}
+
+
+def test_validate_rejects_unknown_and_computed_fields():
+    schema = ModelSchema("product.product", FIELDS)
+    assert schema.validate(["id", "name"]) == ["id", "name"]
+    with pytest.raises(ValueError, match="no field"):
+        schema.validate(["name", "colour"])
+    with pytest.raises(ValueError, match="not stored"):
+        schema.validate(["name", "qty_available"])
+
+
+def test_empty_projection_skips_heavy_and_computed_fields():
+    schema = ModelSchema("product.product", FIELDS)
+    assert schema.validate([]) == ["id", "name", "list_price", "active", "write_date", "categ_id"]
+
+
+def test_to_frame_applies_dtypes_and_maps_false_to_missing():
+    schema = ModelSchema("product.product", FIELDS)
+    dtypes = schema.dtypes(["id", "name", "list_price", "active", "write_date", "categ_id"])
+    assert "categ_id" not in dtypes
+    records = [
+        {"id": 1, "name": "Pen", "list_price": 0.0, "active": False,
+         "write_date": "2024-06-01 12:00:00", "categ_id": [3, "Office"]},
+        {"id": 2, "name": False, "list_price": 2.5, "active": True,
+         "write_date": "2024-06-02 08:30:00", "categ_id": False},
+    ]
+    df = to_frame(records, dtypes)
+
+    assert str(df["id"].dtype) == "Int64"
+    assert df["name"].isna().tolist() == [False, True]
+    assert df["list_price"].tolist() == [0.0, 2.5]
+    assert df["active"].tolist() == [False, True]
+    assert df["write_date"].iloc[1] == pd.Timestamp("2024-06-02 08:30:00")
+    assert df["categ_id"].tolist() == [[3, "Office"], False]
+
+
+def test_schema_cache_calls_fields_get_once_within_ttl(tmp_path):
+    connector = MagicMock()
+    connector.fields_get.return_value = FIELDS
+    path = str(tmp_path / "schema.json")
+
+    SchemaCache(connector, path, ttl=3600).get("product.product")
+    schema = SchemaCache(connector, path, ttl=3600).get("product.product")
+    assert schema.fields == FIELDS
+    assert connector.fields_get.call_count == 1
+
+    SchemaCache(connector, path, ttl=-1).get("product.product")
+    assert connector.fields_get.call_count == 2
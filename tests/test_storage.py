@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+from etl.storage import CsvStorage, ParquetStorage, get_storage, merge_parts, read_frame
+
+
+def _write_parts(tmp_path, storage, frames):
+    parts = []
+    for i, df in enumerate(frames):
+        part = tmp_path / f"out{storage.extension}.part{i}"
+        if len(df):
+            with storage.open_writer(str(part)) as writer:
+                writer.write(df)
+        parts.append((str(part), len(df)))
+    return parts
+
+
+def test_merge_csv_parts_keeps_order_and_single_header(tmp_path):
+    storage = CsvStorage()
+    parts = _write_parts(tmp_path, storage, [
+        pd.DataFrame({"id": [1, 2]}), pd.DataFrame({"id": []}), pd.DataFrame({"id": [3]})
+    ])
+    path = tmp_path / "out.csv"
+
+    assert merge_parts(parts, str(path), storage) == 3
+    assert read_frame(str(path))["id"].tolist() == [1, 2, 3]
+    assert not any((tmp_path / f"out.csv.part{i}").exists() for i in range(3))
+
+
+def test_parquet_round_trip_keeps_types_and_projects(tmp_path):
+    pytest.importorskip("pyarrow")
+    storage = ParquetStorage()
+    frames = [
+        pd.DataFrame({
+            "id": [1, 2],
+            "customer_id": pd.array([10, None], dtype="Int64"),
+            "email": [False, None],
+            "date_order": pd.to_datetime(["2024-06-01 10:00:00", "2024-06-02 11:00:00"]),
+        }),
+        pd.DataFrame({
+            "id": [3],
+            "customer_id": pd.array([11], dtype="Int64"),
+            "email": ["a@example.com"],
+            "date_order": pd.to_datetime(["2024-07-01 09:00:00"]),
+        }),
+    ]
+    path = tmp_path / "sales_orders.parquet"
+    merge_parts(_write_parts(tmp_path, storage, frames), str(path), storage)
+
+    df = read_frame(str(path), ["id", "customer_id", "date_order", "email"])
+    assert list(df.columns) == ["id", "customer_id", "date_order", "email"]
+    assert df["customer_id"].dtype == "Int64"
+    assert pd.api.types.is_datetime64_any_dtype(df["date_order"])
+    assert df["email"].tolist()[2] == "a@example.com"
+    assert df["email"].isna().tolist() == [True, True, False]
+    assert read_frame(str(path), ["id"]).columns.tolist() == ["id"]
+
+
+def test_parquet_categories_outgrowing_the_first_batch(tmp_path):
+    pytest.importorskip("pyarrow")
+    from etl.transform import transform_customers
+    storage = ParquetStorage()
+
+    def customers(ids, countries):
+        return transform_customers(pd.DataFrame({
+            "id": ids, "name": "c", "country_id": [[i % countries + 1, f"Country {i % countries}"] for i in ids]
+        }))
+    few, many = customers(range(1, 11), 5), customers(range(11, 411), 200)
+    # within one file, then across parts written with different category counts
+    parts = _write_parts(tmp_path, storage, [few, many])
+    with storage.open_writer(str(tmp_path / "one.parquet")) as writer:
+        writer.write(few)
+        writer.write(many)
+    path = tmp_path / "out.parquet"
+
+    assert merge_parts(parts, str(path), storage) == 410
+    for merged in (read_frame(str(path)), read_frame(str(tmp_path / "one.parquet"))):
+        assert merged["country_name"].nunique() == 200
+        assert merged["country_name"].tolist() == few["country_name"].tolist() + many["country_name"].tolist()
+
+
+def test_get_storage_unknown_format():
+    with pytest.raises(ValueError):
+        get_storage("xlsx")
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+from benchmarks.fake_odoo import ROW_FACTORIES, FakeOdoo, serve_odoo
+from config import config
+from etl import tasks
+from etl.registry import get_aggregate
+from etl.storage import read_frame
+
+
+@pytest.fixture
+def odoo_outputs(tmp_path, monkeypatch):
+    odoo = FakeOdoo({"sale.order": 30, "sale.order.line": 100, "res.partner": 10, "product.product": 5})
+    with serve_odoo(odoo) as url:
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(config, "ODOO_URL", url)
+        monkeypatch.setattr(config, "ODOO_BATCH_SIZE", 10)
+        monkeypatch.setattr(config, "ODOO_ORDER_LINE_SHARDS", 3)
+        monkeypatch.setattr(config, "ETL_STORAGE_FORMAT", "csv")
+        yield tmp_path / "outputs"
+
+
+def test_per_model_tasks_extract_each_shard_independently(odoo_outputs):
+    assert tasks.model_names()[:4] == ["sales_orders", "products", "customers", "order_lines"]
+
+    shards = tasks.plan_extract("order_lines")
+    assert shards == [0, 1, 2]
+    # Mapped task instances may run in any order, each in its own process
+    assert sum(tasks.extract_shard("order_lines", i) for i in reversed(shards)) == 100
+    assert tasks.finish_extract("order_lines") == 100
+    assert pd.read_csv(odoo_outputs / "order_lines.csv")["id"].tolist() == list(range(1, 101))
+
+    # The next run starts from the committed watermark instead of resuming
+    assert tasks.plan_extract("order_lines") == [0, 1, 2]
+
+
+def test_finish_extract_refuses_unfinished_shards(odoo_outputs):
+    tasks.plan_extract("order_lines")
+    tasks.extract_shard("order_lines", 0)
+    with pytest.raises(RuntimeError, match="not finished"):
+        tasks.finish_extract("order_lines")
+
+
+def test_extract_aggregate_matches_rows_aggregated_locally(odoo_outputs, monkeypatch):
+    monkeypatch.setattr(config, "ETL_AGGREGATES", ["revenue_by_month", "product_sales"])
+    assert tasks.aggregate_names() == ["revenue_by_month", "product_sales"]
+
+    orders = pd.DataFrame([ROW_FACTORIES["sale.order"](i) for i in range(1, 31)])
+    orders = orders[orders["state"].isin(["sale", "done"])]
+    orders["month"] = orders["date_order"].str[:7] + "-01"
+    expected = orders.groupby(["month", "state"])["amount_total"].agg(["size", "sum"]).reset_index()
+
+    # more groups than ODOO_BATCH_SIZE (10), so read_group is paged
+    assert tasks.extract_aggregate("revenue_by_month") == len(expected) > 10
+    summary = pd.read_csv(odoo_outputs / "revenue_by_month.csv")
+    assert list(summary.columns) == ["month", "state", "order_count", "revenue"]
+    assert summary["month"].tolist() == expected["month"].tolist()
+    assert summary["order_count"].tolist() == expected["size"].tolist()
+    assert summary["revenue"].tolist() == pytest.approx(expected["sum"].tolist())
+
+    assert tasks.extract_aggregate("product_sales") == 100
+    lines = pd.read_csv(odoo_outputs / "product_sales.csv")
+    assert lines["line_count"].sum() == 100
+
+
+@pytest.mark.parametrize("storage", ["csv", "parquet"])
+def test_empty_aggregate_replaces_the_previous_summary(odoo_outputs, monkeypatch, storage):
+    monkeypatch.setattr(config, "ETL_STORAGE_FORMAT", storage)
+    assert tasks.extract_aggregate("revenue_by_month") > 0
+    monkeypatch.setattr(get_aggregate("revenue_by_month"), "domain", [("state", "=", "gone")])
+
+    assert tasks.extract_aggregate("revenue_by_month") == 0
+    summary = read_frame(str(odoo_outputs / f"revenue_by_month.{storage}"), ["month", "state", "order_count", "revenue"])
+    assert summary.empty and list(summary.columns) == ["month", "state", "order_count", "revenue"]
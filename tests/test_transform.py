@@ -1,5 +1,8 @@
+import pytest
 import pandas as pd
-from etl.transform import transform_sales_orders, extract_id, extract_name
+from etl.transform import (
+    transform_sales_orders, transform_order_lines, extract_id, extract_name, split_many2one, revenue_bucket, month_starts
+)
 
 def test_extract_id_and_name():
     val = str([5, "Alice"])
@@ -19,3 +22,39 @@ def test_transform_sales_orders():
     df_transformed = transform_sales_orders(df)
     assert "customer_id" in df_transformed
     assert df_transformed["revenue_bucket"].iloc[0] == "high"
+    assert df_transformed["order_month"].iloc[0] == pd.Timestamp("2024-05-01")
+    assert df_transformed["customer_id"].dtype == "Int32"
+    assert df_transformed["state"].dtype == "category"
+    assert "partner_id" in df  # the input frame is left alone
+
+def test_revenue_bucket_thresholds():
+    amounts = pd.Series([0, 499.99, 500, 1499.99, 1500, float("nan")])
+    buckets = revenue_bucket(amounts)
+    assert buckets.tolist()[:5] == ["low", "low", "medium", "medium", "high"] and pd.isna(buckets.iloc[5])
+    assert revenue_bucket(amounts, [100, 1000]).tolist()[:3] == ["low", "medium", "medium"]
+    with pytest.raises(ValueError):
+        revenue_bucket(amounts, [1500, 500])
+
+def test_month_starts_keep_missing_dates():
+    dates = pd.to_datetime(pd.Series(["2024-05-31 23:59:59", None, "2023-12-01 00:00:00"]))
+    months = month_starts(dates)
+    assert months.dtype.kind == "M"
+    assert months.iloc[0] == pd.Timestamp("2024-05-01") and pd.isna(months.iloc[1])
+    assert months.iloc[2] == pd.Timestamp("2023-12-01")
+
+def test_split_many2one_mixed_values():
+    series = pd.Series([[5, "Alice"], False, None, str([7, "Bob"]), (9, "Eve"), float("nan")])
+    ids, names = split_many2one(series)
+    assert ids.dtype == "Int64"
+    assert ids.tolist() == [5, pd.NA, pd.NA, 7, 9, pd.NA]
+    assert names.tolist() == ["Alice", None, None, "Bob", "Eve", None]
+
+def test_transform_order_lines_list_values():
+    df = pd.DataFrame({
+        "order_id": [[1, "SO001"], [2, "SO002"]],
+        "product_id": [[10, "Pen"], False],
+        "price_subtotal": [2.5, 4.0],
+    })
+    out = transform_order_lines(df)
+    assert out["order_id"].tolist() == [1, 2]
+    assert out["product_id"].tolist() == [10, pd.NA]
@@ -0,0 +1,144 @@
+import json
+import threading
+import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+import pytest
+from etl.connector import OdooConnector
+from etl.transport import JsonRpcProxy, JsonRpcTransport, PooledTransport
+
+
+class _KeepAliveHandler(SimpleXMLRPCRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+
+class _Server(ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server_url():
+    server = _Server(("127.0.0.1", 0), requestHandler=_KeepAliveHandler, logRequests=False)
+    server.register_function(lambda value: value, "echo")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused_across_calls_and_threads(server_url):
+    transport = PooledTransport(pool_size=4)
+    proxies = threading.local()
+
+    def call(i):
+        if not hasattr(proxies, "proxy"):
+            proxies.proxy = xmlrpc.client.ServerProxy(server_url, transport=transport)
+        return proxies.proxy.echo(i)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(call, range(200))) == list(range(200))
+    assert transport.connections_opened <= 4
+    transport.close_all()
+
+
+def test_gzip_round_trip(server_url):
+    transport = PooledTransport(gzip=True, gzip_threshold=100)
+    proxy = xmlrpc.client.ServerProxy(server_url, transport=transport)
+    payload = ["x" * 50] * 200
+    assert proxy.echo(payload) == payload
+    assert transport.connections_opened == 1
+
+
+def test_fault_keeps_connection_usable(server_url):
+    transport = PooledTransport()
+    proxy = xmlrpc.client.ServerProxy(server_url, transport=transport)
+    with pytest.raises(xmlrpc.client.Fault):
+        proxy.missing_method()
+    assert proxy.echo(1) == 1
+    assert transport.connections_opened == 1
+
+
+class _UnsizedErrorHandler(_KeepAliveHandler):
+    """Answers every other call with a 502 whose body has no Content-Length."""
+    calls = 0
+
+    def do_POST(self):
+        type(self).calls += 1
+        if self.calls % 2:
+            return super().do_POST()
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(502)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write(b"<html>Bad Gateway</html>")
+        self.close_connection = True
+
+
+def test_unread_error_response_is_not_pooled():
+    server = _Server(("127.0.0.1", 0), requestHandler=_UnsizedErrorHandler, logRequests=False)
+    server.register_function(lambda value: value, "echo")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        transport = PooledTransport()
+        proxy = xmlrpc.client.ServerProxy(f"http://127.0.0.1:{server.server_address[1]}", transport=transport)
+        assert proxy.echo(1) == 1
+        with pytest.raises(xmlrpc.client.ProtocolError) as error:
+            proxy.echo(2)
+        assert error.value.errcode == 502
+        assert proxy.echo(3) == 3
+        assert transport.connections_opened == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _JsonRpcHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        params = request["params"]
+        response = {"jsonrpc": "2.0", "id": request["id"]}
+        if params["method"] == "authenticate":
+            response["result"] = 7
+        elif params["method"] == "execute_kw":
+            response["result"] = [{"id": 1, "partner_id": [3, "Alice"], "args": params["args"][3:]}]
+        else:
+            response["error"] = {"code": 200, "message": "Odoo Server Error",
+                                 "data": {"message": f"no method {params['method']}"}}
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def jsonrpc_url():
+    server = _Server(("127.0.0.1", 0), _JsonRpcHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connector_over_jsonrpc(jsonrpc_url):
+    conn = OdooConnector(jsonrpc_url, "db", "user", "pass", protocol="jsonrpc")
+    assert conn.uid == 7
+    records = conn.fetch_all_records("sale.order", fields=["partner_id"], batch_size=10)
+    assert records == [{"id": 1, "partner_id": [3, "Alice"],
+                        "args": ["sale.order", "search_read", [[["id", ">", 0]]],
+                                 {"fields": ["partner_id"], "limit": 10, "order": "id asc"}]}]
+    assert conn.transport.connections_opened == 1
+
+
+def test_jsonrpc_error_raises_fault(jsonrpc_url):
+    proxy = JsonRpcProxy(jsonrpc_url, "common", JsonRpcTransport())
+    with pytest.raises(xmlrpc.client.Fault, match="no method version"):
+        proxy.version()